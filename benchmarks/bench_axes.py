@@ -0,0 +1,88 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.axes``.
+
+Run with ``python -m benchmarks.bench_axes``.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.common import best_of, report
+
+from deker_tools.axes import CoordinateAxis, TimeAxis
+from deker_tools.slices import create_shape_from_slice
+from deker_tools.time import get_utc
+
+
+def _scan(values: np.ndarray, item: slice) -> slice:
+    """Resolve datetime slice with a linear scan, as consumers do without an axis.
+
+    :param values: ``datetime64[us]`` axis points
+    :param item: datetime slice
+    """
+    start, stop = (np.datetime64(get_utc(bound).replace(tzinfo=None), "us") for bound in (item.start, item.stop))
+    positions = np.where((values >= start) & (values < stop))[0]
+    return slice(int(positions[0]), int(positions[-1]) + 1) if len(positions) else slice(0, 0)
+
+
+def bench_time_axis() -> None:
+    """Compare ``TimeAxis.resolve`` with a linear scan of the axis points."""
+    size = 100_000
+    regular = TimeAxis(datetime(2000, 1, 1), timedelta(hours=1), size)
+    irregular = TimeAxis(values=regular.values)
+    item = slice("2005-01-01T00:00:00", "2005-02-01T00:00:00")
+    rows = []
+    for name, axis in (("regular", regular), ("irregular", irregular)):
+        values = axis.values
+        rows.append(
+            (
+                f"{size} hours, {name}",
+                best_of(lambda: create_shape_from_slice((size,), (axis.resolve(item),))),  # noqa: B023
+                best_of(lambda: create_shape_from_slice((size,), (_scan(values, item),)), number=100),  # noqa: B023
+            )
+        )
+    report("TimeAxis.resolve vs linear scan", rows)
+
+
+def bench_coordinate_axis() -> None:
+    """Compare ``CoordinateAxis.resolve`` with a linear scan of the coordinates."""
+    item = slice(10.05, 60.55)
+    rows = []
+    for name, axis in (
+        ("regular longitude 0.01", CoordinateAxis(-180.0, 0.01, 36000)),
+        ("sorted longitude 0.01", CoordinateAxis(values=np.linspace(-180.0, 179.99, 36000))),
+    ):
+        values = axis.values
+
+        def scan() -> slice:
+            positions = np.where((values >= item.start) & (values < item.stop))[0]  # noqa: B023
+            return slice(int(positions[0]), int(positions[-1]) + 1)
+
+        rows.append((name, best_of(lambda: axis.resolve(item)), best_of(scan, number=100)))  # noqa: B023
+    report("CoordinateAxis.resolve vs linear scan", rows)
+
+
+def main() -> None:
+    """Run all axes benchmarks."""
+    bench_time_axis()
+    bench_coordinate_axis()
+
+
+if __name__ == "__main__":
+    main()
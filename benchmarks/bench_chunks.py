@@ -0,0 +1,107 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.chunks``.
+
+Run with ``python -m benchmarks.bench_chunks``.
+"""
+
+import itertools
+
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from benchmarks.common import best_of, report
+
+from deker_tools.chunks import estimate_read_cost, split_index_by_chunks
+
+
+def _split_by_positions(array_shape: Tuple[int, ...], chunk_shape: Tuple[int, ...], index_exp: tuple) -> Iterator:
+    """Split index expression by materializing the selected positions, as the backends do now.
+
+    :param array_shape: shape of the array
+    :param chunk_shape: shape of the chunks
+    :param index_exp: tuple of slices
+    :yield: chunk, local and output slices of every touched chunk
+    """
+    dims = []
+    for dim_len, chunk_size, item in zip(array_shape, chunk_shape, index_exp):
+        positions = np.atleast_1d(np.arange(dim_len)[item])
+        chunks, first = np.unique(positions // chunk_size, return_index=True)
+        bounds = list(first) + [len(positions)]
+        dims.append(
+            [
+                (chunk, slice(positions[start] % chunk_size, positions[stop - 1] % chunk_size + 1), slice(start, stop))
+                for chunk, start, stop in zip(chunks.tolist(), bounds, bounds[1:])
+            ]
+        )
+    for combination in itertools.product(*dims):
+        yield tuple(zip(*combination))
+
+
+CASES = [
+    ("year of hours, europe", (8760, 1801, 3600), (24, 256, 256), np.index_exp[:240, 200:700, 1700:2400]),
+    ("10 years, single point", (87600, 1801, 3600), (24, 256, 256), np.index_exp[:, 900:901, 1800:1801]),
+    ("global field", (8760, 1801, 3600), (24, 256, 256), np.index_exp[100, :, :]),
+]
+
+
+def bench_split_index_by_chunks() -> None:
+    """Compare ``split_index_by_chunks`` with materializing the selected positions."""
+    rows = []
+    for name, shape, chunks, index_exp in CASES:
+        rows.append(
+            (
+                name,
+                best_of(lambda: list(split_index_by_chunks(shape, chunks, index_exp)), number=20),  # noqa: B023
+                best_of(lambda: list(_split_by_positions(shape, chunks, index_exp)), number=20),  # noqa: B023
+            )
+        )
+    report("split_index_by_chunks vs materialized positions", rows)
+
+
+def bench_estimate_read_cost() -> None:
+    """Compare ``estimate_read_cost`` with counting the touched chunks one by one."""
+
+    def counted(shape: Tuple[int, ...], chunks: Tuple[int, ...], index_exp: tuple) -> Tuple[int, int]:
+        pieces = list(split_index_by_chunks(shape, chunks, index_exp))
+        read = sum(
+            int(np.prod([min(size, dim - c * size) for c, size, dim in zip(piece.chunk, chunks, shape)]))
+            for piece in pieces
+        )
+        return len(pieces), read * 4
+
+    rows = []
+    for name, shape, chunks, index_exp in CASES:
+        rows.append(
+            (
+                name,
+                best_of(lambda: estimate_read_cost(shape, chunks, "float32", index_exp)),  # noqa: B023
+                best_of(lambda: counted(shape, chunks, index_exp), number=5),  # noqa: B023
+            )
+        )
+    report("estimate_read_cost vs counting chunks", rows)
+
+
+def main() -> None:
+    """Run all chunks benchmarks."""
+    bench_split_index_by_chunks()
+    bench_estimate_read_cost()
+
+
+if __name__ == "__main__":
+    main()
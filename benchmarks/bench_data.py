@@ -0,0 +1,60 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.data``.
+
+Run with ``python -m benchmarks.bench_data``.
+"""
+
+import numpy as np
+
+from benchmarks import legacy
+from benchmarks.common import best_of, report
+
+from deker_tools.data import convert_size_to_human, convert_sizes_to_human
+
+
+def bench_convert_size_to_human() -> None:
+    """Compare ``convert_size_to_human`` and its vectorized version with the float log implementation."""
+    array = np.random.default_rng(0).integers(1, 2**50, 100_000)
+    sizes = array.tolist()
+    rows = [
+        (
+            "single size",
+            best_of(lambda: convert_size_to_human(123456789)),
+            best_of(lambda: legacy.convert_size_to_human(123456789)),
+        ),
+        (
+            "100k sizes, loop",
+            best_of(lambda: [convert_size_to_human(size) for size in sizes], number=1),
+            best_of(lambda: [legacy.convert_size_to_human(size) for size in sizes], number=1),
+        ),
+        (
+            "100k sizes, convert_sizes_to_human",
+            best_of(lambda: convert_sizes_to_human(array), number=1),
+            best_of(lambda: [legacy.convert_size_to_human(size) for size in sizes], number=1),
+        ),
+    ]
+    report("convert_size_to_human vs float log", rows)
+
+
+def main() -> None:
+    """Run all data benchmarks."""
+    bench_convert_size_to_human()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.instrumentation``.
+
+Run with ``python -m benchmarks.bench_instrumentation``.
+"""
+
+import numpy as np
+
+from benchmarks.common import best_of, report
+
+from deker_tools import instrumentation, slices
+from deker_tools.slices import slice_converter
+
+
+def bench_overhead() -> None:
+    """Compare instrumented calls with the plain ones, the ratio is the cost of timing."""
+    index_exp = np.index_exp[1:10, 5, ...]
+    cases = [
+        ("slice_converter", lambda: slice_converter[index_exp]),
+        ("create_shape_from_slice", lambda: slices.create_shape_from_slice((10, 10, 10), index_exp)),
+    ]
+    rows = []
+    for target, func in cases:
+        plain = best_of(func)
+        with instrumentation.instrumented([target]):
+            timed = best_of(func)
+        rows.append((target, timed, plain))
+    report("instrumented vs plain calls", rows)
+
+
+def main() -> None:
+    """Run all instrumentation benchmarks."""
+    bench_overhead()
+
+
+if __name__ == "__main__":
+    main()
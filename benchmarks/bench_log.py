@@ -0,0 +1,137 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.log``.
+
+Run with ``python -m benchmarks.bench_log``.
+"""
+
+import logging
+import os
+import tempfile
+
+from benchmarks import legacy
+from benchmarks.common import best_of, report
+
+from deker_tools.log import (
+    RateLimitFilter,
+    SamplingFilter,
+    _build_tree,
+    install_filter,
+    queue_logging_stats,
+    set_logger,
+    start_queue_logging,
+    stop_queue_logging,
+    tree,
+    uninstall_filter,
+)
+
+
+def bench_logger_tree() -> None:
+    """Compare logger tree building and formatting on 20000 per-array loggers."""
+    handler = logging.NullHandler()
+    for collection in range(20):
+        for array in range(1000):
+            logging.getLogger(f"deker.collection{collection}.array{array}").addHandler(handler)
+    logger_dict = logging.root.manager.loggerDict
+
+    def add_loggers() -> None:
+        for _ in range(100):
+            add_loggers.count += 1  # type: ignore[attr-defined]
+            logging.getLogger(f"deker.new.array{add_loggers.count}").addHandler(handler)  # type: ignore[attr-defined]
+
+    add_loggers.count = 0  # type: ignore[attr-defined]
+    tree()
+    set_logger("%(message)s")
+    rows = [
+        ("tree, cached", best_of(tree, number=100), best_of(legacy.tree, number=5)),
+        (
+            "tree, built",
+            best_of(lambda: _build_tree(list(logger_dict.items())), number=5),
+            best_of(legacy.tree, number=5),
+        ),
+        (
+            "set_logger",
+            best_of(lambda: set_logger("%(message)s"), number=5),
+            best_of(lambda: legacy.set_logger("%(message)s"), number=5),
+        ),
+        (
+            "100 new loggers, set_logger only_new",
+            best_of(lambda: (add_loggers(), set_logger("%(message)s", only_new=True)), number=5),
+            best_of(lambda: (add_loggers(), legacy.set_logger("%(message)s")), number=5),
+        ),
+    ]
+    report(f"logger tree, {len(logger_dict)} loggers", rows)
+
+
+def bench_queue_logging() -> None:
+    """Compare logging call latency with a file handler behind the queue and called directly."""
+    logger = logging.getLogger("deker.bench.queue")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    with tempfile.TemporaryDirectory() as directory:
+        handler = logging.FileHandler(os.path.join(directory, "bench.log"))
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+
+        def log() -> None:
+            logger.info("array %s written in %.3f s", "deker/collection/array", 0.123)
+
+        direct = best_of(log, number=2000)
+        start_queue_logging(maxsize=100_000, block=True)
+        queued = best_of(log, number=2000)
+        stats = queue_logging_stats()
+        stop_queue_logging()
+        handler.close()
+    report("logging call with a file handler, queued vs direct", [("info", queued, direct)])
+    print(f"{stats}")
+
+
+def bench_filters() -> None:
+    """Compare a per-chunk warning suppressed by the filters with writing it to a file."""
+    logger = logging.getLogger("deker.bench.filters")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    with tempfile.TemporaryDirectory() as directory:
+        handler = logging.FileHandler(os.path.join(directory, "bench.log"))
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+
+        def log() -> None:
+            logger.warning("chunk %s of %s is missing", (1, 2, 3), "deker/collection/array")
+
+        written = best_of(log, number=2000)
+        rows = []
+        for name, log_filter in (
+            ("rate limit, 10/s", RateLimitFilter(rate=10)),
+            ("sampling, 1 in 1000", SamplingFilter(1000)),
+        ):
+            install_filter(log_filter)
+            rows.append((name, best_of(log, number=2000), written))
+            uninstall_filter(log_filter)
+        handler.close()
+    report("per-chunk warning, filtered vs written", rows)
+
+
+def main() -> None:
+    """Run all log benchmarks."""
+    bench_logger_tree()
+    bench_queue_logging()
+    bench_filters()
+
+
+if __name__ == "__main__":
+    main()
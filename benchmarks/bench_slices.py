@@ -0,0 +1,265 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.slices``.
+
+Run with ``python -m benchmarks.bench_slices``.
+"""
+
+import functools
+import random
+
+from typing import Any, Callable
+
+import numpy as np
+
+from benchmarks import legacy
+from benchmarks.common import best_of, report
+
+from deker_tools.slices import (
+    coalesce_index_exps,
+    compose,
+    create_shape_from_slice,
+    create_shapes_from_slices,
+    decode_index,
+    encode_index,
+    slice_converter,
+)
+
+
+SHAPE_CASES = [
+    ("3d small", (361, 720, 4), np.index_exp[1:, :, 0]),
+    ("3d lat/lon", (100_000, 1801, 3600), np.index_exp[:, 100:900, 200:3000]),
+    ("4d time axis", (500_000, 361, 720, 4), np.index_exp[10:400_000, ..., 0]),
+    ("6d full", (100, 100, 100, 100, 100, 100), np.index_exp[...]),
+    ("6d partial", (1000, 100, 100, 100, 100, 100), np.index_exp[:, 1:, :-1, 5, ::1]),
+]
+
+
+def bench_create_shape_from_slice() -> None:
+    """Compare ``create_shape_from_slice`` with the range materializing implementation."""
+    rows = []
+    for name, shape, index in SHAPE_CASES:
+        number = 20 if max(shape) > 10_000 else 1000
+        rows.append(
+            (
+                name,
+                best_of(lambda: create_shape_from_slice(shape, index), number=number),  # noqa: B023
+                best_of(lambda: legacy.create_shape_from_slice(shape, index), number=number),  # noqa: B023
+            )
+        )
+    report("create_shape_from_slice", rows)
+
+
+def bench_create_shapes_from_slices() -> None:
+    """Compare batch shape calculation with calling ``create_shape_from_slice`` per tile."""
+    shape = (8760, 1801, 3600)
+    tiles = [
+        (slice(t, t + 24), slice(y, y + 256), slice(x, x + 256))
+        for t in range(0, 240, 24)
+        for y in range(0, 1801, 256)
+        for x in range(0, 3600, 256)
+    ]
+
+    def per_tile() -> list:
+        return [create_shape_from_slice(shape, tile) for tile in tiles]
+
+    batch = best_of(lambda: create_shapes_from_slices(shape, tiles), number=20)
+    rows = [("batch vs per tile", batch, best_of(per_tile, number=20))]
+    report(f"create_shapes_from_slices, {len(tiles)} tiles", rows)
+
+
+CONVERTER_CASES = [
+    ("short", "[:, 0:10, 5]"),
+    ("datetime", "[`2023-01-01T00:00:00`:`2023-02-01T00:00:00`, 0.1:0.9:0.05, ...]"),
+    ("6d", "[0:10, -5:, ::2, `2023-01-01T00:00:00.123456+05:00`, 1:100:3, `abc`:`xyz`]"),
+]
+
+
+def _uncached(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Run function with slice_converter caches turned off.
+
+    :param func: function to wrap
+    """
+
+    def wrapper() -> Any:
+        slice_converter._cache_enabled = False
+        try:
+            return func()
+        finally:
+            slice_converter._cache_enabled = True
+
+    return wrapper
+
+
+def bench_slice_converter() -> None:
+    """Compare cached and uncached slice_converter in both directions."""
+    rows = []
+    for name, string in CONVERTER_CASES:
+        index_exp = slice_converter[string]
+        rows.append(
+            (
+                f"str -> slices, {name}",
+                best_of(lambda: slice_converter[string]),  # noqa: B023
+                best_of(_uncached(lambda: slice_converter[string])),  # noqa: B023
+            )
+        )
+        rows.append(
+            (
+                f"slices -> str, {name}",
+                best_of(lambda: slice_converter[index_exp]),  # noqa: B023
+                best_of(_uncached(lambda: slice_converter[index_exp])),  # noqa: B023
+            )
+        )
+    report("slice_converter, cached vs uncached", rows)
+
+
+def bench_str_to_slices() -> None:
+    """Compare the single pass tokenizer with the split and regex based parser on long expressions."""
+    dims = ["0:10", "-5:", "::2", "`2023-01-01T00:00:00.123456+05:00`", "1:100:3", "`abc`:`xyz`", "...", "0.1:0.9:0.05"]
+    rows = []
+    for ndim in (1, 4, 8, 16, 32):
+        parts = [dims[i % len(dims)] if dims[i % len(dims)] != "..." or i < 8 else "1" for i in range(ndim)]
+        string = f"[{', '.join(parts)}]"
+        rows.append(
+            (
+                f"{ndim} dimensions",
+                best_of(lambda: slice_converter._str_to_slices(string)),  # noqa: B023
+                best_of(lambda: legacy.StringToSlice._str_to_slices(string)),  # noqa: B023
+            )
+        )
+    report("str -> slices parsing, uncached", rows)
+
+
+def bench_compiled_slice() -> None:
+    """Compare compiled expression with parsing and calculating shape on every call."""
+    index_string = "[10:400000, 5, ..., ::2]"
+    shape = (500_000, 361, 720, 4)
+    compiled = slice_converter.compile(index_string)
+
+    def uncompiled() -> tuple:
+        return create_shape_from_slice(shape, slice_converter._str_to_slices(index_string))
+
+    rows = [("shape", best_of(lambda: compiled.shape(shape)), best_of(uncompiled))]
+    report("CompiledSlice vs parsing on every call", rows)
+
+
+def bench_compose() -> None:
+    """Compare ``compose`` with composing the materialized positions of every dimension."""
+    shape = (87600, 1801, 3600)
+    outer, inner = np.index_exp[8760:17520, 100:1700, ::2], np.index_exp[::24, -200:, 5]
+
+    def materialized() -> tuple:
+        composed = []
+        view_dims = [np.arange(dim_len)[item] for dim_len, item in zip(shape, outer)]
+        for positions, item in zip(view_dims, inner):
+            selected = positions[item]
+            composed.append(int(selected) if np.ndim(selected) == 0 else selected)
+        return tuple(composed)
+
+    rows = [("3d view of a view", best_of(lambda: compose(outer, inner, shape)), best_of(materialized, number=100))]
+    report("compose vs materialized positions", rows)
+
+
+def bench_batch_conversion() -> None:
+    """Compare batch conversion with calling ``slice_converter`` per expression, in items per second."""
+    tiles = [
+        (slice(t, t + 24), slice(y, y + 256), x)
+        for t in range(0, 8760, 24)
+        for y in range(0, 1801, 256)
+        for x in (0, 5)
+    ]
+    strings = [slice_converter[tile] for tile in tiles]
+    cases = [
+        ("to string, scalar", lambda: [slice_converter[tile] for tile in tiles]),
+        ("to string, to_strings", lambda: list(slice_converter.to_strings(tiles))),
+        ("to string, to_strings, 2 processes", lambda: list(slice_converter.to_strings(tiles, processes=2))),
+        ("from string, scalar", lambda: [slice_converter[string] for string in strings]),
+        ("from string, from_strings", lambda: list(slice_converter.from_strings(strings))),
+        ("from string, from_strings, 2 processes", lambda: list(slice_converter.from_strings(strings, processes=2))),
+    ]
+    print(f"batch slice_converter, {len(tiles)} unique tiles")
+    print(f"{'case':<40} {'items/s':>12}")
+    for name, func in cases:
+        seconds = best_of(lambda: (slice_converter.cache_clear(), func()), number=1, repeat=3)  # noqa: B023
+        print(f"{name:<40} {len(tiles) / seconds:>12.0f}")
+
+
+def bench_index_codec() -> None:
+    """Compare the binary codec with uncached string conversion, size is in bytes."""
+    rows = []
+    for name, string in CONVERTER_CASES:
+        index_exp = slice_converter[string]
+        encoded = encode_index(index_exp)
+        rows.append(
+            (
+                f"encode, {name}",
+                best_of(lambda: encode_index(index_exp)),  # noqa: B023
+                best_of(_uncached(lambda: slice_converter[index_exp])),  # noqa: B023
+            )
+        )
+        rows.append(
+            (
+                f"decode, {name}",
+                best_of(lambda: decode_index(encoded)),  # noqa: B023
+                best_of(_uncached(lambda: slice_converter[string])),  # noqa: B023
+            )
+        )
+        print(f"{name}: {len(encoded)} bytes encoded, {len(string)} characters as string")
+    report("encode_index/decode_index vs string conversion", rows)
+
+
+def bench_coalesce_index_exps() -> None:
+    """Measure planning time and read reduction of ``coalesce_index_exps``."""
+    rng = random.Random(0)
+    shape = (8760, 1801, 3600)
+    clustered = [
+        (t, y + rng.randrange(5), x + rng.randrange(5))
+        for t in range(0, 24)
+        for y, x in [(rng.randrange(1785), rng.randrange(3584)) for _ in range(20)]
+        for _ in range(20)
+    ]
+    cases = [
+        ("sliding window", [(slice(t, t + 48), slice(100, 356), slice(200, 456)) for t in range(0, 8760 - 48, 24)]),
+        ("scattered stations", [(0, rng.randrange(1801), rng.randrange(3600)) for _ in range(10_000)]),
+        ("clustered stations", clustered),
+    ]
+    print("coalesce_index_exps, max_waste=0.5")
+    print(f"{'case':<24} {'requests':>9} {'reads':>7} {'requested':>12} {'read':>12} {'plan, ms':>9}")
+    for name, index_exps in cases:
+        plan = coalesce_index_exps(shape, index_exps, max_waste=0.5)
+        requested = sum(int(np.prod(create_shape_from_slice(shape, index_exp))) for index_exp in index_exps)
+        read = sum(int(np.prod([item.stop - item.start for item in box])) for box in plan.reads)
+        plan_all = functools.partial(coalesce_index_exps, shape, index_exps, max_waste=0.5)
+        seconds = best_of(plan_all, number=1, repeat=3)
+        print(f"{name:<24} {len(index_exps):>9} {len(plan.reads):>7} {requested:>12} {read:>12} {seconds * 1e3:>9.1f}")
+
+
+def main() -> None:
+    """Run all slices benchmarks."""
+    bench_create_shape_from_slice()
+    bench_create_shapes_from_slices()
+    bench_slice_converter()
+    bench_str_to_slices()
+    bench_compiled_slice()
+    bench_compose()
+    bench_batch_conversion()
+    bench_index_codec()
+    bench_coalesce_index_exps()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmarks of ``deker_tools.time``.
+
+Run with ``python -m benchmarks.bench_time``.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from benchmarks import legacy
+from benchmarks.common import best_of, report
+
+from deker_tools.time import get_utc, get_utc_array
+
+
+GET_UTC_CASES = [
+    ("int timestamp", 1686587358),
+    ("float timestamp", 1686587358.317633),
+    ("naive datetime", datetime(2023, 6, 12, 16, 29, 18, 317633)),
+    ("utc datetime", datetime(2023, 6, 12, 16, 29, 18, 317633, tzinfo=timezone.utc)),
+    ("offset datetime", datetime(2023, 6, 12, 16, 29, 18, 317633, tzinfo=timezone(timedelta(hours=-3)))),
+    ("naive iso-string", "2023-06-12T16:29:18.317633"),
+    ("offset iso-string", "2023-06-12T16:29:18.317633+05:00"),
+]
+
+
+def bench_get_utc() -> None:
+    """Compare ``get_utc`` with the iso-string round trip implementation."""
+    rows = [
+        (name, best_of(lambda: get_utc(value)), best_of(lambda: legacy.get_utc(value)))  # noqa: B023
+        for name, value in GET_UTC_CASES
+    ]
+    report("get_utc", rows)
+
+
+def bench_get_utc_array() -> None:
+    """Compare ``get_utc_array`` with calling ``get_utc`` per element."""
+    size = 100_000
+    rng = np.random.default_rng(0)
+    timestamps = rng.uniform(0, 2e9, size)
+    offsets = ["", "Z", "+05:00", "-03:30", "+00:00"]
+    isostrings = [
+        f"{get_utc(t).replace(tzinfo=None).isoformat()}{offsets[n % len(offsets)]}" for n, t in enumerate(timestamps)
+    ]
+    rows = [
+        (
+            f"{size} float timestamps",
+            best_of(lambda: get_utc_array(timestamps), number=3, repeat=3),
+            best_of(lambda: [get_utc(t) for t in timestamps.tolist()], number=3, repeat=3),
+        ),
+        (
+            f"{size} iso-strings, mixed offsets",
+            best_of(lambda: get_utc_array(isostrings), number=3, repeat=3),
+            best_of(lambda: [get_utc(s) for s in isostrings], number=3, repeat=3),
+        ),
+    ]
+    report("get_utc_array vs get_utc per element", rows)
+
+
+def main() -> None:
+    """Run all time benchmarks."""
+    bench_get_utc()
+    bench_get_utc_array()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Helpers shared by the benchmark scripts."""
+
+import timeit
+
+from typing import Any, Callable, Iterable, Tuple
+
+
+def best_of(func: Callable[[], Any], number: int = 1000, repeat: int = 5) -> float:
+    """Return the best time of a single call in seconds.
+
+    :param func: callable without arguments to measure
+    :param number: amount of calls in one measurement
+    :param repeat: amount of measurements
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(title: str, rows: Iterable[Tuple[str, float, float]]) -> None:
+    """Print comparison of the current implementation with a baseline.
+
+    :param title: benchmark title
+    :param rows: ``(case name, current time, baseline time)`` tuples
+    """
+    print(title)
+    print(f"{'case':<40} {'current, us':>12} {'baseline, us':>12} {'speedup':>8}")
+    for name, current, baseline in rows:
+        print(f"{name:<40} {current * 1e6:>12.3f} {baseline * 1e6:>12.3f} {baseline / current:>7.1f}x")
@@ -0,0 +1,272 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Frozen copies of the replaced implementations, used as a reference by the benchmarks."""
+
+import builtins
+import logging
+import math
+import re
+
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from deker_tools.log import LoggerNode
+from deker_tools.slices import FancySlice, Slice, _StringEscape, match_slice_size
+
+
+def create_shape_from_slice(
+    array_shape: Tuple[int, ...], index_exp: Slice  # type: ignore[valid-type]
+) -> Tuple[int, ...]:
+    """Calculate shape of a subset materializing every dimension range.
+
+    :param array_shape: shape of the parent array
+    :param index_exp: index expression passed to the array __getitem__ method
+    """
+    if (
+        isinstance(index_exp, type(builtins.Ellipsis))
+        or (isinstance(index_exp, slice) and index_exp == slice(None, None, None))
+        or (isinstance(index_exp, tuple) and not index_exp)
+    ):
+        return array_shape
+
+    index_exp: List[Optional[slice]] = list(np.index_exp[index_exp])  # type: ignore[arg-type]
+
+    len_item: int = len(index_exp)
+    len_shape: int = len(array_shape)
+
+    if len_item > len_shape:
+        raise IndexError(f"Too many indices for array: array is {len_shape}-dimensional, but {len_item} were indexed")
+
+    if len_item < len_shape:
+        for _ in range(len_shape - len_item):
+            index_exp.append(slice(None, None, None))
+
+    exclude: List[int] = []
+    if all(isinstance(i, (slice, type(builtins.Ellipsis), int)) for i in index_exp):
+        for n, i in enumerate(index_exp):  # type: ignore[arg-type]
+            if isinstance(i, slice) and i.step is not None and i.step != 1:
+                raise IndexError("step should be equal to 1")
+            if isinstance(i, type(builtins.Ellipsis)):
+                index_exp[n] = slice(None, None, None)
+            if isinstance(i, int):
+                exclude.append(n)
+        if exclude:
+            exclude.sort()
+            exclude.reverse()
+            for p in exclude:
+                index_exp[p] = None  # type: ignore[union-attr, index]
+    del exclude
+    shape = tuple(
+        len(tuple(range(*match_slice_size(array_shape[i], exp)))) for i, exp in enumerate(index_exp) if exp is not None
+    )
+
+    return shape
+
+
+class StringToSlice(metaclass=_StringEscape):
+    """Split and regex based string to slices conversion."""
+
+    # maps default non-numeric slices values
+    _str_to_slice = {"None": None, "": None, "...": ..., "()": ()}
+    _isostring_regex = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?((\+|-)(\d{2}:\d{2}))?)")
+
+    @classmethod
+    def _process_string(cls, string: str) -> Optional[Union[int, float, str, slice]]:
+        """Validate and get value from string.
+
+        :param string: string to be processed
+        """
+        string = string.strip()
+        str_for_check = string
+
+        # try to validate negative numbers
+        if string.startswith("-"):
+            str_for_check = string[1:]
+
+        # check if string is None or ...
+        if str_for_check in cls._str_to_slice:
+            return cls._str_to_slice[string]  # type: ignore[return-value]
+
+        # check if string is empty
+        if str_for_check is False or str_for_check.isspace():
+            return None
+
+        # check if string is integer
+        if str_for_check.isdigit():
+            return int(string)
+
+        # check if string is float
+        if str_for_check.replace(".", "").isdigit():
+            return float(string)
+
+        if isinstance(str_for_check, str):
+            if cls._is_wrapped_with_escape(str_for_check):
+                if str_for_check.count(cls._string_escape) == 2:
+                    str_for_check = cls._unwrap(str_for_check)
+            return str_for_check
+
+        raise TypeError(f"Invalid unit '{string}' type: {type(string)}")
+
+    @classmethod
+    def _convert_str_to_slice(cls, slice_string: str) -> slice:
+        """Convert a slice string to a slice object.
+
+        :param slice_string: slice string to convert
+        """
+        slice_parameters = []
+        for i in slice_string.split(":"):
+            pos = cls._process_string(i.strip())
+            slice_parameters.append(pos)
+        return slice(*slice_parameters)
+
+    @classmethod
+    def _parse_datetime(cls, slice_string: str, match_list: list) -> Union[slice, str]:
+        """Parse datetime isostrings and convert them to a slice object.
+
+        :param slice_string: initial slice string to convert
+        :param match_list: list of matched datetime isostrings to convert
+        """
+        slice_string = slice_string.replace(cls._string_escape, "").strip()
+        slice_parameters = [i[0] for i in match_list if i]
+        length = 3
+        slice_parameters_length = len(slice_parameters)
+        if len(slice_parameters) < length:
+            first: str = slice_parameters[0]
+            split_by_time = slice_string.split(first)
+            if len(slice_parameters) == 1 and (
+                len(split_by_time) == 1 or (len(split_by_time) == 2 and all(not s for s in split_by_time))
+            ):
+                return first
+            if not slice_string.startswith(first):
+                split = slice_string.split(first)
+                start = split[0].strip(cls._string_escape).strip(":").strip(cls._string_escape).strip()
+                slice_parameters.insert(0, cls._process_string(start))
+                if split[-1] != split[0]:
+                    step = split[-1].strip(cls._string_escape).strip(":").strip(cls._string_escape).strip()
+                    slice_parameters.append(cls._process_string(step))
+            else:
+                slice_parameters.extend(None for _ in range(length - slice_parameters_length))
+
+        return slice(*slice_parameters)
+
+    @classmethod
+    def _str_to_slices(cls, slice_: str) -> FancySlice:  # type: ignore[valid-type]
+        """Convert a slice string to a list of slices.
+
+        :param slice_: string to convert
+        """
+        # split the input string into slice strings and convert each one to a slice object
+        if not slice_.startswith("[") or not slice_.endswith("]"):
+            raise ValueError(f"Invalid slice string: {slice_}; shall be enclosed in brackets: '[{slice_}]'")
+        slices_str_no_brackets: str = slice_[1:-1]
+        if not slices_str_no_brackets or slices_str_no_brackets.isspace():
+            raise ValueError(f"Invalid slice string: {slice_} is empty")
+
+        slices_str = slices_str_no_brackets.split(",")
+
+        res: list = []
+        for slice_str in slices_str:
+            # check if string is an ordinary string, datetime or slice
+            # ":" may appear both in slices and datetime isostrings
+            if ":" in slice_str:
+                match = re.findall(cls._isostring_regex, slice_str)
+                if match:  # dimension represents datetime
+                    pos = cls._parse_datetime(slice_str, match)  # type: ignore[assignment]
+                else:  # all other dimensions represent any other values except time
+                    pos = cls._convert_str_to_slice(slice_str)  # type: ignore[assignment]
+            else:
+                pos = cls._process_string(slice_str)  # type: ignore[assignment]
+            res.append(pos)
+
+        return tuple(res) if len(res) != 1 else res[0]  # type: ignore[no-any-return]
+
+
+def get_utc(dt: Optional[Union[str, int, float, datetime]] = None) -> datetime:
+    """Convert datetime to UTC through an iso-string round trip.
+
+    :param dt: ``datetime.datetime`` object, timestamp, datetime iso-string or ``None``;
+    """
+    if dt is None:
+        return datetime.utcnow().replace(tzinfo=timezone.utc)
+
+    if isinstance(dt, datetime):
+        dt = dt.isoformat()  # convert any timezone objects to native format
+    elif isinstance(dt, (float, int)):
+        dt = datetime.utcfromtimestamp(dt).isoformat()
+
+    dt_object = datetime.fromisoformat(dt)
+
+    if dt_object.tzinfo is None:
+        dt_object = dt_object.replace(tzinfo=timezone.utc)
+    elif dt_object.tzinfo != timezone.utc:
+        tm = dt_object.timestamp()
+        dt_object = datetime.utcfromtimestamp(tm).replace(tzinfo=timezone.utc)
+    return dt_object
+
+
+def convert_size_to_human(size_bytes: int) -> str:
+    """Convert bytes to human size.
+
+    :param size_bytes: size in bytes
+    """
+    if size_bytes == 0:
+        return "0 B"
+    size_name = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
+    i = int(math.floor(math.log(size_bytes, 1024)))
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return f"{s} {size_name[i]}"
+
+
+def tree() -> tuple:
+    """Return a tree of tuples representing the logger layout."""
+    root = LoggerNode("", logging.root, [])
+    nodes = {}
+    items = list(logging.root.manager.loggerDict.items())
+    items.sort()
+    for name, logger in items:
+        nodes[name] = node = LoggerNode(name, logger, [])
+        i = name.rfind(".", 0, len(name) - 1)
+        if i == -1:
+            parent = root
+        else:
+            parent = nodes[name[:i]]
+        parent[2].append(node)
+    return root
+
+
+def set_logger(format_string: str) -> None:
+    """Set format for all loggers in the tree.
+
+    :param format_string: Which format we set.
+    """
+    loggers = tree()
+    fmt = logging.Formatter(fmt=format_string)
+
+    def set_format_for_loggers(node: tuple) -> None:
+        name, logger, children = node
+        if not isinstance(logger, logging.PlaceHolder):
+            for handler in logger.handlers:
+                handler.setFormatter(fmt)
+
+        for node in children:
+            set_format_for_loggers(node)
+
+    logging.basicConfig(format=format_string)
+    set_format_for_loggers(loggers)
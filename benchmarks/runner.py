@@ -0,0 +1,236 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Run the benchmark suite, save results as JSON baselines and compare them.
+
+Usage::
+
+    python -m benchmarks list
+    python -m benchmarks run [-k PATTERN] [--save PATH]
+    python -m benchmarks compare BASELINE [CURRENT] [-k PATTERN] [--threshold 0.2]
+
+``compare`` runs the suite if ``CURRENT`` is not given and exits with status 1 if any case is slower
+than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from benchmarks.suite import CASES, Case
+
+
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.path.join(".benchmarks", "baseline.json")
+
+
+class Result(NamedTuple):
+    """Measured time of a single call in seconds.
+
+    :param best: the best of the measurements, used for comparison
+    :param median: median of the measurements
+    :param number: amount of calls in one measurement
+    :param repeat: amount of measurements
+    """
+
+    best: float
+    median: float
+    number: int
+    repeat: int
+
+
+class Comparison(NamedTuple):
+    """Comparison of a case with its baseline.
+
+    :param name: case name
+    :param baseline: baseline time, ``None`` if the case is new
+    :param current: current time, ``None`` if the case is missing
+    :param ratio: current time to baseline time
+    :param regression: the case is slower than the threshold allows
+    """
+
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    ratio: Optional[float]
+    regression: bool
+
+
+def select(pattern: Optional[str] = None, names: Optional[Sequence[str]] = None) -> List[Case]:
+    """Select cases by a substring of their names.
+
+    :param pattern: substring of the case name, all cases if ``None``
+    :param names: select only these cases
+    """
+    return [
+        case for case in CASES if (pattern is None or pattern in case.name) and (names is None or case.name in names)
+    ]
+
+
+def run(cases: Sequence[Case], repeat: int = 5, verbose: bool = True) -> Dict[str, Result]:
+    """Measure cases, every one is set up in its own temporary directory.
+
+    :param cases: cases to measure
+    :param repeat: amount of measurements of every case
+    :param verbose: print results as they are measured
+    """
+    results = {}
+    for case in cases:
+        with tempfile.TemporaryDirectory() as directory:
+            func = case.setup(directory)
+            func()
+            times = [time / case.number for time in timeit.repeat(func, number=case.number, repeat=repeat)]
+        results[case.name] = Result(min(times), statistics.median(times), case.number, repeat)
+        if verbose:
+            print(f"{case.name:<64} {results[case.name].best * 1e6:>14.3f} us", flush=True)
+    return results
+
+
+def machine() -> Dict[str, Any]:
+    """Describe the machine and interpreter the results are measured on."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(results: Dict[str, Result], path: str) -> None:
+    """Save results as JSON.
+
+    :param results: measured results
+    :param path: path to the file, missing directories are created
+    """
+    data = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "machine": machine(),
+        "results": {name: result._asdict() for name, result in results.items()},
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Load saved results.
+
+    :param path: path to the file
+    """
+    with open(path) as file:
+        data = json.load(file)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported results format version {data.get('version')!r} in {path}")
+    data["results"] = {name: Result(**result) for name, result in data["results"].items()}
+    return data
+
+
+def compare(baseline: Dict[str, Result], current: Dict[str, Result], threshold: float = 0.2) -> List[Comparison]:
+    """Compare the best times of the cases with the baseline.
+
+    :param baseline: baseline results
+    :param current: current results
+    :param threshold: allowed slowdown, 0.2 means 20%
+    """
+    comparisons = []
+    for name in sorted(baseline.keys() | current.keys()):
+        old, new = baseline.get(name), current.get(name)
+        if old is None or new is None:
+            comparisons.append(
+                Comparison(name, old and old.best, new and new.best, None, False)  # type: ignore[arg-type]
+            )
+            continue
+        ratio = new.best / old.best
+        comparisons.append(Comparison(name, old.best, new.best, ratio, ratio > 1 + threshold))
+    return comparisons
+
+
+def report(comparisons: Sequence[Comparison], threshold: float) -> None:
+    """Print comparison table.
+
+    :param comparisons: compared cases
+    :param threshold: allowed slowdown
+    """
+
+    def us(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1e6:.3f}"
+
+    print(f"{'case':<64} {'baseline, us':>14} {'current, us':>14} {'ratio':>7}")
+    for item in comparisons:
+        ratio = "-" if item.ratio is None else f"{item.ratio:.2f}x"
+        mark = "  REGRESSION" if item.regression else ""
+        print(f"{item.name:<64} {us(item.baseline):>14} {us(item.current):>14} {ratio:>7}{mark}")
+    regressions = sum(item.regression for item in comparisons)
+    print(f"{regressions} regressions over {threshold:.0%}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command line interface, return exit status.
+
+    :param argv: command line arguments
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list benchmark cases")
+    run_parser = commands.add_parser("run", help="run benchmarks and save the results")
+    run_parser.add_argument("--save", default=DEFAULT_PATH, help=f"results file, default {DEFAULT_PATH}")
+    compare_parser = commands.add_parser("compare", help="compare results with a baseline")
+    compare_parser.add_argument("baseline", help="baseline results file")
+    compare_parser.add_argument("current", nargs="?", help="current results file, the suite is run if omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, default 0.2")
+    compare_parser.add_argument("--save", help="save the current results to this file")
+    for command in (run_parser, compare_parser):
+        command.add_argument("-k", dest="pattern", help="run only cases with this substring in their names")
+        command.add_argument("--repeat", type=int, default=5, help="measurements of every case, default 5")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for case in CASES:
+            print(case.name)
+        return 0
+
+    if args.command == "run":
+        results = run(select(args.pattern), args.repeat)
+        save(results, args.save)
+        print(f"saved to {args.save}")
+        return 0
+
+    baseline = load(args.baseline)
+    if args.current is not None:
+        current = load(args.current)
+    else:
+        current = {"machine": machine(), "results": run(select(args.pattern, list(baseline["results"])), args.repeat)}
+        if args.save:
+            save(current["results"], args.save)
+    if baseline["machine"] != current["machine"]:
+        print("warning: results are measured on different machines or interpreters", file=sys.stderr)
+    results = current["results"]
+    if args.pattern is not None:
+        results = {name: result for name, result in results.items() if args.pattern in name}
+        baseline["results"] = {name: result for name, result in baseline["results"].items() if args.pattern in name}
+    comparisons = compare(baseline["results"], results, args.threshold)
+    report(comparisons, args.threshold)
+    return 1 if any(item.regression for item in comparisons) else 0
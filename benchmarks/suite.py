@@ -0,0 +1,294 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark cases of the public functions with realistic workloads, used by ``python -m benchmarks``.
+
+Every case is a setup function which prepares the data in a working directory and returns a callable
+without arguments to measure.
+"""
+
+import logging
+import os
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+from deker_tools.chunks import estimate_read_cost, split_index_by_chunks
+from deker_tools.data import convert_size_to_human, convert_sizes_to_human, parse_human_size
+from deker_tools.log import set_logger, tree
+from deker_tools.path import is_empty, is_path_valid, scan_tree, validate_paths
+from deker_tools.slices import (
+    coalesce_index_exps,
+    create_shape_from_slice,
+    create_shapes_from_slices,
+    decode_index,
+    encode_index,
+    slice_converter,
+)
+from deker_tools.time import get_utc, get_utc_array
+
+
+Setup = Callable[[str], Callable[[], Any]]
+
+
+class Case(NamedTuple):
+    """Benchmark case.
+
+    :param name: unique dotted name, starting with the module name
+    :param setup: function preparing the data in the working directory and returning the callable to measure
+    :param number: amount of calls in one measurement
+    """
+
+    name: str
+    setup: Setup
+    number: int
+
+
+CASES: List[Case] = []
+
+
+def _case(name: str, number: int = 1000) -> Callable[[Setup], Setup]:
+    """Register a benchmark case.
+
+    :param name: unique dotted name
+    :param number: amount of calls in one measurement
+    """
+
+    def register(setup: Setup) -> Setup:
+        CASES.append(Case(name, setup, number))
+        return setup
+
+    return register
+
+
+def _register_many(prefix: str, calls: Dict[str, Callable[[], Any]], number: int = 1000) -> None:
+    """Register cases which need no setup.
+
+    :param prefix: common name prefix
+    :param calls: case names and callables to measure
+    :param number: amount of calls in one measurement
+    """
+    for name, call in calls.items():
+        CASES.append(Case(f"{prefix}.{name}", lambda _, call=call: call, number))  # type: ignore[misc]
+
+
+# slices
+
+SHAPES = {
+    "1d": ((10**12,), (slice(10**6, 10**11, 3),)),
+    "2d": ((1801, 3600), np.index_exp[100:-100, ::-2]),
+    "3d": ((100_000, 1801, 3600), np.index_exp[:, 100:900, 200:3000]),
+    "4d": ((500_000, 361, 720, 4), np.index_exp[10:400_000, ..., 0]),
+    "5d": ((87600, 37, 1801, 3600, 10), np.index_exp[::24, 5, :, 1000:2000, -1]),
+    "6d": ((1000, 100, 100, 100, 100, 100), np.index_exp[:, 1:, :-1, 5, ::1]),
+}
+_register_many(
+    "slices.create_shape_from_slice",
+    {
+        name: lambda shape=shape, index=index: create_shape_from_slice(shape, index)  # type: ignore[misc]
+        for name, (shape, index) in SHAPES.items()
+    },
+)
+
+TILES = [
+    (slice(t, t + 24), slice(y, y + 256), slice(x, x + 256))
+    for t in range(0, 240, 24)
+    for y in range(0, 1801, 256)
+    for x in range(0, 3600, 256)
+]
+_register_many(
+    "slices.create_shapes_from_slices",
+    {f"{len(TILES)} tiles": lambda: create_shapes_from_slices((8760, 1801, 3600), TILES)},
+    number=20,
+)
+
+SLICE_STRINGS = {
+    "short": "[:, 0:10, 5]",
+    "datetime range": "[`2023-01-01T00:00:00`:`2023-02-01T00:00:00`, 0.1:0.9:0.05, ...]",
+    "datetime 6d": "[0:10, -5:, ::2, `2023-01-01T00:00:00.123456+05:00`, 1:100:3, `abc`:`xyz`]",
+    "datetime points": "[" + ", ".join(f"`2023-06-{day:02d}T12:00:00+03:00`" for day in range(1, 9)) + "]",
+}
+
+
+def _uncached(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Run function with slice_converter caches turned off.
+
+    :param func: function to wrap
+    """
+
+    def wrapper() -> Any:
+        slice_converter._cache_enabled = False
+        try:
+            return func()
+        finally:
+            slice_converter._cache_enabled = True
+
+    return wrapper
+
+
+for _name, _string in SLICE_STRINGS.items():
+    _index_exp = slice_converter[_string]
+    _encoded = encode_index(_index_exp)
+    _register_many(
+        "slices",
+        {
+            f"slice_converter.from_string.{_name}": _uncached(lambda string=_string: slice_converter[string]),
+            f"slice_converter.from_string.cached.{_name}": lambda string=_string: slice_converter[string],
+            f"slice_converter.to_string.{_name}": _uncached(lambda index_exp=_index_exp: slice_converter[index_exp]),
+            f"encode_index.{_name}": lambda index_exp=_index_exp: encode_index(index_exp),
+            f"decode_index.{_name}": lambda encoded=_encoded: decode_index(encoded),
+        },
+    )
+
+_register_many(
+    "slices.coalesce_index_exps",
+    {
+        "sliding window": lambda: coalesce_index_exps(
+            (8760, 1801, 3600),
+            [(slice(t, t + 48), slice(100, 356), slice(200, 456)) for t in range(0, 8760 - 48, 24)],
+            0.5,
+        )
+    },
+    number=5,
+)
+
+# chunks
+
+_register_many(
+    "chunks",
+    {
+        "split_index_by_chunks.3d": lambda: list(
+            split_index_by_chunks((8760, 1801, 3600), (24, 256, 256), np.index_exp[:240, 100:1700, ::3])
+        ),
+        "estimate_read_cost.3d": lambda: estimate_read_cost(
+            (8760, 1801, 3600), (24, 256, 256), "float32", np.index_exp[:240, 100:1700, ::3]
+        ),
+    },
+    number=20,
+)
+
+# time
+
+UTC_VALUES = {
+    "int timestamp": 1686587358,
+    "float timestamp": 1686587358.317633,
+    "naive datetime": datetime(2023, 6, 12, 16, 29, 18, 317633),
+    "offset datetime": datetime(2023, 6, 12, 16, 29, 18, 317633, tzinfo=timezone(timedelta(hours=-3))),
+    "naive iso-string": "2023-06-12T16:29:18.317633",
+    "offset iso-string": "2023-06-12T16:29:18.317633+05:00",
+}
+_register_many("time.get_utc", {name: lambda value=value: get_utc(value) for name, value in UTC_VALUES.items()})
+
+TIMESTAMPS = np.random.default_rng(0).uniform(0, 2e9, 100_000)
+ISOSTRINGS = [
+    f"{get_utc(t).replace(tzinfo=None).isoformat()}{['', 'Z', '+05:00', '-03:30'][n % 4]}"
+    for n, t in enumerate(TIMESTAMPS[:10_000])
+]
+_register_many(
+    "time.get_utc_array",
+    {
+        "100000 float timestamps": lambda: get_utc_array(TIMESTAMPS),
+        "10000 iso-strings, mixed offsets": lambda: get_utc_array(ISOSTRINGS),
+    },
+    number=3,
+)
+_register_many(
+    "time.get_utc",
+    {"column of 10000 iso-strings": lambda: [get_utc(string) for string in ISOSTRINGS]},
+    number=3,
+)
+
+# data
+
+SIZES = np.random.default_rng(0).integers(0, 2**50, 100_000)
+_register_many(
+    "data",
+    {
+        "convert_size_to_human.binary": lambda: convert_size_to_human(123_456_789_012),
+        "convert_size_to_human.si": lambda: convert_size_to_human(123_456_789_012, units="si"),
+        "convert_size_to_human.float": lambda: convert_size_to_human(1536.5, precision=3),
+        "parse_human_size": lambda: parse_human_size("114.98 GiB", units="iec"),
+    },
+)
+_register_many("data", {"convert_sizes_to_human.100000 sizes": lambda: convert_sizes_to_human(SIZES)}, number=3)
+
+# path
+
+
+def _make_tree(root: str, depth: int, fanout: int, files: int) -> str:
+    """Create a directory tree with files in the leaf directories.
+
+    :param root: working directory
+    :param depth: depth of the tree
+    :param fanout: subdirectories of every directory
+    :param files: files in every leaf directory
+    """
+    top = os.path.join(root, f"tree_{depth}_{fanout}_{files}")
+    levels = [top]
+    for _ in range(depth):
+        levels = [os.path.join(path, str(number)) for path in levels for number in range(fanout)]
+    for path in levels:
+        os.makedirs(path)
+        for number in range(files):
+            with open(os.path.join(path, f"{number}.h5"), "wb") as file:
+                file.write(b"x" * number)
+    return top
+
+
+for _depth, _fanout, _files in ((1, 20, 100), (3, 6, 10), (8, 2, 4)):
+
+    @_case(f"path.scan_tree.depth {_depth}", number=3)
+    def _scan_tree(root: str, depth: int = _depth, fanout: int = _fanout, files: int = _files) -> Callable[[], Any]:
+        top = _make_tree(root, depth, fanout, files)
+        return lambda: sum(stats.size for stats in scan_tree(top, workers=4))
+
+
+@_case("path.is_empty")
+def _is_empty(root: str) -> Callable[[], Any]:
+    path = _make_tree(root, 1, 1, 100)
+    return lambda: is_empty(path)
+
+
+@_case("path.is_path_valid")
+def _is_path_valid(root: str) -> Callable[[], Any]:
+    path = os.path.join(root, "collections", "weather", "arrays", "0.h5")
+    return lambda: is_path_valid(path)
+
+
+@_case("path.validate_paths.2000 paths", number=3)
+def _validate_paths(root: str) -> Callable[[], Any]:
+    paths = [os.path.join(root, "collections", "weather", "arrays", f"{number}.h5") for number in range(2000)]
+    return lambda: validate_paths(paths)
+
+
+# log
+
+
+@_case("log.tree.2000 loggers", number=3)
+def _tree(root: str) -> Callable[[], Any]:
+    for number in range(2000):
+        logging.getLogger(f"deker.benchmarks.collection{number // 100}.array{number}")
+    return tree
+
+
+@_case("log.set_logger.2000 loggers", number=3)
+def _set_logger(root: str) -> Callable[[], Any]:
+    handler = logging.NullHandler()
+    for number in range(2000):
+        logging.getLogger(f"deker.benchmarks.collection{number // 100}.array{number}").addHandler(handler)
+    return lambda: set_logger("%(message)s")
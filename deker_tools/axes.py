@@ -0,0 +1,559 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Resolve fancy index elements (datetimes, coordinates, labels) to integer positions on axes."""
+
+import abc
+import numbers
+import typing
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from deker_tools.slices import FancySlice, _is_integer, slice_converter
+from deker_tools.time import get_utc, get_utc_array
+
+
+if typing.TYPE_CHECKING:
+    from builtins import ellipsis
+
+
+__all__ = ["TimeAxis", "CoordinateAxis", "LabelAxis", "resolve_index_exp", "MODES"]
+
+MODES = ("exclusive", "inclusive", "nearest")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+Resolved = Union[int, slice, None, "ellipsis"]
+
+
+def _to_us(value: Union[str, int, float, datetime]) -> int:
+    """Convert anything ``get_utc`` accepts to UTC epoch microseconds.
+
+    :param value: datetime, iso-string or timestamp
+    """
+    return (get_utc(value) - _EPOCH) // _MICROSECOND
+
+
+def _check_mode(mode: str, modes: Tuple[str, ...] = MODES) -> str:
+    """Validate slice bounds resolution mode.
+
+    :param mode: mode to check
+    :param modes: supported modes
+    """
+    if mode not in modes:
+        raise ValueError(f"Invalid mode {mode!r}, expected one of {modes}")
+    return mode
+
+
+def _finish_slice(start: Any, stop: Any, step: Optional[int], item: slice) -> slice:
+    """Fix resolved bounds of a slice with a negative step.
+
+    Position ``-1`` of a resolved bound means "before the first point": as a stop it is ``None``,
+    as a start it makes the slice empty.
+
+    :param start: resolved start
+    :param stop: resolved stop
+    :param step: resolved step
+    :param item: original slice
+    """
+    if step is not None and step < 0:
+        if start is not None and start < 0 and not _is_integer(item.start):
+            return slice(0, 0, step)
+        if stop is not None and stop < 0 and not _is_integer(item.stop):
+            stop = None
+    return slice(start, stop, step)
+
+
+class _SortedAxis(abc.ABC):
+    """Axis of strictly increasing keys, which are either regular or stored in an array.
+
+    Subclasses convert their values to keys with ``_key`` and slice steps with ``_step_key``.
+    """
+
+    __slots__ = ("_start", "_step", "_size", "_keys", "_tolerance", "_mode")
+
+    _tolerance: Union[int, float]
+    _mode: str
+
+    def _init_regular(self, start: Union[int, float], step: Union[int, float], size: int) -> None:
+        """Set keys of a regular axis.
+
+        :param start: first key
+        :param step: positive distance between keys
+        :param size: number of keys
+        """
+        if not _is_integer(size) or size < 0:
+            raise ValueError(f"Invalid axis size: {size!r}")
+        self._start, self._step, self._size, self._keys = start, step, int(size), None
+
+    def _init_keys(self, keys: np.ndarray) -> None:
+        """Set keys of an irregular axis.
+
+        :param keys: strictly increasing keys
+        """
+        if (np.diff(keys) <= 0).any():
+            raise ValueError("Axis values shall be strictly monotonic")
+        self._start, self._step, self._size, self._keys = None, None, len(keys), keys
+
+    @abc.abstractmethod
+    def _key(self, value: Any) -> Union[int, float]:
+        """Convert axis value to key.
+
+        :param value: axis value
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _step_key(self, step: Any) -> Union[int, float]:
+        """Convert slice step to key units.
+
+        :param step: non-integer slice step
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_regular(self) -> bool:
+        """Check if axis is defined by start, step and size."""
+        return self._keys is None
+
+    @property
+    def mode(self) -> str:
+        """Slice bounds resolution mode."""
+        return self._mode
+
+    def _point(self, position: int) -> Union[int, float]:
+        """Get key of an axis point.
+
+        :param position: index of the point
+        """
+        return self._start + position * self._step if self._keys is None else self._keys[position].item()
+
+    def _search(self, key: Union[int, float], right: bool = False) -> int:
+        """Find position of a key in the axis as ``np.searchsorted`` does, keys within tolerance are equal.
+
+        :param key: key to find
+        :param right: return position after the equal point instead of the one before it
+        """
+        if self._keys is not None:
+            if right:
+                return int(np.searchsorted(self._keys, key + self._tolerance, side="right"))
+            return int(np.searchsorted(self._keys, key - self._tolerance, side="left"))
+        if right:
+            position = (key + self._tolerance - self._start) // self._step + 1
+        else:
+            position = -((self._start - key + self._tolerance) // self._step)
+        return min(max(int(position), 0), self._size)
+
+    def _nearest(self, key: Union[int, float]) -> int:
+        """Find position of the point nearest to a key, the first one of two equally near points.
+
+        :param key: key to find
+        """
+        if not self._size:
+            raise IndexError("Axis is empty")
+        if self._keys is None:
+            position = -((2 * (self._start - key) + self._step) // (2 * self._step))
+            return min(max(int(position), 0), self._size - 1)
+        position = int(np.searchsorted(self._keys, key))
+        if position == self._size or (position and key - self._point(position - 1) <= self._point(position) - key):
+            return position - 1
+        return position
+
+    def index(self, value: Any) -> int:
+        """Get index of a point.
+
+        In ``nearest`` mode index of the nearest point is returned, otherwise the value shall be on the axis.
+
+        :param value: axis value
+        """
+        key = self._key(value)
+        if self._mode == "nearest":
+            return self._nearest(key)
+        position = self._search(key)
+        if position == self._size or abs(self._point(position) - key) > self._tolerance:
+            raise IndexError(f"{value!r} is not on the axis")
+        return position
+
+    def _resolve_step(self, step: Any) -> Optional[int]:
+        """Convert slice step to integer.
+
+        :param step: integer, ``None`` or a multiple of the axis step
+        """
+        if step is None or _is_integer(step):
+            return step
+        key_step = self._step_key(step)
+        if self._keys is not None:
+            raise ValueError(f"Slice step {step!r} is supported by regular axes only, use integer steps")
+        ratio = round(key_step / self._step)
+        if not ratio or abs(ratio * self._step - key_step) > self._tolerance:
+            raise ValueError(f"Slice step {step!r} is not a multiple of the axis step")
+        return ratio
+
+    def _resolve_bound(self, bound: Any, descending: bool, stop: bool) -> Optional[int]:
+        """Convert slice bound to integer according to the mode.
+
+        :param bound: integer, ``None`` or axis value
+        :param descending: slice step is negative
+        :param stop: bound is slice stop
+        """
+        if bound is None or _is_integer(bound):
+            return bound
+        key = self._key(bound)
+        if self._mode == "nearest":
+            return self._nearest(key) + (stop and (-1 if descending else 1))
+        if descending:
+            if stop and self._mode == "inclusive":
+                return self._search(key) - 1
+            return self._search(key, right=True) - 1
+        if stop and self._mode == "inclusive":
+            return self._search(key, right=True)
+        return self._search(key)
+
+    def resolve(self, item: Any) -> Resolved:
+        """Convert index expression element to integers.
+
+        Integers, ``None`` and ``Ellipsis`` are returned as is.
+
+        :param item: axis value or a slice of them
+        """
+        if item is None or item is Ellipsis or _is_integer(item):
+            return item
+        if not isinstance(item, slice):
+            return self.index(item)
+        step = self._resolve_step(item.step)
+        descending = step is not None and step < 0
+        start = self._resolve_bound(item.start, descending, stop=False)
+        stop = self._resolve_bound(item.stop, descending, stop=True)
+        return _finish_slice(start, stop, step, item)
+
+
+class TimeAxis(_SortedAxis):
+    """Time axis of a dimension, which maps datetimes to integer indexes.
+
+    Axis is either regular - defined by ``start``, ``step`` and ``size`` - or irregular - defined by
+    strictly increasing ``values``. Datetimes are normalized with ``get_utc``, so naive datetimes and
+    iso-strings are considered to be in UTC. Resolving takes O(1) on regular axes and O(log n) on irregular ones.
+
+    By default datetime slices are half-open, as integer ones: ``slice(a, b)`` selects points ``a <= t < b``;
+    ``timedelta`` slice steps must be multiples of the axis step. Integers are considered to be indexes already
+    and are passed as is, so the result can be given to ``create_shape_from_slice`` directly::
+
+        >>> axis = TimeAxis(datetime(2023, 1, 1), timedelta(hours=1), 24)
+        >>> axis.resolve(slice("2023-01-01T06:00:00", "2023-01-01T12:00:00", timedelta(hours=2)))
+        slice(6, 12, 2)
+        >>> axis.resolve("2023-01-01T03:00:00+01:00")
+        2
+
+    :param start: first point of a regular axis
+    :param step: positive distance between points of a regular axis
+    :param size: number of points of a regular axis
+    :param values: points of an irregular axis; anything ``get_utc_array`` accepts
+    :param mode: slice bounds resolution mode: ``exclusive`` - ``a <= t < b``, ``inclusive`` - ``a <= t <= b``,
+      ``nearest`` - bounds and points are snapped to the nearest axis points, both bounds are included
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        start: Optional[Union[str, int, float, datetime]] = None,
+        step: Optional[timedelta] = None,
+        size: Optional[int] = None,
+        values: Optional[Iterable[Any]] = None,
+        mode: str = "exclusive",
+    ) -> None:
+        self._mode, self._tolerance = _check_mode(mode), 0
+        if values is not None:
+            if start is not None or step is not None or size is not None:
+                raise ValueError("Either start, step and size or values shall be passed")
+            self._init_keys(get_utc_array(values).ravel().astype(np.int64))
+            return
+
+        if start is None or step is None or size is None:
+            raise ValueError("Either start, step and size or values shall be passed")
+        step_us = step // _MICROSECOND
+        if step_us <= 0:
+            raise ValueError(f"Axis step shall be a positive timedelta of at least 1 microsecond, got {step!r}")
+        self._init_regular(_to_us(start), step_us, size)
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any], mode: str = "exclusive") -> "TimeAxis":
+        """Create an irregular axis.
+
+        :param values: strictly increasing points; anything ``get_utc_array`` accepts
+        :param mode: slice bounds resolution mode
+        """
+        return cls(values=values, mode=mode)
+
+    def __repr__(self) -> str:
+        if self._keys is None:
+            return f"{self.__class__.__name__}(start={self.start!r}, step={self.step!r}, size={self._size})"
+        return f"{self.__class__.__name__}(values=<{self._size} points>)"
+
+    def _key(self, value: Union[str, int, float, datetime]) -> int:
+        return _to_us(value)
+
+    def _step_key(self, step: timedelta) -> int:
+        if not isinstance(step, timedelta):
+            raise TypeError(f"Invalid slice step: {step!r}")
+        return step // _MICROSECOND
+
+    @property
+    def start(self) -> Optional[datetime]:
+        """First point of the axis, ``None`` if it is empty."""
+        return _EPOCH + timedelta(microseconds=self._point(0)) if self._size else None
+
+    @property
+    def step(self) -> Optional[timedelta]:
+        """Step of a regular axis, ``None`` for irregular ones."""
+        return None if self._step is None else timedelta(microseconds=self._step)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Axis points as ``datetime64[us]`` array in UTC."""
+        if self._keys is None:
+            return (self._start + self._step * np.arange(self._size, dtype=np.int64)).astype("datetime64[us]")
+        return self._keys.astype("datetime64[us]")
+
+
+class CoordinateAxis(_SortedAxis):
+    """Numeric coordinate axis of a dimension (latitude, longitude, levels), which maps floats to integer indexes.
+
+    Axis is either regular - defined by ``start``, ``step`` and ``size`` - or defined by strictly increasing
+    or decreasing ``values``. Resolving takes O(1) on regular axes and O(log n) on the others.
+
+    Float bounds and steps are coordinates, integers are considered to be indexes and are passed as is.
+    Slices go in the axis order, so slices of a descending axis run from the greater coordinate to the lesser one;
+    float slice steps must be multiples of the axis step::
+
+        >>> lat = CoordinateAxis(90.0, -0.25, 721)
+        >>> lat.resolve(slice(60.0, 30.0))
+        slice(120, 240, None)
+        >>> CoordinateAxis(90.0, -0.25, 721, mode="inclusive").resolve(slice(60.0, 30.0, -0.5))
+        slice(120, 241, 2)
+        >>> CoordinateAxis(values=[1000.0, 850.0, 500.0, 250.0], mode="nearest").resolve(700.0)
+        1
+
+    :param start: first point of a regular axis
+    :param step: non-zero distance between points of a regular axis
+    :param size: number of points of a regular axis
+    :param values: points of an irregular axis
+    :param mode: slice bounds resolution mode: ``exclusive`` - ``a <= x < b``, ``inclusive`` - ``a <= x <= b``,
+      ``nearest`` - bounds and points are snapped to the nearest axis points, both bounds are included
+    :param tolerance: coordinates closer than tolerance are considered equal; defaults to ``1e-9`` of the step
+      on regular axes and to 0 on the others
+    """
+
+    __slots__ = ("_sign",)
+
+    def __init__(
+        self,
+        start: Optional[float] = None,
+        step: Optional[float] = None,
+        size: Optional[int] = None,
+        values: Optional[Iterable[float]] = None,
+        mode: str = "exclusive",
+        tolerance: Optional[float] = None,
+    ) -> None:
+        self._mode = _check_mode(mode)
+        if values is not None:
+            if start is not None or step is not None or size is not None:
+                raise ValueError("Either start, step and size or values shall be passed")
+            coordinates = np.asarray(values, dtype=np.float64).ravel()
+            self._sign = -1 if len(coordinates) > 1 and coordinates[1] < coordinates[0] else 1
+            self._tolerance = float(tolerance or 0)
+            self._init_keys(coordinates * self._sign)
+            return
+
+        if start is None or step is None or size is None:
+            raise ValueError("Either start, step and size or values shall be passed")
+        if not step or not np.isfinite(step) or not np.isfinite(start):
+            raise ValueError(f"Invalid axis start or step: {start!r}, {step!r}")
+        self._sign = -1 if step < 0 else 1
+        self._tolerance = abs(step) * 1e-9 if tolerance is None else float(tolerance)
+        self._init_regular(float(start) * self._sign, float(step) * self._sign, size)
+
+    def __repr__(self) -> str:
+        if self._keys is None:
+            return f"{self.__class__.__name__}(start={self.start!r}, step={self.step!r}, size={self._size})"
+        return f"{self.__class__.__name__}(values=<{self._size} points>)"
+
+    def _key(self, value: float) -> float:
+        if type(value) is not float and (not isinstance(value, numbers.Real) or isinstance(value, bool)):
+            raise TypeError(f"Invalid coordinate: {value!r}")
+        return float(value) * self._sign
+
+    def _step_key(self, step: float) -> float:
+        return self._key(step)
+
+    @property
+    def is_descending(self) -> bool:
+        """Check if axis coordinates decrease."""
+        return self._sign < 0
+
+    @property
+    def start(self) -> Optional[float]:
+        """First point of the axis, ``None`` if it is empty."""
+        return self._point(0) * self._sign if self._size else None
+
+    @property
+    def step(self) -> Optional[float]:
+        """Step of a regular axis, ``None`` for irregular ones."""
+        return None if self._step is None else self._step * self._sign
+
+    @property
+    def values(self) -> np.ndarray:
+        """Axis points."""
+        if self._keys is None:
+            return (self._start + self._step * np.arange(self._size)) * self._sign
+        return self._keys * self._sign
+
+
+class LabelAxis:
+    """Axis of unique labels (e.g. variable or station names), which maps labels to integer indexes.
+
+    Labels are resolved with a prebuilt hash index in O(1). Integers are considered to be indexes
+    and are passed as is, slice steps shall be integers::
+
+        >>> labels = ["temperature", "humidity", "pressure", "wind"]
+        >>> LabelAxis(labels).resolve(slice("humidity", "wind"))
+        slice(1, 3, None)
+        >>> LabelAxis(labels, mode="inclusive").resolve(slice("humidity", "wind"))
+        slice(1, 4, None)
+
+    :param labels: unique hashable labels
+    :param mode: slice bounds resolution mode: ``exclusive`` - stop label is not included, ``inclusive`` - it is
+    """
+
+    __slots__ = ("_labels", "_index", "_mode")
+
+    def __init__(self, labels: Iterable[Hashable], mode: str = "exclusive") -> None:
+        self._mode = _check_mode(mode, MODES[:2])
+        self._labels = tuple(labels)
+        self._index: Dict[Hashable, int] = {label: position for position, label in enumerate(self._labels)}
+        if len(self._index) != len(self._labels):
+            raise ValueError("Axis labels shall be unique")
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._labels)!r})"
+
+    @property
+    def labels(self) -> Tuple[Hashable, ...]:
+        """Axis labels."""
+        return self._labels
+
+    @property
+    def mode(self) -> str:
+        """Slice bounds resolution mode."""
+        return self._mode
+
+    def index(self, label: Hashable) -> int:
+        """Get index of a label.
+
+        :param label: axis label
+        """
+        try:
+            return self._index[label]
+        except (KeyError, TypeError):
+            raise IndexError(f"{label!r} is not on the axis")
+
+    def resolve(self, item: Any) -> Resolved:
+        """Convert index expression element to integers.
+
+        Integers, ``None`` and ``Ellipsis`` are returned as is.
+
+        :param item: label or a slice of labels
+        """
+        if item is None or item is Ellipsis or _is_integer(item):
+            return item
+        if not isinstance(item, slice):
+            return self.index(item)
+        if item.step is not None and not _is_integer(item.step):
+            raise TypeError(f"Label slice step shall be an integer, got {item.step!r}")
+        descending = item.step is not None and item.step < 0
+        start = item.start if item.start is None or _is_integer(item.start) else self.index(item.start)
+        stop = item.stop
+        if stop is not None and not _is_integer(stop):
+            stop = self.index(stop)
+            if self._mode == "inclusive":
+                stop += -1 if descending else 1
+        return _finish_slice(start, stop, item.step, item)
+
+
+Axis = Union[TimeAxis, CoordinateAxis, LabelAxis]
+
+
+def _is_position(item: Any) -> bool:
+    """Check if index expression element is an integer or a slice of integers.
+
+    :param item: index expression element
+    """
+    if isinstance(item, slice):
+        return all(bound is None or _is_integer(bound) for bound in (item.start, item.stop, item.step))
+    return _is_integer(item)
+
+
+def resolve_index_exp(
+    axes: Sequence[Optional[Axis]], index_exp: Union[FancySlice, str]  # type: ignore[valid-type]
+) -> Tuple[Resolved, ...]:
+    """Resolve a multidimensional fancy index expression to integers.
+
+    Every element is resolved by the axis of its dimension, ``None`` axes accept integer indexes and slices only.
+    ``Ellipsis`` and ``None`` (``np.newaxis``) are kept in place, so the result can be given to
+    ``create_shape_from_slice`` or used to index a NumPy array::
+
+        >>> axes = (TimeAxis("2023-01-01T00:00:00", timedelta(hours=1), 24), CoordinateAxis(-90.0, 1.0, 181), None)
+        >>> resolve_index_exp(axes, "[`2023-01-01T06:00:00`:`2023-01-01T12:00:00`, -10.0:10.0, 0]")
+        (slice(6, 12, None), slice(80, 100, None), 0)
+
+    :param axes: axis of every dimension
+    :param index_exp: index expression or its string representation, as ``slice_converter`` produces it
+    """
+    if isinstance(index_exp, str):
+        index_exp = slice_converter[index_exp]
+    items: Tuple[Any, ...] = index_exp if isinstance(index_exp, tuple) else (index_exp,)
+
+    ndim = len(axes)
+    indexed = sum(1 for item in items if item is not None and item is not Ellipsis)
+    if indexed > ndim:
+        raise IndexError(f"Too many indices: {ndim} axes, but {indexed} were indexed")
+    if sum(1 for item in items if item is Ellipsis) > 1:
+        raise IndexError("An index can only have a single ellipsis ('...')")
+
+    resolved: List[Resolved] = []
+    dim = 0
+    for item in items:
+        if item is Ellipsis:
+            dim += ndim - indexed
+        elif item is not None:
+            axis = axes[dim]
+            if axis is not None:
+                item = axis.resolve(item)
+            elif not _is_position(item):
+                raise TypeError(f"Dimension {dim} has no axis, only integer indexes are supported, got {item!r}")
+            dim += 1
+        resolved.append(item)
+    return tuple(resolved)
@@ -0,0 +1,291 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Decompose index expressions over chunked arrays."""
+
+import math
+import typing
+
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from deker_tools.data import convert_size_to_human
+from deker_tools.slices import Slice, _is_integer, _normalize_index_exp
+
+
+if typing.TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+
+__all__ = ["ChunkPiece", "split_index_by_chunks", "ReadCost", "estimate_read_cost"]
+
+
+class ChunkPiece(NamedTuple):
+    """Part of an index expression which falls into a single chunk.
+
+    ``output[piece.output] = chunk[piece.local]`` copies it to the result of ``array[index_exp]``.
+
+    :param chunk: coordinates of the chunk in the chunk grid
+    :param local: index expression inside the chunk
+    :param output: position of the piece in the output array
+    """
+
+    chunk: Tuple[int, ...]
+    local: Tuple[Union[slice, int, None], ...]
+    output: Tuple[slice, ...]
+
+
+_DimPiece = Tuple[Optional[int], Union[slice, int, None], Optional[slice]]
+
+
+def _check_chunk_shape(array_shape: Tuple[int, ...], chunk_shape: Tuple[int, ...]) -> None:
+    """Validate chunk shape against array shape.
+
+    :param array_shape: shape of the array
+    :param chunk_shape: shape of the chunks
+    """
+    if len(chunk_shape) != len(array_shape):
+        raise ValueError(f"Chunk shape {chunk_shape} does not match array shape {array_shape}")
+    if not all(_is_integer(size) and size > 0 for size in chunk_shape):
+        raise ValueError(f"Invalid chunk shape: {chunk_shape}")
+
+
+def _split_range(positions: range, chunk_size: int) -> Iterator[_DimPiece]:
+    """Lazily split selected positions of a dimension by chunks.
+
+    Only the touched chunks are visited, each one in O(1).
+
+    :param positions: selected positions
+    :param chunk_size: chunk size along the dimension
+    :yield: dimension piece of every touched chunk
+    """
+    start, step, length = positions.start, positions.step, len(positions)
+    first = 0
+    while first < length:
+        position = start + first * step
+        chunk = position // chunk_size
+        offset = chunk * chunk_size
+        if step > 0:
+            # first element beyond the chunk end
+            last = min(length, -((start - offset - chunk_size) // step))
+            stop: Optional[int] = start + (last - 1) * step - offset + 1
+        else:
+            # first element before the chunk start
+            last = min(length, (start - offset) // -step + 1)
+            stop = start + (last - 1) * step - offset - 1
+            stop = None if stop < 0 else stop
+        yield chunk, slice(position - offset, stop, step), slice(first, last)
+        first = last
+
+
+def _split_item(item: Union[range, int, None], chunk_size: int) -> Iterable[_DimPiece]:
+    """Split normalized index expression element by chunks.
+
+    :param item: range of selected positions, non-negative integer or ``None``
+    :param chunk_size: chunk size along the dimension
+    """
+    if item is None:
+        return ((None, None, slice(0, 1)),)
+    if isinstance(item, range):
+        return _split_range(item, chunk_size)
+    return ((item // chunk_size, item % chunk_size, None),)
+
+
+_Pieces = Tuple[Tuple[int, ...], Tuple[Union[slice, int, None], ...], Tuple[slice, ...]]
+
+
+class _CachedPieces:
+    """Iterable which consumes an iterator lazily once and replays it on the next passes.
+
+    :param pieces: pieces iterator
+    """
+
+    __slots__ = ("_pieces", "_cache", "_exhausted")
+
+    def __init__(self, pieces: Iterator[_Pieces]) -> None:
+        self._pieces = pieces
+        self._cache: List[_Pieces] = []
+        self._exhausted = False
+
+    @property
+    def exhausted(self) -> bool:
+        """Check if the iterator is consumed and everything is cached."""
+        return self._exhausted
+
+    @property
+    def cache(self) -> List[_Pieces]:
+        """Consumed pieces."""
+        return self._cache
+
+    def __iter__(self) -> Iterator[_Pieces]:
+        position = 0
+        while True:
+            if position < len(self._cache):
+                yield self._cache[position]
+            else:
+                piece = next(self._pieces, None)
+                if piece is None:
+                    self._exhausted = True
+                    return
+                self._cache.append(piece)
+                yield piece
+            position += 1
+
+
+def _split_items(items: List[Union[range, int, None]], chunk_sizes: List[int]) -> Iterator[_Pieces]:
+    """Lazily combine pieces of every element in C order.
+
+    Unlike ``itertools.product`` it does not consume the pieces in advance: the outermost element is
+    split on the go, the combinations of the inner ones are built on the first pass and cached for the next ones.
+
+    :param items: normalized index expression
+    :param chunk_sizes: chunk size along the dimension of every element
+    :yield: chunk, local and output pieces of the elements
+    """
+    if not items:
+        yield (), (), ()
+        return
+    inner: Iterable[_Pieces] = _CachedPieces(_split_items(items[1:], chunk_sizes[1:]))
+    for chunk, local, output in _split_item(items[0], chunk_sizes[0]):
+        chunk_head = () if chunk is None else (chunk,)
+        output_head = () if output is None else (output,)
+        for chunks, locals_, outputs in inner:
+            yield chunk_head + chunks, (local,) + locals_, output_head + outputs
+        if isinstance(inner, _CachedPieces) and inner.exhausted:
+            inner = inner.cache
+
+
+def split_index_by_chunks(
+    array_shape: Tuple[int, ...], chunk_shape: Tuple[int, ...], index_exp: Slice  # type: ignore[valid-type]
+) -> Iterator[ChunkPiece]:
+    """Lazily split an index expression into pieces falling into single chunks.
+
+    Chunks are yielded in the C order of the output array, only the touched ones. Touched chunks are
+    found arithmetically, dimension by dimension, so neither the index space nor the list of all pieces
+    is ever built. Integer indexes drop their dimensions from ``output`` as NumPy does, ``None`` (``np.newaxis``)
+    is kept in ``local`` and gets ``slice(0, 1)`` in ``output``::
+
+        >>> pieces = split_index_by_chunks((10, 10), (4, 4), (slice(2, 7), 5))
+        >>> for piece in pieces:
+        ...     print(piece)
+        ChunkPiece(chunk=(0, 1), local=(slice(2, 4, 1), 1), output=(slice(0, 2, None),))
+        ChunkPiece(chunk=(1, 1), local=(slice(0, 3, 1), 1), output=(slice(2, 5, None),))
+
+    :param array_shape: shape of the array
+    :param chunk_shape: shape of the chunks; edge chunks may be smaller
+    :param index_exp: index expression passed to the array __getitem__ method
+    :yield: piece of every touched chunk
+    """
+    _check_chunk_shape(array_shape, chunk_shape)
+    items = _normalize_index_exp(array_shape, index_exp)
+    chunk_sizes = []
+    dim = 0
+    for item in items:
+        chunk_sizes.append(1 if item is None else chunk_shape[dim])
+        dim += item is not None
+
+    if any(isinstance(item, range) and not item for item in items):
+        return
+    for pieces in _split_items(items, chunk_sizes):
+        yield ChunkPiece._make(pieces)
+
+
+class ReadCost(NamedTuple):
+    """Cost of reading an index expression from a chunked array.
+
+    :param shape: shape of the result
+    :param output_bytes: size of the result in memory
+    :param chunks: amount of the touched chunks
+    :param read_bytes: size of the touched chunks, smaller edge chunks are counted with their actual size
+    """
+
+    shape: Tuple[int, ...]
+    output_bytes: int
+    chunks: int
+    read_bytes: int
+
+    @property
+    def amplification(self) -> float:
+        """Ratio of the read bytes to the output bytes, 1 if nothing is read."""
+        return self.read_bytes / self.output_bytes if self.output_bytes else 1.0
+
+    @property
+    def summary(self) -> str:
+        """Human readable summary."""
+        return (
+            f"{convert_size_to_human(self.output_bytes)} in memory, {self.chunks} chunks, "
+            f"{convert_size_to_human(self.read_bytes)} read ({self.amplification:.1f}x)"
+        )
+
+
+def _touched_extent(item: Union[range, int], dim_len: int, chunk_size: int) -> Tuple[int, int]:
+    """Count the chunks touched along a dimension and their summed length.
+
+    :param item: range of selected positions or non-negative integer
+    :param dim_len: length of the dimension
+    :param chunk_size: chunk size along the dimension
+    """
+    if isinstance(item, int):
+        chunk = item // chunk_size
+        return 1, min(chunk_size, dim_len - chunk * chunk_size)
+    if not item:
+        return 0, 0
+    low, high = min(item[0], item[-1]), max(item[0], item[-1])
+    first, last = low // chunk_size, high // chunk_size
+    if abs(item.step) <= chunk_size:
+        # no chunk can be skipped between the first and the last ones
+        return last - first + 1, min((last + 1) * chunk_size, dim_len) - first * chunk_size
+    # every position is in its own chunk, only the edge one may be smaller
+    edge = (dim_len - 1) // chunk_size
+    shortage = (edge + 1) * chunk_size - dim_len if last == edge else 0
+    return len(item), len(item) * chunk_size - shortage
+
+
+def estimate_read_cost(
+    array_shape: Tuple[int, ...],
+    chunk_shape: Tuple[int, ...],
+    dtype: "DTypeLike",
+    index_exp: Slice,  # type: ignore[valid-type]
+) -> ReadCost:
+    """Estimate memory and storage cost of reading an index expression from a chunked array.
+
+    Touched chunks make a grid of the chunks touched along every dimension, so everything is computed
+    arithmetically in O(ndim) without visiting the chunks::
+
+        >>> import numpy as np
+        >>> cost = estimate_read_cost((1000, 1000), (100, 100), "float64", np.index_exp[50:150, 5])
+        >>> cost
+        ReadCost(shape=(100,), output_bytes=800, chunks=2, read_bytes=160000)
+        >>> cost.summary
+        '800.0 B in memory, 2 chunks, 156.25 KB read (200.0x)'
+
+    :param array_shape: shape of the array
+    :param chunk_shape: shape of the chunks; edge chunks may be smaller
+    :param dtype: data type of the array
+    :param index_exp: index expression passed to the array __getitem__ method
+    """
+    import numpy as np
+
+    _check_chunk_shape(array_shape, chunk_shape)
+    itemsize = np.dtype(dtype).itemsize
+    items = _normalize_index_exp(array_shape, index_exp)
+
+    shape = tuple(1 if item is None else len(item) for item in items if not isinstance(item, int))
+    chunks = read_elements = 1
+    for dim_len, chunk_size, item in zip(array_shape, chunk_shape, (item for item in items if item is not None)):
+        count, extent = _touched_extent(item, dim_len, chunk_size)
+        chunks *= count
+        read_elements *= extent
+    return ReadCost(shape, math.prod(shape) * itemsize, chunks, read_elements * itemsize)
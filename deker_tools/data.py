@@ -14,18 +14,231 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+"""Human readable data sizes."""
+
+import bisect
+import decimal
+import functools
 import math
+import typing
+
+from typing import Dict, Tuple, Union
+
+
+if typing.TYPE_CHECKING:
+    import re
+
+    import numpy as np
+
+
+__all__ = ["convert_size_to_human", "convert_sizes_to_human", "parse_human_size", "UNITS"]
+
+# unit systems: base and names of its powers
+UNITS: Dict[str, Tuple[int, Tuple[str, ...]]] = {
+    "binary": (1024, ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")),
+    "iec": (1024, ("B", "KiB", "MiB", "GiB", "TiB", "PiB", "EiB", "ZiB", "YiB")),
+    "si": (1000, ("B", "kB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")),
+}
+
+# base, unit names and powers of the base
+_TABLES = {name: (base, names, tuple(base**i for i in range(len(names)))) for name, (base, names) in UNITS.items()}
+# unit names with a leading space, created on the first vectorized conversion
+_SUFFIXES: Dict[str, "np.ndarray"] = {}
+_PREFIXES = "kmgtpezy"
+_HUMAN_SIZE = r"\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*([a-zA-Z]*)\s*"
+
 
+@functools.lru_cache(maxsize=None)
+def _human_size_regex() -> "re.Pattern[str]":
+    """Compile human size regex on the first use."""
+    import re
 
-def convert_size_to_human(size_bytes: int) -> str:
+    return re.compile(_HUMAN_SIZE)
+
+
+def _get_table(units: str) -> Tuple[int, Tuple[str, ...], Tuple[int, ...]]:
+    """Get base, unit names and powers of a unit system.
+
+    :param units: unit system name
+    """
+    try:
+        return _TABLES[units]
+    except KeyError:
+        raise ValueError(f"Invalid units '{units}', expected one of {list(UNITS)}") from None
+
+
+def convert_size_to_human(size_bytes: Union[int, float], units: str = "binary", precision: int = 2) -> str:
     """Convert bytes to human size.
 
+    The unit is selected with integer arithmetic, sizes beyond the largest unit are expressed in it::
+
+        >>> convert_size_to_human(1536)
+        '1.5 KB'
+        >>> convert_size_to_human(-1536, units="iec")
+        '-1.5 KiB'
+        >>> convert_size_to_human(123456789, units="si", precision=1)
+        '123.5 MB'
+
     :param size_bytes: size in bytes
+    :param units: ``binary`` for powers of 1024 named KB, MB..., ``iec`` for powers of 1024 named KiB, MiB...
+      or ``si`` for powers of 1000 named kB, MB...
+    :param precision: number of decimal digits to round to
+    """
+    base, names, powers = _get_table(units)
+    if type(size_bytes) is int:
+        if not size_bytes:
+            return "0 B"
+        magnitude = size_bytes if size_bytes > 0 else -size_bytes
+    else:
+        if size_bytes == 0:
+            return "0 B"
+        if not math.isfinite(size_bytes):
+            raise ValueError(f"Invalid size: {size_bytes}")
+        magnitude = abs(int(size_bytes))
+    if base == 1024:
+        index = (magnitude.bit_length() - 1) // 10
+    else:
+        index = bisect.bisect_right(powers, magnitude) - 1
+    index = 0 if index < 0 else min(index, len(names) - 1)
+    if base == 1024 and type(size_bytes) is int and 0 < precision < 15:
+        return _format_exact(size_bytes < 0, magnitude, index, base, names, powers, precision)
+    value = round(size_bytes / powers[index], precision)
+    if (value if value > 0 else -value) >= base and index < len(names) - 1:
+        # rounded up to the next unit
+        index += 1
+        value = round(size_bytes / powers[index], precision)
+    return f"{value} {names[index]}"
+
+
+def _format_exact(
+    negative: bool,
+    magnitude: int,
+    index: int,
+    base: int,
+    names: Tuple[str, ...],
+    powers: Tuple[int, ...],
+    precision: int,
+) -> str:
+    """Format integer size as ``round`` and ``repr`` of the float would, using integer arithmetic only.
+
+    Sizes divided by powers of 1024 are exact in floats below 2 ** 53, so rounding them is the same, and rounded
+    values with up to 15 digits print as their decimal notation; larger values fall back to floats.
+
+    :param negative: size is negative
+    :param magnitude: absolute size in bytes
+    :param index: unit index
+    :param base: base of the unit system
+    :param names: unit names
+    :param powers: powers of the base
+    :param precision: positive number of decimal digits to round to
+    """
+    scale = 10**precision
+    while True:
+        # round half to even
+        quotient, remainder = divmod(magnitude * scale, powers[index])
+        if remainder * 2 > powers[index] or (remainder * 2 == powers[index] and quotient & 1):
+            quotient += 1
+        if quotient < base * scale or index == len(names) - 1:
+            break
+        # rounded up to the next unit
+        index += 1
+    if quotient >= 10**15:
+        value = round((-magnitude if negative else magnitude) / powers[index], precision)
+        return f"{value} {names[index]}"
+    digits = str(quotient).rjust(precision + 1, "0")
+    fraction = digits[-precision:].rstrip("0") or "0"
+    return f"{'-' if negative else ''}{digits[:-precision]}.{fraction} {names[index]}"
+
+
+def convert_sizes_to_human(sizes: "np.ndarray", units: str = "binary", precision: int = 2) -> "np.ndarray":
+    """Convert array of sizes in bytes to human sizes.
+
+    Vectorized ``convert_size_to_human`` with the same output::
+
+        >>> import numpy as np
+        >>> convert_sizes_to_human(np.array([0, 1536, 10**9])).tolist()
+        ['0 B', '1.5 KB', '953.67 MB']
+
+    :param sizes: sizes in bytes, any shape
+    :param units: unit system, see ``convert_size_to_human``
+    :param precision: number of decimal digits to round to
+    """
+    import numpy as np
+
+    base, names, powers = _get_table(units)
+    suffixes = _SUFFIXES.get(units)
+    if suffixes is None:
+        suffixes = _SUFFIXES[units] = np.array([f" {unit}" for unit in names])
+    sizes = np.asarray(sizes)
+    values = sizes.astype(np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError("Invalid sizes: not finite")
+    float_powers = np.array(powers, dtype=np.float64)
+    if sizes.dtype.kind in "iu":
+        # compare integers exactly, abs of the smallest int64 wraps around to the right uint64
+        magnitudes = np.abs(sizes.astype(np.int64)).astype(np.uint64) if sizes.dtype.kind == "i" else sizes
+        # larger powers exceed uint64
+        indexes = np.searchsorted(np.array(powers[:7], dtype=np.uint64), magnitudes, side="right") - 1
+    else:
+        indexes = np.searchsorted(float_powers, np.abs(values), side="right") - 1
+    indexes = np.clip(indexes, 0, len(names) - 1).ravel()
+    values = values.ravel()
+    scaled = np.round(values / float_powers[indexes], precision)
+    bumped = (np.abs(scaled) >= base) & (indexes < len(names) - 1)
+    if bumped.any():
+        indexes = indexes + bumped
+        scaled = np.where(bumped, np.round(values / float_powers[indexes], precision), scaled)
+
+    # append unit suffixes right after the numbers, working on the code points of the fixed width strings
+    numbers = scaled.astype(str)
+    number_chars = numbers.view(np.uint32).reshape(len(numbers), numbers.itemsize // 4)
+    suffix_chars = suffixes.view(np.uint32).reshape(len(suffixes), -1)[indexes]
+    chars = np.zeros((len(numbers), number_chars.shape[1] + suffix_chars.shape[1]), dtype=np.uint32)
+    chars[:, : number_chars.shape[1]] = number_chars
+    lengths = np.count_nonzero(number_chars, axis=1)
+    rows = np.arange(len(numbers))
+    for column in range(suffix_chars.shape[1]):
+        chars[rows, lengths + column] = suffix_chars[:, column]
+    formatted = chars.view(f"<U{chars.shape[1]}").ravel()
+    formatted[values == 0] = "0 B"
+
+    # np.round scales values before rounding and may round ties differently than round() does
+    shifted = values / float_powers[indexes] * 10.0**precision
+    ties = np.flatnonzero(np.abs(shifted - np.floor(shifted) - 0.5) < 1e-6)
+    if len(ties):
+        fixed = [convert_size_to_human(size, units, precision) for size in sizes.ravel()[ties].tolist()]
+        width = max(formatted.itemsize // 4, max(map(len, fixed)))
+        formatted = formatted.astype(f"<U{width}")
+        formatted[ties] = fixed
+    return formatted.reshape(sizes.shape)
+
+
+def parse_human_size(size: str, units: str = "binary") -> int:
+    """Convert human size to bytes.
+
+    Units are case insensitive, ``B`` may be omitted. KiB, MiB... are always powers of 1024,
+    KB, MB... depend on the unit system::
+
+        >>> parse_human_size("1.5 GB")
+        1610612736
+        >>> parse_human_size("1.5 GB", units="si")
+        1500000000
+        >>> parse_human_size("10 KiB", units="si")
+        10240
+
+    :param size: number with an optional unit, like ``1.5 GB``, ``10KiB``, ``512`` or ``1e3 k``
+    :param units: unit system, see ``convert_size_to_human``
     """
-    if size_bytes == 0:
-        return "0 B"
-    size_name = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
-    i = int(math.floor(math.log(size_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_bytes / p, 2)
-    return f"{s} {size_name[i]}"
+    base = _get_table(units)[0]
+    match = _human_size_regex().fullmatch(size)
+    if match is None:
+        raise ValueError(f"Invalid size: '{size}'")
+    number, unit = match.group(1), match.group(2).lower()
+    multiplier = 1
+    if unit not in ("", "b"):
+        index = _PREFIXES.find(unit[0])
+        suffix = unit[1:]
+        if index < 0 or suffix not in ("", "b", "i", "ib"):
+            raise ValueError(f"Invalid size unit: '{match.group(2)}'")
+        multiplier = (1024 if suffix.startswith("i") else base) ** (index + 1)
+    return int((decimal.Decimal(number) * multiplier).to_integral_value(decimal.ROUND_HALF_EVEN))
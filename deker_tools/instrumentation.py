@@ -0,0 +1,383 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Opt-in timing of deker_tools hot paths.
+
+``enable`` replaces the instrumented functions with timing wrappers, ``disable`` puts the originals back,
+so there is no overhead at all while it is disabled::
+
+    from deker_tools import instrumentation
+
+    instrumentation.enable()
+    ...
+    instrumentation.log_snapshot()
+    instrumentation.disable()
+
+Functions are replaced in their modules and classes: references imported with ``from module import function``
+before ``enable`` keep calling the originals. ``slice_converter`` conversions are replaced in its metaclass,
+so they are timed everywhere, lazy results of ``to_strings`` and ``from_strings`` are timed while consumed.
+Every thread records into its own counters without locks, snapshots sum them up, counters of finished threads
+are merged.
+"""
+
+import functools
+import importlib
+import logging
+import threading
+import time
+import weakref
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+__all__ = [
+    "TARGETS",
+    "TimingStats",
+    "enable",
+    "disable",
+    "enabled",
+    "instrumented",
+    "snapshot",
+    "reset",
+    "log_snapshot",
+]
+
+logger = logging.getLogger(__name__)
+
+# target name: module, class name or None for module functions, attribute name
+TARGETS: Dict[str, Tuple[str, Optional[str], str]] = {
+    "slice_converter": ("deker_tools.slices", "_SliceConverter", "__getitem__"),
+    "slice_converter.to_strings": ("deker_tools.slices", "_SliceConverter", "to_strings"),
+    "slice_converter.from_strings": ("deker_tools.slices", "_SliceConverter", "from_strings"),
+    "create_shape_from_slice": ("deker_tools.slices", None, "create_shape_from_slice"),
+    "get_utc": ("deker_tools.time", None, "get_utc"),
+    "is_empty": ("deker_tools.path", None, "is_empty"),
+    "is_path_valid": ("deker_tools.path", None, "is_path_valid"),
+}
+
+# targets returning lazy iterators, time spent on getting their items is counted as a part of the call
+_ITERATOR_TARGETS = frozenset(("slice_converter.to_strings", "slice_converter.from_strings"))
+
+# histogram bucket i counts calls which took [2 ** (i - 1), 2 ** i) nanoseconds
+BUCKETS = 48
+
+_MISSING = object()
+_lock = threading.Lock()
+# target name: owner, attribute name, original attribute from the owner __dict__ or _MISSING
+_patched: Dict[str, Tuple[Any, str, Any]] = {}
+# counters of every running thread which has recorded anything: thread and target name -> [calls, errors,
+# nanoseconds, histogram]
+_thread_counters: List[Tuple["weakref.ref[threading.Thread]", Dict[str, List[Any]]]] = []
+# counters of the finished threads summed up
+_finished_counters: Dict[str, List[Any]] = {}
+_local = threading.local()
+
+
+class TimingStats(NamedTuple):
+    """Timing of an instrumented function.
+
+    :param calls: number of calls
+    :param errors: number of calls which raised
+    :param total: total time in seconds
+    :param histogram: call counts by duration, bucket ``i`` counts calls which took
+      from ``2 ** (i - 1)`` to ``2 ** i`` nanoseconds
+    """
+
+    calls: int
+    errors: int
+    total: float
+    histogram: Tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        """Mean call time in seconds, 0 if there were no calls."""
+        return self.total / self.calls if self.calls else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the quantile of call times in seconds, precise to a factor of 2.
+
+        :param q: quantile from 0 to 1
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Invalid quantile: {q}")
+        rank = q * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return 2**bucket / 1e9
+        return 0.0
+
+
+def _add_counters(totals: Dict[str, List[Any]], counters: Dict[str, List[Any]]) -> None:
+    """Add counters of a thread to the totals.
+
+    :param totals: summed up counters
+    :param counters: counters of a thread
+    """
+    for name, (calls, errors, nanoseconds, histogram) in list(counters.items()):
+        total = totals.setdefault(name, [0, 0, 0, [0] * BUCKETS])
+        total[0] += calls
+        total[1] += errors
+        total[2] += nanoseconds
+        total[3] = [a + b for a, b in zip(total[3], histogram)]
+
+
+def _collect_finished_threads() -> None:
+    """Move counters of the finished threads to ``_finished_counters``, must be called under the lock."""
+    running = []
+    for thread_ref, counters in _thread_counters:
+        thread = thread_ref()
+        if thread is not None and thread.is_alive():
+            running.append((thread_ref, counters))
+        else:
+            _add_counters(_finished_counters, counters)
+    _thread_counters[:] = running
+
+
+def _get_counter(name: str) -> List[Any]:
+    """Get counter of the current thread, register thread counters on the first call.
+
+    :param name: target name
+    """
+    counters = getattr(_local, "counters", None)
+    if counters is None:
+        counters = _local.counters = {}
+        with _lock:
+            _collect_finished_threads()
+            _thread_counters.append((weakref.ref(threading.current_thread()), counters))
+    counter = counters.get(name)
+    if counter is None:
+        counter = counters[name] = [0, 0, 0, [0] * BUCKETS]
+    return counter
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    """Wrap function with timing.
+
+    :param name: target name
+    :param func: function to time
+    """
+    perf_counter_ns = time.perf_counter_ns
+    last_bucket = BUCKETS - 1
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            _get_counter(name)[1] += 1
+            raise
+        finally:
+            elapsed = perf_counter_ns() - started
+            try:
+                counter = _local.counters[name]
+            except (AttributeError, KeyError):
+                counter = _get_counter(name)
+            counter[0] += 1
+            counter[2] += elapsed
+            counter[3][elapsed.bit_length() if elapsed >> last_bucket == 0 else last_bucket] += 1
+
+    return wrapper
+
+
+def _record(name: str, elapsed: int, failed: bool) -> None:
+    """Count a call in the counter of the current thread.
+
+    :param name: target name
+    :param elapsed: call time in nanoseconds
+    :param failed: the call has raised
+    """
+    counter = _get_counter(name)
+    counter[0] += 1
+    counter[1] += failed
+    counter[2] += elapsed
+    counter[3][min(elapsed.bit_length(), BUCKETS - 1)] += 1
+
+
+def _timed_items(name: str, iterator: Iterator[Any], elapsed: int) -> Iterator[Any]:
+    """Pass items of an iterator through, timing only the work of the iterator itself.
+
+    The call is recorded once the iterator is exhausted, fails or is closed.
+
+    :param name: target name
+    :param iterator: iterator to time
+    :param elapsed: nanoseconds spent on creating the iterator
+    :yield: items of the iterator
+    """
+    perf_counter_ns = time.perf_counter_ns
+    failed = False
+    try:
+        while True:
+            started = perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed += perf_counter_ns() - started
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        _record(name, elapsed, failed)
+
+
+def _timed_iterator(name: str, func: Callable) -> Callable:
+    """Wrap function returning a lazy iterator with timing of both the call and the iteration.
+
+    :param name: target name
+    :param func: function to time
+    """
+    perf_counter_ns = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        started = perf_counter_ns()
+        try:
+            iterator = iter(func(*args, **kwargs))
+        except BaseException:
+            _record(name, perf_counter_ns() - started, True)
+            raise
+        return _timed_items(name, iterator, perf_counter_ns() - started)
+
+    return wrapper
+
+
+def _resolve(name: str) -> Tuple[Any, str]:
+    """Import target owner.
+
+    :param name: target name
+    """
+    try:
+        module_name, class_name, attribute = TARGETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown instrumentation target '{name}', expected one of {list(TARGETS)}") from None
+    owner = importlib.import_module(module_name)
+    if class_name is not None:
+        owner = getattr(owner, class_name)
+    return owner, attribute
+
+
+def enable(targets: Optional[Iterable[str]] = None) -> None:
+    """Replace functions with timing wrappers, already instrumented ones are kept.
+
+    :param targets: names from ``TARGETS``, all of them by default
+    """
+    names = list(TARGETS if targets is None else targets)
+    resolved = [(name, *_resolve(name)) for name in names]
+    with _lock:
+        for name, owner, attribute in resolved:
+            if name in _patched:
+                continue
+            original = vars(owner).get(attribute, _MISSING)
+            wrap = _timed_iterator if name in _ITERATOR_TARGETS else _timed
+            setattr(owner, attribute, wrap(name, getattr(owner, attribute)))
+            _patched[name] = (owner, attribute, original)
+
+
+def disable(targets: Optional[Iterable[str]] = None) -> None:
+    """Put the original functions back, the recorded stats are kept.
+
+    :param targets: names from ``TARGETS``, all the instrumented ones by default
+    """
+    with _lock:
+        for name in list(_patched if targets is None else targets):
+            patched = _patched.pop(name, None)
+            if patched is None:
+                continue
+            owner, attribute, original = patched
+            if original is _MISSING:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+
+
+def enabled() -> Tuple[str, ...]:
+    """Get names of the instrumented targets."""
+    with _lock:
+        return tuple(_patched)
+
+
+@contextmanager
+def instrumented(targets: Optional[Iterable[str]] = None) -> Iterator[None]:
+    """Instrument targets inside the context, disable the ones it has enabled on exit.
+
+    :param targets: names from ``TARGETS``, all of them by default
+    :yield: nothing, the targets are instrumented inside the ``with`` block
+    """
+    names = [name for name in (TARGETS if targets is None else targets) if name not in enabled()]
+    enable(names)
+    try:
+        yield
+    finally:
+        disable(names)
+
+
+def snapshot() -> Dict[str, TimingStats]:
+    """Sum up stats of all threads, counters being updated at the moment may be off by a call."""
+    totals: Dict[str, List[Any]] = {}
+    with _lock:
+        _collect_finished_threads()
+        _add_counters(totals, _finished_counters)
+        thread_counters = [counters for _, counters in _thread_counters]
+    for counters in thread_counters:
+        _add_counters(totals, counters)
+    return {
+        name: TimingStats(calls, errors, nanoseconds / 1e9, tuple(histogram))
+        for name, (calls, errors, nanoseconds, histogram) in sorted(totals.items())
+    }
+
+
+def reset() -> None:
+    """Drop recorded stats of all threads."""
+    with _lock:
+        _finished_counters.clear()
+        for _, counters in _thread_counters:
+            counters.clear()
+
+
+def log_snapshot(level: int = logging.INFO, log: Optional[logging.Logger] = None) -> Dict[str, TimingStats]:
+    """Log stats of every target which was called and return them.
+
+    The ``deker_tools.instrumentation`` logger is used by default, so the format set
+    by ``deker_tools.log.set_logger`` applies.
+
+    :param level: logging level
+    :param log: logger to use instead of the default one
+    """
+    stats = snapshot()
+    log = logger if log is None else log
+    for name, timing in stats.items():
+        if timing.calls:
+            log.log(
+                level,
+                "%s: %d calls, %d errors, total %.6f s, mean %.3f us, p50 <= %.3f us, p99 <= %.3f us",
+                name,
+                timing.calls,
+                timing.errors,
+                timing.total,
+                timing.mean * 1e6,
+                timing.quantile(0.5) * 1e6,
+                timing.quantile(0.99) * 1e6,
+            )
+    return stats
@@ -1,6 +1,12 @@
+import atexit
 import logging
+import logging.handlers
+import math
+import queue
+import threading
 
-from typing import List, NamedTuple, Union
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 
 class LoggerNode(NamedTuple):
@@ -11,45 +17,620 @@ class LoggerNode(NamedTuple):
     children: List['LoggerNode']
 
 
+class _GenerationDict(dict):
+    """Logger dict of the logging manager which counts its modifications.
+
+    Every modification increments ``generation``, names of the added or replaced loggers
+    are appended to ``changes`` in the order of modification.
+    """
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.generation = 0
+        self.changes: List[str] = list(self)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.generation += 1
+        self.changes.append(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.generation += 1
+
+    def pop(self, *args: Any) -> Any:
+        self.generation += 1
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self.generation += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        super().clear()
+        self.generation += 1
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+_lock = threading.Lock()
+# generation and logger dict the cached tree was built from, the tree
+_tree_cache: Optional[Tuple[int, _GenerationDict, LoggerNode]] = None
+_formatters: Dict[str, logging.Formatter] = {}
+# format string and position in the changes of the logger dict of the last set_logger call
+_formatted: Optional[Tuple[str, _GenerationDict, int]] = None
+# logger dict of the logging manager replaced with the counting one
+_original_logger_dict: Optional[Dict[str, Any]] = None
+
+
+def _logger_dict() -> _GenerationDict:
+    """Get logger dict of the logging manager, replace it with the counting one on the first call.
+
+    ``restore_logger_dict`` puts the original one back.
+    """
+    global _original_logger_dict
+    manager = logging.root.manager
+    logger_dict = manager.loggerDict
+    if type(logger_dict) is not _GenerationDict:
+        with logging._lock:  # type: ignore[attr-defined]
+            logger_dict = manager.loggerDict
+            if type(logger_dict) is not _GenerationDict:
+                _original_logger_dict = logger_dict
+                logger_dict = manager.loggerDict = _GenerationDict(logger_dict)
+    return logger_dict  # type: ignore[return-value]
+
+
+def restore_logger_dict() -> None:
+    """Put the original logger dict of the logging manager back with all the loggers created since.
+
+    ``tree`` and ``set_logger`` replace it with a dict counting its modifications to cache the tree,
+    they replace it again on their next call.
+    """
+    global _original_logger_dict
+    manager = logging.root.manager
+    with logging._lock:  # type: ignore[attr-defined]
+        logger_dict = manager.loggerDict
+        if type(logger_dict) is _GenerationDict:
+            original = {} if _original_logger_dict is None else _original_logger_dict
+            original.clear()
+            original.update(logger_dict)
+            manager.loggerDict = original
+        _original_logger_dict = None
+
+
+def _build_tree(items: Iterable[Tuple[str, Any]]) -> LoggerNode:
+    """Build logger tree in O(n) without sorting.
+
+    :param items: logger names and loggers
+    """
+    root = LoggerNode('', logging.root, [])
+    make = LoggerNode._make
+    nodes = {name: make((name, logger, [])) for name, logger in items}
+    for name, node in nodes.items():
+        # the closest existing ancestor, as `logging` finds parents
+        i = name.rfind('.')
+        while i > 0 and name[:i] not in nodes:
+            i = name.rfind('.', 0, i - 1)
+        parent = nodes[name[:i]] if i > 0 else root
+        parent[2].append(node)
+    return root
+
+
 def tree() -> LoggerNode:
     """Return a tree of tuples representing the logger layout.
 
     Each tuple looks like ``('logger-name', <Logger>, [...])`` where the
     third element is a list of zero or more child tuples that share the
-    same layout.
+    same layout. Children go in the order of creation.
 
+    The tree is cached until loggers are added or removed, so it must not be modified.
     """
-    root = LoggerNode('', logging.root, [])
-    nodes = {}
-    items = list(logging.root.manager.loggerDict.items())  # for Python 2 and 3
-    items.sort()
-    for name, logger in items:
-        nodes[name] = node = LoggerNode(name, logger, [])
-        i = name.rfind('.', 0, len(name) - 1)  # same formula used in `logging`
-        if i == -1:
-            parent = root
-        else:
-            parent = nodes[name[:i]]
-        parent[2].append(node)
+    global _tree_cache
+    logger_dict = _logger_dict()
+    with _lock:
+        generation = logger_dict.generation
+        if _tree_cache is not None and _tree_cache[0] == generation and _tree_cache[1] is logger_dict:
+            return _tree_cache[2]
+    root = _build_tree(list(logger_dict.items()))
+    with _lock:
+        _tree_cache = (generation, logger_dict, root)
     return root
 
 
-def set_logger(format_string: str) -> None:
+def _get_formatter(format_string: str) -> logging.Formatter:
+    """Get formatter shared by all handlers formatted with the format string.
+
+    :param format_string: format of the formatter
+    """
+    with _lock:
+        formatter = _formatters.get(format_string)
+        if formatter is None:
+            formatter = _formatters[format_string] = logging.Formatter(fmt=format_string)
+        return formatter
+
+
+def _handlers(logger: Any) -> Iterator[logging.Handler]:
+    """Iterate over handlers of a logger, including the ones moved behind the queue.
+
+    :param logger: logger
+    :yield: handlers of the logger
+    """
+    for handler in getattr(logger, 'handlers', ()):
+        if isinstance(handler, _QueueHandler):
+            yield from handler.targets
+        else:
+            yield handler
+
+
+def set_logger(
+    format_string: str,
+    only_new: bool = False,
+    use_queue: bool = False,
+    maxsize: int = 10000,
+    block: bool = False,
+) -> None:
     """Set format for all loggers in the tree.
 
+    Handlers of all the loggers share a single formatter per format string.
+
     :param format_string: Which format we set.
+    :param only_new: format only the loggers added since the previous call with the same format string,
+      handlers added to the older loggers are left as they are
+    :param use_queue: move all handlers behind a queue, see ``start_queue_logging``
+    :param maxsize: queue size, used if the queue is not started yet
+    :param block: wait for free space in the full queue instead of dropping records,
+      used if the queue is not started yet
     """
-    loggers = tree()
-    fmt = logging.Formatter(fmt=format_string)
+    global _formatted
+    fmt = _get_formatter(format_string)
+    logger_dict = _logger_dict()
+    logging.basicConfig(format=format_string)
+
+    with _lock:
+        position = len(logger_dict.changes)
+        previous = _formatted
+    if only_new and previous is not None and previous[0] == format_string and previous[1] is logger_dict:
+        start = previous[2]
+        names = dict.fromkeys(logger_dict.changes[start:position])
+        loggers = [logger_dict.get(name) for name in names]
+    else:
+        loggers = [logging.root, *list(logger_dict.values())]
 
-    def set_format_for_loggers(node: LoggerNode) -> None:
-        name, logger, children = node
-        if not isinstance(logger, logging.PlaceHolder):
-            for handler in logger.handlers:
+    for logger in loggers:
+        if logger is not None and not isinstance(logger, logging.PlaceHolder):
+            for handler in _handlers(logger):
                 handler.setFormatter(fmt)
+    with _lock:
+        _formatted = (format_string, logger_dict, position)
+    if use_queue:
+        start_queue_logging(maxsize=maxsize, block=block)
 
-        for node in children:
-            set_format_for_loggers(node)
 
-    logging.basicConfig(format=format_string)
-    set_format_for_loggers(loggers)
+class QueueStats(NamedTuple):
+    """Statistics of the logging queue."""
+
+    handled: int
+    dropped: int
+    pending: int
+
+
+_STOP = object()
+# handlers whose emit is writing the formatted record to the stream, it may be done for a batch at once
+_BATCHED_HANDLERS = (logging.StreamHandler, logging.FileHandler)
+
+
+class _QueueListener:
+    """Thread passing queued records to their handlers in batches.
+
+    :param records: queue of records and their handlers
+    :param batch_size: maximum number of records handled before flushing the streams
+    """
+
+    def __init__(self, records: 'queue.Queue[Any]', batch_size: int) -> None:
+        self.queue = records
+        self.batch_size = batch_size
+        self.handled = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._monitor, name='deker_tools.log.queue', daemon=True)
+        self._thread.start()
+
+    def drop(self) -> None:
+        """Count dropped record."""
+        with self._lock:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """Handle the queued records and stop the thread."""
+        self.queue.put(_STOP)
+        self._thread.join()
+
+    @staticmethod
+    def _write(handler: logging.Handler, record: logging.LogRecord) -> bool:
+        """Handle record, write it without flushing the stream if possible.
+
+        Returns if the stream must be flushed.
+
+        :param handler: target handler
+        :param record: prepared record
+        """
+        if record.levelno < handler.level:
+            return False
+        stream = getattr(handler, 'stream', None)
+        if type(handler) not in _BATCHED_HANDLERS or stream is None:
+            handler.handle(record)
+            return False
+        if not handler.filter(record):
+            return False
+        with handler.lock:  # type: ignore[union-attr]
+            try:
+                stream.write(handler.format(record) + handler.terminator)  # type: ignore[attr-defined]
+            except Exception:
+                handler.handleError(record)
+        return True
+
+    def _monitor(self) -> None:
+        """Handle records until stopped."""
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            written: Dict[logging.Handler, None] = {}
+            handled = 0
+            stopped = False
+            for item in batch:
+                if item is _STOP:
+                    stopped = True
+                    continue
+                record, targets = item
+                handled += 1
+                for handler in targets:
+                    try:
+                        if self._write(handler, record):
+                            written[handler] = None
+                    except Exception:
+                        handler.handleError(record)
+            for handler in written:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+            with self._lock:
+                self.handled += handled
+            if stopped:
+                return
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler replacing the handlers of a logger.
+
+    :param records: queue of records and their handlers
+    :param targets: replaced handlers
+    :param listener: listener counting dropped records
+    :param block: wait for free space in the full queue instead of dropping the record
+    """
+
+    def __init__(
+        self, records: 'queue.Queue[Any]', targets: List[logging.Handler], listener: _QueueListener, block: bool
+    ) -> None:
+        super().__init__(records)
+        self.records = records
+        self.targets = targets
+        self.listener = listener
+        self.block = block
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Prepare and queue the record unless none of the handlers would handle its level.
+
+        :param record: logged record
+        """
+        if all(record.levelno < handler.level for handler in self.targets):
+            return
+        super().emit(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put prepared record to the queue with its handlers.
+
+        :param record: prepared record
+        """
+        if self.block:
+            self.records.put((record, self.targets))
+            return
+        try:
+            self.records.put_nowait((record, self.targets))
+        except queue.Full:
+            self.listener.drop()
+
+
+# listener and the queue handlers of the loggers
+_queue_state: Optional[Tuple[_QueueListener, Dict[logging.Logger, _QueueHandler], bool]] = None
+_queue_lock = threading.Lock()
+_atexit_registered = False
+
+
+def start_queue_logging(maxsize: int = 10000, block: bool = False, batch_size: int = 100) -> None:
+    """Move handlers of all loggers behind a bounded queue handled by a background thread.
+
+    Logging calls only format the message and put the record to the queue, records below the levels of all
+    the handlers are not queued at all. The handlers run in the background thread and flush the streams once
+    per batch. If the queue is full, the record is dropped and counted unless ``block`` is set. Calling it again
+    moves handlers added since then, the queue is stopped at exit.
+
+    :param maxsize: maximum number of queued records
+    :param block: wait for free space in the full queue instead of dropping records
+    :param batch_size: maximum number of records written before flushing the streams
+    """
+    global _queue_state, _atexit_registered
+    if maxsize < 1 or batch_size < 1:
+        raise ValueError(f"Invalid queue size {maxsize} or batch size {batch_size}")
+    with _queue_lock:
+        if _queue_state is None:
+            _queue_state = (_QueueListener(queue.Queue(maxsize), batch_size), {}, block)
+        listener, queue_handlers, block = _queue_state
+        loggers = [logging.root, *list(_logger_dict().values())]
+        with logging._lock:  # type: ignore[attr-defined]
+            for logger in loggers:
+                if not isinstance(logger, logging.Logger):
+                    continue
+                handlers = [handler for handler in logger.handlers if not isinstance(handler, _QueueHandler)]
+                if not handlers:
+                    continue
+                queue_handler = queue_handlers.get(logger)
+                if queue_handler is None:
+                    queue_handler = queue_handlers[logger] = _QueueHandler(listener.queue, [], listener, block)
+                queue_handler.targets.extend(handlers)
+                logger.handlers = [queue_handler]
+        if not _atexit_registered:
+            atexit.register(stop_queue_logging)
+            _atexit_registered = True
+
+
+def stop_queue_logging() -> None:
+    """Handle the queued records, stop the queue and put the handlers back."""
+    global _queue_state
+    with _queue_lock:
+        if _queue_state is None:
+            return
+        listener, queue_handlers, _ = _queue_state
+        _queue_state = None
+        with logging._lock:  # type: ignore[attr-defined]
+            for logger, queue_handler in queue_handlers.items():
+                handlers = []
+                for handler in logger.handlers:
+                    handlers.extend(queue_handler.targets if handler is queue_handler else [handler])
+                logger.handlers = handlers
+    listener.stop()
+
+
+def queue_logging_stats() -> Optional[QueueStats]:
+    """Get statistics of the logging queue, ``None`` if it is not started."""
+    state = _queue_state
+    if state is None:
+        return None
+    listener = state[0]
+    return QueueStats(listener.handled, listener.dropped, listener.queue.qsize())
+
+
+class FilterStats(NamedTuple):
+    """Statistics of a suppressing filter."""
+
+    passed: int
+    suppressed: int
+
+
+class _SuppressingFilter(logging.Filter):
+    """Filter keeping the state of every logger or message template.
+
+    Passed records get ``suppressed`` attribute with the number of records suppressed
+    for their key since the previous passed one. Counters are not locked, so they may be
+    slightly off if the same key is logged from several threads.
+
+    Up to ``maxkeys`` keys are tracked, the ones whose records passed least recently are forgotten first,
+    so their next record passes as if it was the first one. Their counters are kept in ``stats``.
+
+    :param key: ``'logger'`` to group records by logger name, ``'message'`` by message template
+    :param maxkeys: maximum number of tracked keys
+    """
+
+    def __init__(self, key: str = 'logger', maxkeys: int = 10000) -> None:
+        super().__init__()
+        if key not in ('logger', 'message'):
+            raise ValueError(f"Invalid filter key {key!r}, expected 'logger' or 'message'")
+        if maxkeys < 1:
+            raise ValueError(f"Invalid maxkeys {maxkeys}")
+        self.key = key
+        self.maxkeys = maxkeys
+        self._attr = 'name' if key == 'logger' else 'msg'
+        # key -> [state, suppressed since the last passed record, passed, suppressed before],
+        # in the order of the last passed records
+        self._states: OrderedDict = OrderedDict()
+        # passed and suppressed records of the forgotten keys
+        self._forgotten = [0, 0]
+
+    @property
+    def stats(self) -> FilterStats:
+        """Count passed and suppressed records."""
+        states = list(self._states.values())
+        passed = sum(state[2] for state in states) + self._forgotten[0]
+        suppressed = sum(state[3] + state[1] for state in states) + self._forgotten[1]
+        return FilterStats(passed, suppressed)
+
+    def reset(self) -> None:
+        """Forget the state and the counters."""
+        self._states = OrderedDict()
+        self._forgotten = [0, 0]
+
+    def _add(self, key: Any, state: List[Any]) -> List[Any]:
+        """Track new key, forget the least recently passed ones above the limit.
+
+        :param key: logger name or message template
+        :param state: initial state of the key
+        """
+        states = self._states
+        states[key] = state
+        while len(states) > self.maxkeys:
+            try:
+                _, forgotten = states.popitem(last=False)
+            except KeyError:
+                break
+            self._forgotten[0] += forgotten[2]
+            self._forgotten[1] += forgotten[3] + forgotten[1]
+        return state
+
+    def _pass(self, record: logging.LogRecord, key: Any, state: List[Any]) -> bool:
+        """Count passed record.
+
+        :param record: log record
+        :param key: its logger name or message template
+        :param state: state of its key
+        """
+        record.suppressed = state[1]
+        state[3] += state[1]
+        state[1] = 0
+        state[2] += 1
+        try:
+            self._states.move_to_end(key)
+        except KeyError:
+            # forgotten by another thread
+            pass
+        return True
+
+
+class RateLimitFilter(_SuppressingFilter):
+    """Token bucket limiting the rate of records per logger or message template.
+
+    Up to ``burst`` records pass at once, then one record per ``1 / rate`` seconds. Bucket is kept
+    as the time when the next record may pass, computed from ``record.created``, so a suppressed
+    record costs a single comparison::
+
+        >>> log_filter = RateLimitFilter(rate=1, burst=2)
+        >>> logger = logging.getLogger('deker_tools.doctest.rate')
+        >>> logger.addHandler(logging.NullHandler())
+        >>> logger.addFilter(log_filter)
+        >>> for chunk in range(100):
+        ...     logger.warning('chunk %s is missing', chunk)
+        >>> log_filter.stats
+        FilterStats(passed=2, suppressed=98)
+
+    :param rate: records per second
+    :param burst: records which may pass at once
+    :param key: ``'logger'`` to limit records of every logger, ``'message'`` of every message template
+    :param maxkeys: maximum number of tracked keys
+    """
+
+    def __init__(self, rate: float, burst: int = 1, key: str = 'logger', maxkeys: int = 10000) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid rate {rate} or burst {burst}")
+        super().__init__(key, maxkeys)
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1 / rate
+        self._tolerance = (burst - 1) / rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Check if the record may pass.
+
+        :param record: log record
+        """
+        key = getattr(record, self._attr)
+        state = self._states.get(key)
+        if state is not None and record.created < state[0]:
+            state[1] += 1
+            return False
+        if state is None:
+            state = self._add(key, [-math.inf, 0, 0, 0])
+        state[0] = max(state[0], record.created - self._tolerance) + self._interval
+        return self._pass(record, key, state)
+
+
+class SamplingFilter(_SuppressingFilter):
+    """Filter passing every ``n``-th record per logger or message template.
+
+    The first record of every logger or message template passes::
+
+        >>> log_filter = SamplingFilter(10)
+        >>> logger = logging.getLogger('deker_tools.doctest.sampling')
+        >>> logger.addHandler(logging.NullHandler())
+        >>> logger.addFilter(log_filter)
+        >>> for chunk in range(100):
+        ...     logger.warning('chunk %s is missing', chunk)
+        >>> log_filter.stats
+        FilterStats(passed=10, suppressed=90)
+
+    :param n: pass one record of every ``n``
+    :param key: ``'logger'`` to sample records of every logger, ``'message'`` of every message template
+    :param maxkeys: maximum number of tracked keys
+    """
+
+    def __init__(self, n: int, key: str = 'logger', maxkeys: int = 10000) -> None:
+        if n < 1:
+            raise ValueError(f"Invalid sampling {n}")
+        super().__init__(key, maxkeys)
+        self.n = n
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Check if the record may pass.
+
+        :param record: log record
+        """
+        key = getattr(record, self._attr)
+        state = self._states.get(key)
+        if state is not None and state[0]:
+            state[0] -= 1
+            state[1] += 1
+            return False
+        if state is None:
+            state = self._add(key, [0, 0, 0, 0])
+        state[0] = self.n - 1
+        return self._pass(record, key, state)
+
+
+def _loggers(node: Optional[LoggerNode]) -> Iterator[logging.Logger]:
+    """Iterate over loggers of a tree, placeholders are skipped.
+
+    :param node: root node of the tree, the whole tree if ``None``
+    :yield: loggers of the tree
+    """
+    nodes = [tree() if node is None else node]
+    while nodes:
+        name, logger, children = nodes.pop()
+        if isinstance(logger, logging.Logger):
+            yield logger
+        nodes.extend(children)
+
+
+def install_filter(log_filter: Any, node: Optional[LoggerNode] = None) -> int:
+    """Add a filter to every logger of the tree.
+
+    Filters of a logger are not applied to the records propagated from its children, so the filter
+    is added to every logger. Returns the number of loggers the filter was added to.
+
+    :param log_filter: filter, e.g. ``RateLimitFilter`` or ``SamplingFilter``
+    :param node: node of ``tree()`` to start from, the whole tree if ``None``
+    """
+    count = 0
+    for logger in _loggers(node):
+        if log_filter not in logger.filters:
+            logger.addFilter(log_filter)
+            count += 1
+    return count
+
+
+def uninstall_filter(log_filter: Any, node: Optional[LoggerNode] = None) -> None:
+    """Remove a filter from every logger of the tree.
+
+    :param log_filter: filter added with ``install_filter``
+    :param node: node of ``tree()`` to start from, the whole tree if ``None``
+    """
+    for logger in _loggers(node):
+        logger.removeFilter(log_filter)
@@ -0,0 +1,402 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import errno
+import os
+import stat
+import sys
+import threading
+import time
+import typing
+
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from deker_tools.data import convert_size_to_human
+
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+__all__ = [
+    "is_empty",
+    "is_path_valid",
+    "validate_paths",
+    "PathValidator",
+    "PathCacheInfo",
+    "scan_tree",
+    "DirStats",
+]
+
+Pathlike = Union[Path, str]
+
+
+def is_empty(path: Pathlike) -> bool:
+    """Check if directory is empty.
+
+    :param path: Path to check
+    """
+    if isinstance(path, Path):
+        path = str(path)
+
+    if not os.path.isdir(path):
+        raise IsADirectoryError(f"Path {path} is not a directory")
+
+    with os.scandir(path) as iterator:
+        if any(iterator):
+            return False
+    return True
+
+
+def is_path_valid(path: Pathlike) -> None:
+    """Check if directory path is valid.
+
+    :param path: path to a directory
+    """
+    if isinstance(path, Path):
+        path = str(path)
+
+    if os.path.exists(path):
+        if not os.path.isdir(path):
+            raise IsADirectoryError(f"Path {path} is not a directory")
+
+    _, path = os.path.splitdrive(path)
+    root_dirname = os.environ.get("HOMEDRIVE", "C:") if sys.platform == "win32" else os.path.sep
+    if not os.path.isdir(root_dirname):
+        raise IsADirectoryError(f"Path {root_dirname} is not a directory")
+    root_dirname = root_dirname.rstrip(os.path.sep) + os.path.sep
+    for part in path.split(os.path.sep):
+        try:
+            os.lstat(root_dirname + part)
+        except OSError as exc:
+            if _is_invalid_name_error(exc):
+                raise
+
+
+def _is_invalid_name_error(exc: OSError) -> bool:
+    """Check if path component lstat error means the name itself is invalid.
+
+    :param exc: lstat error
+    """
+    if hasattr(exc, "winerror"):
+        return exc.winerror == 123
+    return exc.errno in {errno.ENAMETOOLONG, errno.ERANGE}
+
+
+class PathCacheInfo(NamedTuple):
+    """Statistics of a ``PathValidator`` cache."""
+
+    hits: int
+    syscalls: int
+    currsize: int
+
+
+class PathValidator:
+    """Validates many paths as ``is_path_valid`` does, caching the results of its syscalls for a while.
+
+    ``is_path_valid`` stats the whole path and lstats the root joined with every path component,
+    so results of the components are shared by all the paths containing them. Each result is reused
+    for ``ttl`` seconds, expired results are dropped as new ones are stored, the validator is thread safe.
+
+    :param ttl: seconds to reuse syscall results for
+    :param maxsize: maximum amount of cached results of every syscall, the oldest ones are dropped first
+    """
+
+    def __init__(self, ttl: float = 1.0, maxsize: int = 65536) -> None:
+        if ttl < 0:
+            raise ValueError(f"Invalid ttl: {ttl}")
+        if maxsize < 1:
+            raise ValueError(f"Invalid maxsize: {maxsize}")
+        self._ttl = ttl
+        self._maxsize = maxsize
+        # syscall target: expiration time and result, in the order of expiration
+        self._stats: OrderedDict = OrderedDict()
+        self._components: OrderedDict = OrderedDict()
+        self._hits = 0
+        self._syscalls = 0
+        self._lock = threading.Lock()
+
+    def _store(self, cache: OrderedDict, key: str, result: object, now: float) -> None:
+        """Cache syscall result, drop the expired ones and the oldest ones above the limit.
+
+        Results are stored with the same ttl, so the first ones expire first. Must be called under the lock.
+
+        :param cache: cache of the syscall
+        :param key: syscall target
+        :param result: syscall result
+        :param now: current monotonic time
+        """
+        cache.pop(key, None)
+        cache[key] = (now + self._ttl, result)
+        while cache and (len(cache) > self._maxsize or next(iter(cache.values()))[0] <= now):
+            cache.popitem(last=False)
+
+    def _stat(self, path: str, now: float) -> Optional[os.stat_result]:
+        """Get cached ``os.stat`` result, ``None`` for a missing path.
+
+        :param path: path to stat
+        :param now: current monotonic time
+        """
+        with self._lock:
+            cached = self._stats.get(path)
+            if cached is not None and cached[0] > now:
+                self._hits += 1
+                return cached[1]
+            self._syscalls += 1
+        try:
+            result: Optional[os.stat_result] = os.stat(path)
+        except (OSError, ValueError):
+            result = None
+        with self._lock:
+            self._store(self._stats, path, result, now)
+        return result
+
+    def _check_component(self, path: str, now: float) -> Optional[Exception]:
+        """Get cached error ``is_path_valid`` raises for the root joined with a path component.
+
+        :param path: root joined with the component
+        :param now: current monotonic time
+        """
+        with self._lock:
+            cached = self._components.get(path)
+            if cached is not None and cached[0] > now:
+                self._hits += 1
+                return cached[1]
+            self._syscalls += 1
+        error: Optional[Exception] = None
+        try:
+            os.lstat(path)
+        except OSError as exc:
+            if _is_invalid_name_error(exc):
+                error = exc
+        except ValueError as exc:
+            error = exc
+        with self._lock:
+            self._store(self._components, path, error, now)
+        return error
+
+    def check(self, path: Pathlike) -> Optional[Exception]:
+        """Get the error ``is_path_valid`` would raise for the path, ``None`` if it is valid.
+
+        :param path: path to a directory
+        """
+        path = str(path)
+        now = time.monotonic()
+        result = self._stat(path, now)
+        if result is not None and not stat.S_ISDIR(result.st_mode):
+            return IsADirectoryError(f"Path {path} is not a directory")
+
+        _, path = os.path.splitdrive(path)
+        root_dirname = os.environ.get("HOMEDRIVE", "C:") if sys.platform == "win32" else os.path.sep
+        root = self._stat(root_dirname, now)
+        if root is None or not stat.S_ISDIR(root.st_mode):
+            return IsADirectoryError(f"Path {root_dirname} is not a directory")
+        root_dirname = root_dirname.rstrip(os.path.sep) + os.path.sep
+        for part in path.split(os.path.sep):
+            error = self._check_component(root_dirname + part, now)
+            if error is not None:
+                return error
+        return None
+
+    def validate(self, path: Pathlike) -> None:
+        """Check if directory path is valid, raise as ``is_path_valid`` does.
+
+        :param path: path to a directory
+        """
+        error = self.check(path)
+        if error is not None:
+            raise error
+
+    def validate_paths(self, paths: Iterable[Pathlike]) -> List[Optional[Exception]]:
+        """Check many paths.
+
+        :param paths: paths to directories
+        """
+        return [self.check(path) for path in paths]
+
+    def cache_info(self) -> PathCacheInfo:
+        """Get cache statistics."""
+        with self._lock:
+            return PathCacheInfo(self._hits, self._syscalls, len(self._stats) + len(self._components))
+
+    def cache_clear(self) -> None:
+        """Drop cached results and statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._components.clear()
+            self._hits = self._syscalls = 0
+
+
+def validate_paths(paths: Iterable[Pathlike], ttl: float = 1.0) -> List[Optional[Exception]]:
+    """Check many directory paths as ``is_path_valid`` does, sharing syscall results between them.
+
+    Returns the error ``is_path_valid`` would raise for every path, ``None`` for the valid ones::
+
+        >>> [error is None for error in validate_paths([".", "a" * 1000, __file__])]
+        [True, False, False]
+
+    :param paths: paths to directories
+    :param ttl: seconds to reuse syscall results for
+    """
+    return PathValidator(ttl).validate_paths(paths)
+
+
+class DirStats(NamedTuple):
+    """Aggregates of the files right in a directory, subdirectories are reported separately.
+
+    :param path: path to the directory
+    :param depth: depth below the scanned directory, which is 0
+    :param size: total size of the files in bytes
+    :param files: number of the files
+    :param dirs: number of the subdirectories
+    :param newest_mtime: modification time of the newest file, ``None`` if there are no files
+    """
+
+    path: str
+    depth: int
+    size: int
+    files: int
+    dirs: int
+    newest_mtime: Optional[float]
+
+    @property
+    def human_size(self) -> str:
+        """Total size of the files converted with ``convert_size_to_human``."""
+        return convert_size_to_human(self.size)
+
+
+_ScanResult = Tuple[DirStats, List[str], List[OSError], int]
+
+
+def _scan_dir(path: str, depth: int, follow_symlinks: bool) -> _ScanResult:
+    """Aggregate the files of a directory and list its subdirectories.
+
+    Returns stats, subdirectories, errors and the number of scanned entries.
+
+    :param path: path to the directory
+    :param depth: depth of the directory
+    :param follow_symlinks: treat symlinks as their targets
+    """
+    size = files = entries = 0
+    newest: Optional[float] = None
+    subdirs: List[str] = []
+    errors: List[OSError] = []
+    try:
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                entries += 1
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=follow_symlinks):
+                        entry_stat = entry.stat(follow_symlinks=follow_symlinks)
+                        size += entry_stat.st_size
+                        files += 1
+                        if newest is None or entry_stat.st_mtime > newest:
+                            newest = entry_stat.st_mtime
+                except OSError as e:
+                    errors.append(e)
+    except OSError as e:
+        errors.append(e)
+    return DirStats(path, depth, size, files, len(subdirs), newest), subdirs, errors, entries
+
+
+def scan_tree(
+    path: Pathlike,
+    workers: int = 8,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    follow_symlinks: bool = False,
+    onerror: Optional[Callable[[OSError], None]] = None,
+) -> Iterator[DirStats]:
+    """Scan directory tree on a thread pool and stream stats of every directory.
+
+    Directories are scanned with ``os.scandir`` breadth first, up to ``2 * workers`` at once,
+    and yielded as soon as they are scanned, so the order is not deterministic. Only regular files
+    are counted, symlinks are skipped unless ``follow_symlinks`` is set. Closing the iterator stops the scan.
+
+    Sum the stats to get the tree total::
+
+        total = sum(stats.size for stats in scan_tree(path))
+        print(convert_size_to_human(total))
+
+    :param path: path to a directory
+    :param workers: number of threads
+    :param max_depth: do not scan directories deeper than this, the scanned directory is 0
+    :param max_entries: stop after the directory at which this number of scanned entries is reached
+    :param follow_symlinks: scan symlinked directories and count symlinked files, every directory is scanned once
+    :param onerror: called with every ``OSError`` in the consuming thread, errors are ignored by default
+    :yield: stats of every scanned directory
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    path = os.fspath(path)
+    if not os.path.isdir(path):
+        raise IsADirectoryError(f"Path {path} is not a directory")
+    if workers < 1:
+        raise ValueError(f"Invalid workers number: {workers}")
+
+    queue: Deque[Tuple[str, int]] = deque([(path, 0)])
+    seen: Set[Tuple[int, int]] = set()
+    entries = 0
+    with ThreadPoolExecutor(workers, thread_name_prefix="scan_tree") as executor:
+        running: Set["Future[_ScanResult]"] = set()
+        try:
+            while queue or running:
+                while queue and len(running) < 2 * workers:
+                    directory, depth = queue.popleft()
+                    if follow_symlinks:
+                        try:
+                            directory_stat = os.stat(directory)
+                        except OSError as e:
+                            if onerror is not None:
+                                onerror(e)
+                            continue
+                        key = (directory_stat.st_dev, directory_stat.st_ino)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    running.add(executor.submit(_scan_dir, directory, depth, follow_symlinks))
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats, subdirs, errors, scanned = future.result()
+                    if onerror is not None:
+                        for error in errors:
+                            onerror(error)
+                    entries += scanned
+                    yield stats
+                    if max_entries is not None and entries >= max_entries:
+                        return
+                    if max_depth is None or stats.depth < max_depth:
+                        queue.extend((subdir, stats.depth + 1) for subdir in subdirs)
+        finally:
+            for future in running:
+                future.cancel()
@@ -0,0 +1,226 @@
+# deker-tools - shared functions library for deker components
+# Copyright (C) 2023  OpenWeather
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Awaitable versions of the path checks for asyncio services.
+
+Blocking calls run in a bounded thread pool, the number of concurrent calls to every filesystem is limited,
+so a slow network filesystem neither blocks the event loop nor takes up the whole pool.
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Hashable, List, Optional, Tuple, TypeVar
+
+from deker_tools import path as _path
+from deker_tools.path import Pathlike
+
+
+__all__ = ["PathExecutor", "is_empty", "is_path_valid", "scan_dir_entries", "mount_point"]
+
+T = TypeVar("T")
+
+
+def _unescape_mount_point(field: str) -> str:
+    """Decode octal escapes of spaces, tabs and backslashes in the mount table.
+
+    :param field: mount point field of /proc/self/mounts
+    """
+    return field.replace("\\040", " ").replace("\\011", "\t").replace("\\012", "\n").replace("\\134", "\\")
+
+
+# seconds to reuse the mount table for, filesystems may be mounted and unmounted while the process runs
+_MOUNTS_TTL = 10.0
+# expiration time and mount points
+_mounts: Tuple[float, Tuple[str, ...]] = (float("-inf"), ())
+
+
+def _read_mount_points() -> Tuple[str, ...]:
+    """Read mount points from the mount table, the longest first, none if there is no mount table."""
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as mounts:
+            points = {_unescape_mount_point(line.split()[1]) for line in mounts if len(line.split()) > 1}
+    except OSError:
+        return ()
+    return tuple(sorted(points, key=len, reverse=True))
+
+
+def _mount_points() -> Tuple[str, ...]:
+    """Get mount points, the mount table is read again once it is ``_MOUNTS_TTL`` seconds old."""
+    global _mounts
+    expires, points = _mounts
+    now = time.monotonic()
+    if now >= expires:
+        points = _read_mount_points()
+        _mounts = (now + _MOUNTS_TTL, points)
+    return points
+
+
+def mount_point(path: Pathlike) -> str:
+    """Find mount point of the filesystem containing the path without any syscalls on the path.
+
+    Falls back to the drive or the root if the mount table is not available.
+
+    :param path: any path
+    """
+    path = os.path.abspath(path)
+    for point in _mount_points():
+        if path == point or path.startswith(point.rstrip(os.path.sep) + os.path.sep):
+            return point
+    return os.path.splitdrive(path)[0] or os.path.sep
+
+
+class PathExecutor:
+    """Bounded thread pool running blocking path calls with a concurrency limit per filesystem.
+
+    It may be shared by several event loops, the pool is created on the first call.
+
+    :param max_workers: number of threads
+    :param per_filesystem: maximum number of concurrent calls to a filesystem
+    :param filesystem_key: maps path to its filesystem, the mount point by default
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_filesystem: int = 4,
+        filesystem_key: Callable[[str], Hashable] = mount_point,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers}")
+        if per_filesystem < 1:
+            raise ValueError(f"Invalid per_filesystem: {per_filesystem}")
+        self._max_workers = max_workers
+        self._per_filesystem = per_filesystem
+        self._filesystem_key = filesystem_key
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # asyncio semaphores are bound to a loop: loop -> filesystem key -> semaphore
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get thread pool, create it on the first call."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self._max_workers, thread_name_prefix="deker_tools.path.aio")
+            return self._pool
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop, key: Hashable) -> asyncio.Semaphore:
+        """Get filesystem semaphore of the loop.
+
+        :param loop: running event loop
+        :param key: filesystem key
+        """
+        semaphores = self._semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(key)
+        if semaphore is None:
+            semaphore = semaphores[key] = asyncio.Semaphore(self._per_filesystem)
+        return semaphore
+
+    async def run(self, path: Pathlike, func: Callable[..., T], *args: Any) -> T:
+        """Run blocking call accessing the path in the pool.
+
+        :param path: path the call accesses, selects the filesystem limit
+        :param func: blocking callable
+        :param args: positional arguments of the callable
+        """
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop, self._filesystem_key(os.fspath(path))):
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the thread pool down, it is created again on the next call.
+
+        :param wait: wait for the running calls
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_default_executor = PathExecutor()
+
+
+def _get_executor(executor: Optional[PathExecutor]) -> PathExecutor:
+    """Get the executor or the default one.
+
+    :param executor: executor passed by the caller
+    """
+    return _default_executor if executor is None else executor
+
+
+async def is_empty(path: Pathlike, executor: Optional[PathExecutor] = None) -> bool:
+    """Check if directory is empty, see ``deker_tools.path.is_empty``.
+
+    :param path: Path to check
+    :param executor: executor to run the check in, the shared one by default
+    """
+    return await _get_executor(executor).run(path, _path.is_empty, path)
+
+
+async def is_path_valid(path: Pathlike, executor: Optional[PathExecutor] = None) -> None:
+    """Check if directory path is valid, see ``deker_tools.path.is_path_valid``.
+
+    :param path: path to a directory
+    :param executor: executor to run the check in, the shared one by default
+    """
+    await _get_executor(executor).run(path, _path.is_path_valid, path)
+
+
+def _next_batch(iterator: Any, batch_size: int) -> List[os.DirEntry]:
+    """Read the next entries of a scandir iterator.
+
+    :param iterator: scandir iterator
+    :param batch_size: maximum number of entries
+    """
+    return list(itertools.islice(iterator, batch_size))
+
+
+async def scan_dir_entries(
+    path: Pathlike, batch_size: int = 256, executor: Optional[PathExecutor] = None
+) -> AsyncIterator[os.DirEntry]:
+    """Iterate over ``os.scandir`` entries of a directory, reading them in batches in the executor.
+
+    Entry types are known from the directory listing on most filesystems, other ``os.DirEntry``
+    methods may still block::
+
+        async for entry in scan_dir_entries(path):
+            ...
+
+    :param path: path to a directory
+    :param batch_size: number of entries read in one executor call
+    :param executor: executor to run the calls in, the shared one by default
+    :yield: entries of the directory
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch_size: {batch_size}")
+    executor = _get_executor(executor)
+    iterator = await executor.run(path, os.scandir, path)
+    try:
+        while True:
+            batch = await executor.run(path, _next_batch, iterator, batch_size)
+            for entry in batch:
+                yield entry
+            if len(batch) < batch_size:
+                return
+    finally:
+        iterator.close()
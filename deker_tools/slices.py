@@ -16,23 +16,63 @@
 
 import builtins
 import datetime
+import functools
+import itertools
+import math
 import re
-
-from typing import Iterable, List, Optional, Tuple, Union
-
-import numpy as np
-
-from numpy.lib.index_tricks import IndexExpression
-
-
-__all__ = ["match_slice_size", "create_shape_from_slice", "slice_converter", "SliceConversionError"]
+import struct
+import sys
+import threading
+import typing
+
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+    from numpy.lib.index_tricks import IndexExpression
+
+
+__all__ = [
+    "match_slice_size",
+    "create_shape_from_slice",
+    "create_shapes_from_slices",
+    "ShapesBatch",
+    "slice_converter",
+    "SliceConversionError",
+    "CacheInfo",
+    "CompiledSlice",
+    "compose",
+    "intersect",
+    "coalesce_index_exps",
+    "CoalescePlan",
+    "CoalescedIndex",
+    "encode_index",
+    "decode_index",
+    "decode_index_from",
+]
 
 Slice = Union[  # type: ignore[valid-type]
-    IndexExpression, slice, type(Ellipsis), int, Tuple[Union[slice, int, type(Ellipsis), None], ...]
+    "IndexExpression", slice, type(Ellipsis), int, Tuple[Union[slice, int, type(Ellipsis), None], ...]
 ]
 
 FancySlice = Union[  # type: ignore[valid-type]
-    IndexExpression,
+    "IndexExpression",
     slice,
     type(Ellipsis),
     int,
@@ -58,12 +98,88 @@ def match_slice_size(dim_len: int, slice_: Optional[slice] = None) -> Tuple[int,
     return start, stop, step
 
 
-# TODO: [Optimization]
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+# slice bounds which are rendered with str() and need no other type checks
+_PLAIN_BOUND_TYPES = frozenset((int, type(None)))
+
+
+def _is_integer(item: object) -> bool:
+    """Check if item is an integer index (booleans are not).
+
+    :param item: index expression element
+    """
+    if type(item) is int:
+        return True
+    if isinstance(item, int):
+        return not isinstance(item, bool)
+    return _is_numpy_instance(item, "integer")
+
+
+def _is_numpy_instance(item: object, name: str) -> bool:
+    """Check if item is an instance of a NumPy type without importing NumPy.
+
+    If NumPy is not imported yet, there are no NumPy objects to check.
+
+    :param item: object to check
+    :param name: name of the type in ``numpy`` namespace
+    """
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(item, getattr(np, name))
+
+
+def _expand_index_exp(ndim: int, index_exp: Slice) -> List[Union[slice, int, None]]:  # type: ignore[valid-type]
+    """Validate index expression and expand it to the full array dimensionality.
+
+    ``Ellipsis`` is replaced with the necessary amount of full slices, missing trailing dimensions are
+    filled with full slices, ``None`` (``np.newaxis``) is kept in place.
+
+    :param ndim: number of dimensions of the parent array
+    :param index_exp: index expression passed to the array __getitem__ method
+    """
+    items: Tuple[Any, ...] = index_exp if isinstance(index_exp, tuple) else (index_exp,)
+
+    ellipsis_count = 0
+    len_item = 0
+    for item in items:
+        if type(item) is slice or type(item) is int:
+            len_item += 1
+        elif item is Ellipsis:
+            ellipsis_count += 1
+        elif _is_integer(item):
+            len_item += 1
+        elif item is not None:
+            raise IndexError(
+                "Only integers, slices (`:`), ellipsis (`...`) and numpy.newaxis (`None`) are valid indices, "
+                f"got {item!r}"
+            )
+
+    if ellipsis_count > 1:
+        raise IndexError("An index can only have a single ellipsis ('...')")
+    if len_item > ndim:
+        raise IndexError(f"Too many indices for array: array is {ndim}-dimensional, but {len_item} were indexed")
+
+    expanded: List[Union[slice, int, None]] = []
+    fill = [slice(None, None, None)] * (ndim - len_item)
+    for item in items:
+        if item is Ellipsis:
+            expanded.extend(fill)
+            fill = []
+        else:
+            expanded.append(item)
+    expanded.extend(fill)
+    return expanded
+
+
 def create_shape_from_slice(
     array_shape: Tuple[int, ...], index_exp: Slice  # type: ignore[valid-type]
 ) -> Tuple[int, ...]:
     """Calculate shape of a subset from the index expression passed to __getitem__.
 
+    The shape is calculated arithmetically in O(ndim) and follows NumPy basic indexing rules:
+    out of bounds and negative slice bounds are clamped, any non-zero step is allowed,
+    integers drop their dimension and ``None`` (``np.newaxis``) inserts a new one of length 1.
+
     :param array_shape: shape of the parent array
     :param index_exp: index expression passed to the array __getitem__ method
     """
@@ -74,38 +190,168 @@ def create_shape_from_slice(
     ):
         return array_shape
 
-    index_exp: List[Optional[slice]] = list(np.index_exp[index_exp])  # type: ignore[arg-type]
+    shape: List[int] = []
+    dim = 0
+    for item in _expand_index_exp(len(array_shape), index_exp):
+        if item is None:
+            shape.append(1)
+            continue
+        dim_len = array_shape[dim]
+        if isinstance(item, slice):
+            # len() of a range is computed arithmetically, no elements are produced
+            shape.append(len(range(*item.indices(dim_len))))
+        elif not -dim_len <= item < dim_len:
+            raise IndexError(f"Index {item} is out of bounds for axis {dim} with size {dim_len}")
+        dim += 1
+
+    return tuple(shape)
+
+
+class ShapesBatch(NamedTuple):
+    """Result of :func:`create_shapes_from_slices`.
+
+    ``shapes[i, j]`` is the amount of elements selected by the ``i``-th index expression along the ``j``-th
+    dimension of the parent array, ``dropped[i, j]`` is ``True`` if this dimension is indexed with an integer
+    and thus is not present in the subset shape. Rows of the expressions which failed validation are filled
+    with ``-1`` and their exceptions are stored in ``errors`` by expression position.
+    """
 
-    len_item: int = len(index_exp)
-    len_shape: int = len(array_shape)
+    shapes: "np.ndarray"
+    dropped: "np.ndarray"
+    errors: Dict[int, Exception]
 
-    if len_item > len_shape:
-        raise IndexError(f"Too many indices for array: array is {len_shape}-dimensional, but {len_item} were indexed")
+    def shape(self, position: int) -> Tuple[int, ...]:
+        """Get subset shape of the index expression as ``create_shape_from_slice`` would return it.
 
-    if len_item < len_shape:
-        for _ in range(len_shape - len_item):
-            index_exp.append(slice(None, None, None))
+        :param position: position of the index expression in the batch
+        """
+        if position in self.errors:
+            raise self.errors[position]
+        return tuple(int(i) for i in self.shapes[position][~self.dropped[position]])
 
-    exclude: List[int] = []
-    if all(isinstance(i, (slice, type(builtins.Ellipsis), int)) for i in index_exp):
-        for n, i in enumerate(index_exp):  # type: ignore[arg-type]
-            if isinstance(i, slice) and i.step is not None and i.step != 1:
-                raise IndexError("step should be equal to 1")
-            if isinstance(i, type(builtins.Ellipsis)):
-                index_exp[n] = slice(None, None, None)
-            if isinstance(i, int):
-                exclude.append(n)
-        if exclude:
-            exclude.sort()
-            exclude.reverse()
-            for p in exclude:
-                index_exp[p] = None  # type: ignore[union-attr, index]
-    del exclude
-    shape = tuple(
-        len(tuple(range(*match_slice_size(array_shape[i], exp)))) for i, exp in enumerate(index_exp) if exp is not None
-    )
 
-    return shape
+def _int64_column(values: list, ndim: int, errors: Dict[int, Exception]) -> "np.ndarray":
+    """Convert flat list of per-dimension values of the batch into an int64 array.
+
+    Rows containing values which are not int64-compatible integers are reported in ``errors``
+    and get zeros in place of such values.
+
+    :param values: flat list of values, ``ndim`` per index expression
+    :param ndim: number of dimensions of the parent array
+    :param errors: errors by index expression position
+    """
+    import numpy as np
+
+    column = np.array(values)
+    if column.dtype.kind == "i" or column.dtype.kind == "b" or not values:
+        return column.astype(np.int64, copy=False)
+
+    # slow path: find out which rows are broken
+    values = list(values)
+    for n, value in enumerate(values):
+        if not _is_integer(value) and not isinstance(value, (bool, np.bool_)):
+            errors.setdefault(n // ndim, TypeError("slice indices must be integers or None"))
+            values[n] = 0
+        elif not _INT64_MIN <= value <= _INT64_MAX:
+            errors.setdefault(n // ndim, OverflowError(f"Index {value} does not fit into int64"))
+            values[n] = 0
+    return np.array(values, dtype=np.int64)
+
+
+def create_shapes_from_slices(
+    array_shape: Tuple[int, ...], index_exps: Iterable[Slice]  # type: ignore[valid-type]
+) -> ShapesBatch:
+    """Calculate shapes of many subsets of the same array in one vectorized pass.
+
+    Index expressions are flattened into one list and unpacked into start, stop and step arrays,
+    clamping and lengths are computed by NumPy for the whole batch at once.
+    ``None`` (``np.newaxis``) is not supported here. Invalid expressions do not stop the batch,
+    see :class:`ShapesBatch`.
+
+    :param array_shape: shape of the parent array
+    :param index_exps: index expressions passed to the array __getitem__ method
+    """
+    import numpy as np
+
+    ndim = len(array_shape)
+    errors: Dict[int, Exception] = {}
+    full = [slice(None, None, None)] * ndim
+
+    items: list = []
+    count = 0
+    expression: Any
+    for expression in index_exps:
+        # most of the expressions are tuples of ndim slices and integers already
+        if type(expression) is not tuple or len(expression) != ndim or Ellipsis in expression:
+            try:
+                expression = _expand_index_exp(ndim, expression)
+                if len(expression) != ndim:
+                    raise IndexError("np.newaxis (`None`) is not supported in batch calculation")
+            except Exception as e:
+                errors[count] = e
+                expression = full
+        items.extend(expression)
+        count += 1
+
+    kinds = [type(item) for item in items]
+    for n, kind in enumerate(kinds):
+        if kind is not slice and kind is not int:
+            item = items[n]
+            if item is None:
+                errors.setdefault(n // ndim, IndexError("np.newaxis (`None`) is not supported in batch calculation"))
+                items[n], kinds[n] = full[0], slice
+            elif not _is_integer(item):
+                errors.setdefault(n // ndim, IndexError(f"Invalid index {item!r}"))
+                items[n], kinds[n] = full[0], slice
+
+    is_slice = [kind is slice for kind in kinds]
+    starts = [item.start if s else item for item, s in zip(items, is_slice)]
+    stops = [item.stop if s else None for item, s in zip(items, is_slice)]
+    steps = [item.step if s else None for item, s in zip(items, is_slice)]
+
+    shape = (count, ndim)
+    dropped = ~np.array(is_slice, dtype=bool).reshape(shape)
+    start_none = np.array([i is None for i in starts], dtype=bool).reshape(shape)
+    stop_none = np.array([i is None for i in stops], dtype=bool).reshape(shape)
+    start = _int64_column([0 if i is None else i for i in starts], ndim, errors).reshape(shape)
+    stop = _int64_column([0 if i is None else i for i in stops], ndim, errors).reshape(shape)
+    step = _int64_column([1 if i is None else i for i in steps], ndim, errors).reshape(shape)
+    dim_len = np.asarray(array_shape, dtype=np.int64)
+
+    # integers: bounds check, the length is always 1
+    int_invalid = dropped & ((start < -dim_len) | (start >= dim_len))
+    indexes = start
+
+    # slices: the same clamping as slice.indices does
+    step_zero = step == 0
+    step = np.where(step_zero, 1, step)
+    positive = step > 0
+    start = np.where(start < 0, start + dim_len, start)
+    start = np.where(start < 0, np.where(positive, 0, -1), start)
+    start = np.where(start >= dim_len, np.where(positive, dim_len, dim_len - 1), start)
+    start = np.where(start_none, np.where(positive, 0, dim_len - 1), start)
+    stop = np.where(stop < 0, stop + dim_len, stop)
+    stop = np.where(stop < 0, np.where(positive, 0, -1), stop)
+    stop = np.where(stop >= dim_len, np.where(positive, dim_len, dim_len - 1), stop)
+    stop = np.where(stop_none, np.where(positive, dim_len, -1), stop)
+    # -2**63 has no positive int64 counterpart, any step not shorter than the dimension selects one element
+    abs_step = np.abs(np.maximum(step, -_INT64_MAX))
+    distance = np.where(positive, stop - start, start - stop)
+    # ceil(distance / abs_step) without overflowing on large steps
+    shapes = np.where(dropped, 1, np.where(distance > 0, (distance - 1) // abs_step + 1, 0))
+
+    for n in np.flatnonzero(int_invalid.any(axis=1)).tolist():
+        dim = int(np.flatnonzero(int_invalid[n])[0])
+        errors.setdefault(
+            n,
+            IndexError(f"Index {int(indexes[n, dim])} is out of bounds for axis {dim} with size {array_shape[dim]}"),
+        )
+    for n in np.flatnonzero(step_zero.any(axis=1)).tolist():
+        errors.setdefault(n, ValueError("slice step cannot be zero"))
+    if errors:
+        shapes[list(errors)] = -1
+
+    return ShapesBatch(shapes, dropped, errors)
 
 
 class SliceConversionError(Exception):
@@ -144,91 +390,42 @@ class _StringEscape(type):
         return string.strip(cls._string_escape)
 
 
+_ISOSTRING = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:[+-]\d{2}:\d{2})?"
+
+
 class _StringToSliceMixin(type, metaclass=_StringEscape):
     """Converts string to slices."""
 
     # maps default non-numeric slices values
-    _str_to_slice = {"None": None, "": None, "...": ..., "()": ()}
-    _isostring_regex = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?((\+|-)(\d{2}:\d{2}))?)")
+    _str_to_slice = {"None": None, "...": ..., "()": ()}
+    # one match per field: an optional value token followed by a delimiter or the end of the string;
+    # alternatives are tried in order, so "5a" is not an int followed by garbage, but a string,
+    # and the last one accepts any text, so every position of the string is matched
+    _token_pattern = rf"""\s*(?:
+            (?P<int>-?\d+)
+            |(?P<float>-?(?:\d+\.\d*|\.\d+))
+            |-?(?P<escaped>`[^`]*`)
+            |(?P<datetime>{_ISOSTRING})
+            |(?P<constant>None|\.\.\.|\(\))
+            |-?(?P<string>[^\s,:](?:[^,:]*[^\s,:])?)
+        )?\s*(?P<delimiter>[,:]|\Z)"""
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _token_regex() -> "re.Pattern[str]":
+        """Compile tokenizer regex on the first use."""
+        return re.compile(_StringToSliceMixin._token_pattern, re.VERBOSE)
 
     @classmethod
-    def _process_string(cls, string: str) -> Optional[Union[int, float, str, slice]]:
-        """Validate and get value from string.
-
-        :param string: string to be processed
-        """
-        string = string.strip()
-        str_for_check = string
-
-        # try to validate negative numbers
-        if string.startswith("-"):
-            str_for_check = string[1:]
+    def _tokenize(cls, string: str) -> List[Tuple[str, ...]]:
+        """Walk the string once and split it into tokens.
 
-        # check if string is None or ...
-        if str_for_check in cls._str_to_slice:
-            return cls._str_to_slice[string]  # type: ignore[return-value]
+        Every field of the string produces one tuple of ``(int, float, escaped, datetime, constant, string,
+        delimiter)`` where only the matched value token is not empty. Empty delimiter means the end of the string.
 
-        # check if string is empty
-        if str_for_check is False or str_for_check.isspace():
-            return None
-
-        # check if string is integer
-        if str_for_check.isdigit():
-            return int(string)
-
-        # check if string is float
-        if str_for_check.replace(".", "").isdigit():
-            return float(string)
-
-        if isinstance(str_for_check, str):
-            if cls._is_wrapped_with_escape(str_for_check):
-                if str_for_check.count(cls._string_escape) == 2:
-                    str_for_check = cls._unwrap(str_for_check)
-            return str_for_check
-
-        raise TypeError(f"Invalid unit '{string}' type: {type(string)}")
-
-    @classmethod
-    def _convert_str_to_slice(cls, slice_string: str) -> slice:
-        """Convert a slice string to a slice object.
-
-        :param slice_string: slice string to convert
+        :param string: slices string without enclosing brackets
         """
-        slice_parameters = []
-        for i in slice_string.split(":"):
-            pos = cls._process_string(i.strip())
-            slice_parameters.append(pos)
-        return slice(*slice_parameters)
-
-    @classmethod
-    def _parse_datetime(cls, slice_string: str, match_list: list) -> Union[slice, str]:
-        """Parse datetime isostrings and convert them to a slice object.
-
-        :param slice_string: initial slice string to convert
-        :param match_list: list of matched datetime isostrings to convert
-        """
-        slice_string = slice_string.replace(cls._string_escape, "").strip()
-        slice_parameters = [i[0] for i in match_list if i]
-        length = 3
-        slice_parameters_length = len(slice_parameters)
-        if len(slice_parameters) < length:
-            first: str = slice_parameters[0]
-            split_by_time = slice_string.split(first)
-            if len(slice_parameters) == 1 and (
-                len(split_by_time) == 1 or (len(split_by_time) == 2 and all(not s for s in split_by_time))
-            ):
-                return first
-            if not slice_string.startswith(first):
-                split = slice_string.split(first)
-                start = split[0].strip(cls._string_escape).strip(":").strip(cls._string_escape).strip()
-                slice_parameters.insert(0, cls._process_string(start))
-                if split[-1] != split[0]:
-                    step = split[-1].strip(cls._string_escape).strip(":").strip(cls._string_escape).strip()
-                    slice_parameters.append(cls._process_string(step))
-            else:
-                slice_parameters.extend(None for _ in range(length - slice_parameters_length))
-
-        return slice(*slice_parameters)
+        return cls._token_regex().findall(string)
 
     @classmethod
     def _str_to_slices(cls, slice_: str) -> FancySlice:  # type: ignore[valid-type]
@@ -236,28 +433,44 @@ class _StringToSliceMixin(type, metaclass=_StringEscape):
 
         :param slice_: string to convert
         """
-        # split the input string into slice strings and convert each one to a slice object
         if not slice_.startswith("[") or not slice_.endswith("]"):
             raise SliceConversionError(f"Invalid slice string: {slice_}; shall be enclosed in brackets: '[{slice_}]'")
         slices_str_no_brackets: str = slice_[1:-1]
         if not slices_str_no_brackets or slices_str_no_brackets.isspace():
             raise SliceConversionError(f"Invalid slice string: {slice_} is empty")
 
-        slices_str = slices_str_no_brackets.split(",")
-
+        # dimension := field [":" field [":" field]], every field may be empty
         res: list = []
-        for slice_str in slices_str:
-            # check if string is an ordinary string, datetime or slice
-            # ":" may appear both in slices and datetime isostrings
-            if ":" in slice_str:
-                match = re.findall(cls._isostring_regex, slice_str)
-                if match:  # dimension represents datetime
-                    pos = cls._parse_datetime(slice_str, match)  # type: ignore[assignment]
-                else:  # all other dimensions represent any other values except time
-                    pos = cls._convert_str_to_slice(slice_str)  # type: ignore[assignment]
+        fields: list = []
+        for int_, float_, escaped, dt, constant, string, delimiter in cls._tokenize(slices_str_no_brackets):
+            if int_:
+                fields.append(int(int_))
+            elif float_:
+                fields.append(float(float_))
+            elif escaped:
+                fields.append(escaped[1:-1])
+            elif dt:
+                fields.append(dt)
+            elif string:
+                if string == "-" or string.replace(".", "").isdigit():
+                    raise SliceConversionError(f"Invalid slice string: {slice_}; invalid value {string!r}")
+                fields.append(string)
+            elif constant:
+                fields.append(cls._str_to_slice[constant])
             else:
-                pos = cls._process_string(slice_str)  # type: ignore[assignment]
-            res.append(pos)
+                fields.append(None)
+
+            if delimiter == ":":
+                continue
+            if len(fields) == 1:
+                res.append(fields[0])
+            elif len(fields) <= 3:
+                res.append(slice(*fields))
+            else:
+                raise SliceConversionError(f"Invalid slice string: {slice_}; too many ':' in a dimension")
+            if not delimiter:
+                break
+            fields = []
 
         return tuple(res) if len(res) != 1 else res[0]  # type: ignore[no-any-return]
 
@@ -268,57 +481,726 @@ class _SliceToStringMixin(type, metaclass=_StringEscape):
     # maps default non-numeric slices values
     _slice_to_str = {None: ":", ...: "...", (): "()"}
 
+    @classmethod
+    def _slice_unit_to_str(cls, _slice_: Optional[FancySlice]) -> str:  # type: ignore[valid-type]
+        """Convert a slice object to a slice string.
+
+        :param _slice_: slice to convert
+        """
+        if _slice_ is None or _slice_ is Ellipsis:
+            return cls._slice_to_str[_slice_]
+
+        kind = type(_slice_)
+        if kind is int:
+            return str(_slice_)
+        if kind is slice:
+            start, stop, step = _slice_.start, _slice_.stop, _slice_.step
+            if type(start) in _PLAIN_BOUND_TYPES and type(stop) in _PLAIN_BOUND_TYPES:
+                if step is None:
+                    return f"{'' if start is None else start}:{'' if stop is None else stop}"
+                if type(step) is int:
+                    return f"{'' if start is None else start}:{'' if stop is None else stop}:{step}"
+
+        slice_parameters = []
+        if isinstance(_slice_, slice):
+            for attr in ("start", "stop", "step"):
+                el = getattr(_slice_, attr)
+                if isinstance(el, datetime.datetime):
+                    el = cls._wrap_with_escape(el.isoformat())
+                elif isinstance(el, str):
+                    el = cls._wrap_with_escape(el)
+                slice_parameters.append(str(el))
+
+            slice_string = ":".join(slice_parameters).replace("None", "")
+            if slice_string.endswith(":"):
+                slice_string = slice_string[:-1]
+            return slice_string
+
+        if isinstance(_slice_, str):
+            return cls._wrap_with_escape(_slice_)
+        if isinstance(_slice_, (int, float)):
+            return str(_slice_)
+        if isinstance(_slice_, datetime.datetime):
+            return cls._wrap_with_escape(_slice_.isoformat())
+
+        raise TypeError(f"Invalid unit '{_slice_}' type: {type(_slice_)}")
+
     @classmethod
     def _slices_to_str(cls, slice_: Optional[FancySlice]) -> str:  # type: ignore[valid-type]
         """Convert a slice object(s) to a slice string.
 
         :param slice_: slice or slices tuple to convert
         """
-
-        def convert_slice(_slice_: Optional[FancySlice]) -> str:  # type: ignore[valid-type]
-            """Convert a slice object to a slice string.
-
-            :param _slice_: slice to convert
-            """
-            if _slice_ is None or _slice_ is Ellipsis:
-                return cls._slice_to_str[_slice_]
-
-            slice_parameters = []
-            if isinstance(_slice_, slice):
-                for attr in ("start", "stop", "step"):
-                    el = getattr(_slice_, attr)
-                    if isinstance(el, datetime.datetime):
-                        el = cls._wrap_with_escape(el.isoformat())
-                    elif isinstance(el, str):
-                        el = cls._wrap_with_escape(el)
-                    slice_parameters.append(str(el))
-
-                slice_string = ":".join(slice_parameters).replace("None", "")
-                if slice_string.endswith(":"):
-                    slice_string = slice_string[:-1]
-                return slice_string
-
-            if isinstance(_slice_, str):
-                return cls._wrap_with_escape(_slice_)
-            if isinstance(_slice_, (int, float)):
-                return str(_slice_)
-            if isinstance(_slice_, datetime.datetime):
-                return cls._wrap_with_escape(_slice_.isoformat())
-
-            raise TypeError(f"Invalid unit '{_slice_}' type: {type(_slice_)}")
-
         if slice_ == ():
             return f"[{cls._slice_to_str[slice_]}]"
 
-        if isinstance(slice_, Iterable):
-            slice_strs = [convert_slice(sl) for sl in slice_]  # type: ignore[union-attr]
+        if type(slice_) is tuple or (isinstance(slice_, Iterable) and not isinstance(slice_, str)):
+            slice_strs = [cls._slice_unit_to_str(sl) for sl in slice_]  # type: ignore[union-attr]
             return f"[{', '.join(slice_strs)}]"
-        return f"[{convert_slice(slice_)}]"
+        return f"[{cls._slice_unit_to_str(slice_)}]"
+
+
+def _normalize_index_exp(
+    array_shape: Tuple[int, ...], index_exp: Slice  # type: ignore[valid-type]
+) -> List[Union[range, int, None]]:
+    """Resolve index expression against array shape.
+
+    Slices become ranges of the selected positions, integers become non-negative positions,
+    ``None`` (``np.newaxis``) is kept in place.
+
+    :param array_shape: shape of the parent array
+    :param index_exp: index expression passed to the array __getitem__ method
+    """
+    normalized: List[Union[range, int, None]] = []
+    dim = 0
+    for item in _expand_index_exp(len(array_shape), index_exp):
+        if item is None:
+            normalized.append(None)
+            continue
+        dim_len = array_shape[dim]
+        if isinstance(item, slice):
+            normalized.append(range(*item.indices(dim_len)))
+        elif -dim_len <= item < dim_len:
+            normalized.append(int(item) + dim_len if item < 0 else int(item))
+        else:
+            raise IndexError(f"Index {item} is out of bounds for axis {dim} with size {dim_len}")
+        dim += 1
+    return normalized
+
+
+def _range_to_slice(positions: range) -> slice:
+    """Convert range of non-negative positions to slice selecting them.
+
+    :param positions: range of positions
+    """
+    if not positions:
+        return slice(0, 0, 1)
+    stop = positions.stop if positions.stop >= 0 else None
+    return slice(positions.start, stop, positions.step)
+
+
+def compose(
+    outer_index: Slice, inner_index: Slice, array_shape: Tuple[int, ...]  # type: ignore[valid-type]
+) -> Tuple[Union[slice, int, None], ...]:
+    """Compose index expressions of a view and of a view of the view.
+
+    Returns index expression ``index`` such that ``array[outer_index][inner_index]`` equals ``array[index]``.
+    Integer indexes drop their dimensions as NumPy does. It takes O(ndim) and never touches the data::
+
+        >>> import numpy as np
+        >>> compose(np.index_exp[10:90:2, 5], np.index_exp[::-3], (100, 10))
+        (slice(88, 8, -6), 5)
+
+    :param outer_index: index expression of the view
+    :param inner_index: index expression applied to the view
+    :param array_shape: shape of the parent array
+    """
+    outer = _normalize_index_exp(array_shape, outer_index)
+    view_shape = tuple(1 if item is None else len(item) for item in outer if not isinstance(item, int))
+    inner = _normalize_index_exp(view_shape, inner_index)
+
+    composed: List[Union[slice, int, None]] = []
+    position = 0
+    for item in outer:
+        if isinstance(item, int):
+            composed.append(item)
+            continue
+        inner_item = inner[position]
+        while inner_item is None:
+            composed.append(None)
+            position += 1
+            inner_item = inner[position]
+        position += 1
+        if item is not None:
+            selected = item[inner_item if isinstance(inner_item, int) else _range_to_slice(inner_item)]
+            composed.append(selected if isinstance(selected, int) else _range_to_slice(selected))
+        elif isinstance(inner_item, range):
+            if not inner_item:
+                raise IndexError("Empty selection of np.newaxis (`None`) can not be composed")
+            composed.append(None)
+    composed.extend(inner[position:])  # type: ignore[arg-type]
+    return tuple(composed)
+
+
+def _intersect_ranges(a: range, b: range) -> Optional[range]:
+    """Intersect two ranges of non-negative positions.
+
+    Common positions of two arithmetic progressions make an arithmetic progression with the step
+    equal to the least common multiple of theirs, its first position is found with the Chinese remainder theorem.
+
+    :param a: first range
+    :param b: second range
+    """
+    if not a or not b:
+        return None
+    a, b = (a if a.step > 0 else a[::-1]), (b if b.step > 0 else b[::-1])
+    low, high = max(a[0], b[0]), min(a[-1], b[-1])
+    if low > high:
+        return None
+    gcd = math.gcd(a.step, b.step)
+    if (b.start - a.start) % gcd:
+        return None
+    lcm = a.step // gcd * b.step
+    modulus = b.step // gcd
+    common = a.start + a.step * ((b.start - a.start) // gcd * pow(a.step // gcd, -1, modulus) % modulus)
+    first = low + (common - low) % lcm
+    return range(first, high + 1, lcm) if first <= high else None
+
+
+def intersect(
+    index_a: Slice, index_b: Slice, array_shape: Tuple[int, ...]  # type: ignore[valid-type]
+) -> Optional[Tuple[Union[slice, int], ...]]:
+    """Find elements of an array selected by both index expressions.
+
+    Returns index expression selecting the common elements in ascending order or ``None``
+    if there are none. Dimensions indexed with an integer in any expression are dropped as NumPy does,
+    ``None`` (``np.newaxis``) selects nothing and is ignored. It takes O(ndim) and never touches the data::
+
+        >>> import numpy as np
+        >>> intersect(np.index_exp[0:100:4, 3], np.index_exp[::-3, :5], (100, 10))
+        (slice(0, 97, 12), 3)
+        >>> intersect(np.index_exp[0:100:2], np.index_exp[1:100:2], (100,)) is None
+        True
+
+    :param index_a: first index expression
+    :param index_b: second index expression
+    :param array_shape: shape of the parent array
+    """
+    a = [item for item in _normalize_index_exp(array_shape, index_a) if item is not None]
+    b = [item for item in _normalize_index_exp(array_shape, index_b) if item is not None]
+
+    intersection: List[Union[slice, int]] = []
+    for item_a, item_b in zip(a, b):
+        if isinstance(item_a, int) or isinstance(item_b, int):
+            position, other = (item_a, item_b) if isinstance(item_a, int) else (item_b, item_a)
+            if position not in (other if isinstance(other, range) else (other,)):
+                return None
+            intersection.append(position)  # type: ignore[arg-type]
+            continue
+        common = _intersect_ranges(item_a, item_b)  # type: ignore[arg-type]
+        if common is None:
+            return None
+        intersection.append(_range_to_slice(common))
+    return tuple(intersection)
+
+
+class CoalescedIndex(NamedTuple):
+    """Place of a requested index expression in the coalesced reads.
+
+    ``array[plan.reads[item.read]][item.local]`` equals ``array[index_exp]``.
+
+    :param read: position of the read in ``CoalescePlan.reads``
+    :param local: index expression selecting the request from the read result
+    """
+
+    read: int
+    local: Tuple[Union[slice, int, None], ...]
+
+
+class CoalescePlan(NamedTuple):
+    """Result of ``coalesce_index_exps``.
+
+    :param reads: contiguous hyperslabs to read, sorted by their corners
+    :param requests: place of every requested index expression in the reads, in the order of the requests
+    """
+
+    reads: Tuple[Tuple[slice, ...], ...]
+    requests: Tuple[CoalescedIndex, ...]
+
+
+class _Hyperslab:
+    """Bounding box of a group of requests.
+
+    :param low: first position along every dimension
+    :param high: position after the last one along every dimension
+    :param useful: lower bound of the amount of the requested elements, overlaps are counted once
+    :param members: positions of the requests
+    """
+
+    __slots__ = ("low", "high", "useful", "members")
+
+    def __init__(self, low: Tuple[int, ...], high: Tuple[int, ...], useful: int, members: List[int]) -> None:
+        self.low = low
+        self.high = high
+        self.useful = useful
+        self.members = members
+
+
+def _overlap(box: _Hyperslab, other: _Hyperslab, grids: List[Tuple[range, ...]], allowed: float) -> int:
+    """Count elements requested in both boxes, at least as many as there are.
+
+    The volume of the intersection of the boxes is returned if it is within ``allowed``,
+    otherwise common elements of every pair of their requests are summed up.
+
+    :param box: first box
+    :param other: second box
+    :param grids: ascending positions selected by every request along every dimension
+    :param allowed: overlap which needs no precise count
+    """
+    low = tuple(map(max, box.low, other.low))
+    high = tuple(map(min, box.high, other.high))
+    volume = math.prod(max(stop - start, 0) for start, stop in zip(low, high))
+    if volume <= allowed:
+        return volume
+
+    def touching(members: List[int]) -> List[Tuple[range, ...]]:
+        """Get grids of the requests having elements within the common bounds.
+
+        :param members: positions of the requests
+        """
+        return [
+            grid
+            for grid in map(grids.__getitem__, members)
+            if all(
+                positions and positions[0] < stop and positions[-1] >= start
+                for positions, start, stop in zip(grid, low, high)
+            )
+        ]
+
+    total = 0
+    other_grids = touching(other.members)
+    for grid in touching(box.members) if other_grids else ():
+        for other_grid in other_grids:
+            common = 1
+            for positions, other_positions in zip(grid, other_grid):
+                intersection = _intersect_ranges(positions, other_positions)
+                if intersection is None:
+                    common = 0
+                    break
+                common *= len(intersection)
+            total += common
+    return min(total, volume)
+
+
+def _sweep_hyperslabs(
+    hyperslabs: List[_Hyperslab], axis: int, max_waste: float, grids: List[Tuple[range, ...]]
+) -> List[_Hyperslab]:
+    """Merge neighbours along an axis while the merged boxes are wasteful no more than allowed.
+
+    Boxes are sorted by their corners with the axis first, so each one is compared only with the group
+    built so far, which takes O(n log n) for boxes which do not overlap.
+
+    :param hyperslabs: boxes to merge
+    :param axis: dimension to sort by
+    :param max_waste: allowed share of the unrequested elements in a merged box
+    :param grids: positions selected by every request along every dimension
+    """
+    hyperslabs.sort(key=lambda box: box.low[axis:][:1] + box.low)
+    merged = [hyperslabs[0]]
+    for box in itertools.islice(hyperslabs, 1, None):
+        current = merged[-1]
+        low: Tuple[int, ...] = tuple(map(min, current.low, box.low))
+        high: Tuple[int, ...] = tuple(map(max, current.high, box.high))
+        volume = math.prod(stop - start for start, stop in zip(low, high))
+        useful = current.useful + box.useful
+        # overlap of the boxes which still keeps the waste within the limit
+        allowed = useful - (1 - max_waste) * volume
+        if allowed >= 0:
+            # union of the requests is never smaller than any of them
+            useful = max(useful - _overlap(current, box, grids, allowed), current.useful, box.useful)
+        if volume - useful <= max_waste * volume:
+            current.low, current.high, current.useful = low, high, useful
+            current.members.extend(box.members)
+        else:
+            merged.append(box)
+    return merged
+
+
+def coalesce_index_exps(
+    array_shape: Tuple[int, ...], index_exps: Iterable[Slice], max_waste: float = 0.25  # type: ignore[valid-type]
+) -> CoalescePlan:
+    """Merge many index expressions into a few contiguous reads.
+
+    Bounding boxes of the requests are merged greedily while the share of the elements nobody requested
+    stays within ``max_waste`` of every merged read. Each round sorts the boxes along one axis and merges
+    the neighbours, rounds go over the axes until nothing merges, so it takes about O(n log n) per round.
+    Elements requested several times are counted once: overlaps of the requests are subtracted, so the waste
+    is never underestimated, though it may be overestimated for boxes of many overlapping requests.
+    Empty requests are boxes without elements, which merge with any box they touch::
+
+        >>> import numpy as np
+        >>> plan = coalesce_index_exps((100, 100), [np.index_exp[:10, :10], np.index_exp[:10, 10:20], (50, 50)])
+        >>> plan.reads
+        ((slice(0, 10, None), slice(0, 20, None)), (slice(50, 51, None), slice(50, 51, None)))
+        >>> for request in plan.requests:
+        ...     print(request)
+        CoalescedIndex(read=0, local=(slice(0, 10, 1), slice(0, 10, 1)))
+        CoalescedIndex(read=0, local=(slice(0, 10, 1), slice(10, 20, 1)))
+        CoalescedIndex(read=1, local=(0, 0))
+
+    :param array_shape: shape of the array
+    :param index_exps: index expressions passed to the array __getitem__ method, without advanced indexing
+    :param max_waste: allowed share of the unrequested elements in a merged read, from 0 (only boxes
+      which fill each other up are merged) to less than 1
+    """
+    if not 0 <= max_waste < 1:
+        raise ValueError(f"max_waste must be in [0, 1), got {max_waste}")
+    requests = [_normalize_index_exp(array_shape, index_exp) for index_exp in index_exps]
+
+    hyperslabs = []
+    grids: List[Tuple[range, ...]] = []
+    for position, items in enumerate(requests):
+        grids.append(
+            tuple(
+                range(item, item + 1) if isinstance(item, int) else item if item.step > 0 else item[::-1]
+                for item in items
+                if item is not None
+            )
+        )
+        low, high = [], []
+        for dim_len, item in zip(array_shape, (item for item in items if item is not None)):
+            if isinstance(item, int):
+                low.append(item)
+                high.append(item + 1)
+            elif item:
+                low.append(min(item[0], item[-1]))
+                high.append(max(item[0], item[-1]) + 1)
+            else:
+                low.append(min(max(item.start, 0), dim_len))
+                high.append(low[-1])
+        useful = math.prod(len(item) for item in items if isinstance(item, range))
+        hyperslabs.append(_Hyperslab(tuple(low), tuple(high), useful, [position]))
+
+    count = 0
+    while count != len(hyperslabs) and len(hyperslabs) > 1:
+        count = len(hyperslabs)
+        for axis in range(max(len(array_shape), 1)):
+            hyperslabs = _sweep_hyperslabs(hyperslabs, axis, max_waste, grids)
+    hyperslabs.sort(key=lambda box: box.low)
+
+    placed: List[Optional[CoalescedIndex]] = [None] * len(requests)
+    for read, box in enumerate(hyperslabs):
+        for position in box.members:
+            local: List[Union[slice, int, None]] = []
+            dim = 0
+            for item in requests[position]:
+                if item is None:
+                    local.append(None)
+                    continue
+                start = box.low[dim]
+                if isinstance(item, int):
+                    local.append(item - start)
+                elif not item:
+                    local.append(slice(0, 0, 1))
+                else:
+                    first, last = item[0] - start, item[-1] - start
+                    local.append(_range_to_slice(range(first, last + (1 if item.step > 0 else -1), item.step)))
+                dim += 1
+            placed[position] = CoalescedIndex(read, tuple(local))
+    reads = tuple(tuple(map(slice, box.low, box.high)) for box in hyperslabs)
+    return CoalescePlan(reads, tuple(placed))  # type: ignore[arg-type]
+
+
+class CompiledSlice:
+    """Parsed index expression which caches everything that depends on the array shape.
+
+    Use ``slice_converter.compile`` to create it. Instances are immutable, hashable and compared
+    by their canonical string. Shape dependent results are calculated once per distinct array shape.
+    """
+
+    __slots__ = ("_index_exp", "_string", "_plans")
+
+    _index_exp: Any
+    _string: str
+    # shape and bounds by array shape, created on the first use
+    _plans: Optional[Dict[Tuple[int, ...], Tuple[Tuple[int, ...], Tuple[Tuple[int, int, int], ...]]]]
+
+    def __init__(self, index_exp: FancySlice, string: str) -> None:  # type: ignore[valid-type]
+        """Create compiled index expression.
+
+        :param index_exp: parsed index expression
+        :param string: canonical string form of the index expression
+        """
+        object.__setattr__(self, "_index_exp", index_exp)
+        object.__setattr__(self, "_string", string)
+        object.__setattr__(self, "_plans", None)
+
+    @property
+    def index_exp(self) -> FancySlice:  # type: ignore[valid-type]
+        """Parsed index expression."""
+        return self._index_exp
+
+    @property
+    def string(self) -> str:
+        """Canonical string form of the index expression."""
+        return self._string
+
+    def _plan(self, array_shape: Tuple[int, ...]) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, int, int], ...]]:
+        """Get cached shape and bounds for the array shape.
+
+        :param array_shape: shape of the parent array
+        """
+        key = tuple(array_shape)
+        plans = self._plans
+        if plans is None:
+            plans = {}
+            object.__setattr__(self, "_plans", plans)
+        else:
+            plan = plans.get(key)
+            if plan is not None:
+                return plan
+
+        shape = create_shape_from_slice(key, self._index_exp)
+        bounds = tuple(
+            (i.start, i.stop, i.step) if isinstance(i, range) else (i, i + 1, 1)
+            for i in _normalize_index_exp(key, self._index_exp)
+            if i is not None
+        )
+        plan = plans[key] = (shape, bounds)
+        return plan
+
+    def shape(self, array_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Get shape of the subset, see ``create_shape_from_slice``.
+
+        :param array_shape: shape of the parent array
+        """
+        return self._plan(array_shape)[0]
+
+    def bounds(self, array_shape: Tuple[int, ...]) -> Tuple[Tuple[int, int, int], ...]:
+        """Get normalized ``(start, stop, step)`` of the selected positions for every dimension of the array.
+
+        Bounds are clamped to the dimensions and can be passed to ``range`` as is;
+        integer indexes are represented as ``(index, index + 1, 1)``.
+
+        :param array_shape: shape of the parent array
+        """
+        return self._plan(array_shape)[1]
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, key: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> Tuple[type, Tuple[Any, str]]:
+        return type(self), (self._index_exp, self._string)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompiledSlice):
+            return self._string == other._string
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._string)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._string!r})"
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a slice_converter cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+_MISSING = object()
+_IMMUTABLE_TYPES = (int, float, str, type(None), type(Ellipsis), datetime.datetime)
+
+
+class _LRUCache:
+    """Bounded thread-safe LRU cache with hit and miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Create empty cache.
+
+        :param maxsize: maximum amount of stored items
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Get cached value or ``_MISSING``.
+
+        :param key: cache key
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value and evict the least recently used ones above maxsize.
+
+        :param key: cache key
+        :param value: value to store
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Change maxsize evicting the least recently used items if needed.
+
+        :param maxsize: new maximum amount of stored items
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all items and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Get cache statistics."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
+def _is_immutable(value: Any) -> bool:
+    """Check if conversion result may be shared between callers.
+
+    :param value: slice_converter conversion result
+    """
+    if isinstance(value, tuple):
+        return all(_is_immutable(v) for v in value)
+    if isinstance(value, slice):
+        return _is_immutable(value.start) and _is_immutable(value.stop) and _is_immutable(value.step)
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _slice_cache_key(item: Any) -> Hashable:
+    """Make a hashable key of an index expression which is unique for its string representation.
+
+    Raises ``TypeError`` if the expression contains unhashable objects.
+
+    :param item: index expression
+    """
+    kind = type(item)
+    if kind is int:
+        return kind, item
+    if kind is slice:
+        start, stop, step = item.start, item.stop, item.step
+        if type(start) in _PLAIN_BOUND_TYPES and type(stop) in _PLAIN_BOUND_TYPES and type(step) in _PLAIN_BOUND_TYPES:
+            return kind, type(start), start, type(stop), stop, type(step), step
+        return kind, _slice_cache_key(start), _slice_cache_key(stop), _slice_cache_key(step)
+    if kind is tuple:
+        return (kind, *(_slice_cache_key(i) for i in item))
+    if kind is float:
+        # 0.0 == -0.0, but they are rendered differently
+        return kind, item, math.copysign(1.0, item)
+    if isinstance(item, datetime.datetime):
+        # equal datetimes in different timezones are rendered differently
+        return kind, item, item.utcoffset()
+    hash(item)
+    return kind, item
+
+
+def _to_strings_batch(items: List[Any]) -> List[Union[str, SliceConversionError]]:
+    """Convert index expressions to strings, errors are returned in place of the failed items.
+
+    :param items: index expressions
+    """
+    convert, cache, to_str = slice_converter._convert, slice_converter._slice_cache, slice_converter._slices_to_str
+    results: List[Union[str, SliceConversionError]] = []
+    for item in items:
+        try:
+            if type(item) is tuple and item.count(...) > 1:
+                raise IndexError("An index can only have a single ellipsis ('...')")
+            results.append(convert(cache, _slice_cache_key, item, to_str))
+        except Exception as e:
+            results.append(SliceConversionError(e))
+    return results
+
+
+def _from_strings_batch(
+    strings: List[str],
+) -> List[Union[FancySlice, SliceConversionError]]:  # type: ignore[valid-type]
+    """Convert strings to index expressions, errors are returned in place of the failed strings.
+
+    :param strings: slice strings
+    """
+    convert, cache, to_slices = slice_converter._convert, slice_converter._str_cache, slice_converter._str_to_slices
+    results: List[Union[FancySlice, SliceConversionError]] = []  # type: ignore[valid-type]
+    for string in strings:
+        try:
+            if not isinstance(string, str):
+                raise TypeError(f"Slice string expected, got {type(string)}")
+            results.append(convert(cache, str, string, to_slices))
+        except Exception as e:
+            results.append(SliceConversionError(e))
+    return results
+
+
+def _map_batches(
+    func: Callable[[List[Any]], List[Any]], items: Iterable[Any], processes: Optional[int], batch_size: int
+) -> Iterator[Any]:
+    """Lazily apply batch function to items keeping their order.
+
+    :param func: function converting a list of items
+    :param items: items to convert
+    :param processes: amount of worker processes, batches are converted in the current process if ``None``
+    :param batch_size: amount of items sent to a worker at once
+    :yield: converted items in the order of the source ones
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size shall be a positive integer")
+    iterator = iter(items)
+    batches = iter(lambda: list(itertools.islice(iterator, batch_size)), [])
+    if processes is None:
+        for batch in batches:
+            yield from func(batch)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(processes) as executor:
+        # a bounded window of batches keeps workers busy without consuming all the items in advance
+        pending: deque = deque()
+        for batch in batches:
+            pending.append(executor.submit(func, batch))
+            if len(pending) > 2 * processes:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
 
 class _SliceConverter(_SliceToStringMixin, _StringToSliceMixin):
     """Converts slices to string and vice versa. Check slice_converter class for interface."""
 
+    _cache_enabled = True
+    _str_cache = _LRUCache(maxsize=1024)
+    _slice_cache = _LRUCache(maxsize=1024)
+
+    def _convert(
+        cls, cache: _LRUCache, key_func: Callable[[Any], Hashable], item: Any, converter: Callable[[Any], Any]
+    ) -> Any:
+        """Convert item using cache if it is enabled and the item is hashable.
+
+        :param cache: cache of the conversion direction
+        :param key_func: function making cache key from the item
+        :param item: item to convert
+        :param converter: conversion function
+        """
+        if not cls._cache_enabled:
+            return converter(item)
+        try:
+            key = key_func(item)
+        except TypeError:
+            return converter(item)
+
+        value = cache.get(key)
+        if value is _MISSING:
+            value = converter(item)
+            if _is_immutable(value):
+                cache.put(key, value)
+        return value
+
     def __getitem__(cls, item: Union[FancySlice, str]) -> Union[str, FancySlice]:  # type: ignore[valid-type]
         """Call slices_to_str or str_to_slices depending on item type.
 
@@ -328,11 +1210,74 @@ class _SliceConverter(_SliceToStringMixin, _StringToSliceMixin):
             if isinstance(item, tuple) and item.count(...) > 1:
                 raise IndexError("An index can only have a single ellipsis ('...')")
             if isinstance(item, str):
-                return cls._str_to_slices(item)
-            return cls._slices_to_str(item)
+                return cls._convert(cls._str_cache, str, item, cls._str_to_slices)
+            return cls._convert(cls._slice_cache, _slice_cache_key, item, cls._slices_to_str)
         except Exception as e:
             raise SliceConversionError(e)
 
+    def compile(cls, item: Union[FancySlice, str]) -> CompiledSlice:  # type: ignore[valid-type]
+        """Parse index expression once for reuse with arrays of any shape.
+
+        :param item: slice string or index expression
+        """
+        if isinstance(item, str):
+            index_exp = cls[item]
+            return CompiledSlice(index_exp, cls[index_exp])
+        return CompiledSlice(item, cls[item])
+
+    def to_strings(
+        cls, items: Iterable[FancySlice], processes: Optional[int] = None, batch_size: int = 1024  # type: ignore
+    ) -> Iterator[Union[str, SliceConversionError]]:
+        """Lazily convert many index expressions to strings.
+
+        Results are yielded in the order of items, a ``SliceConversionError`` instance is yielded
+        in place of every item which can not be converted, so one bad item does not break the batch.
+
+        :param items: index expressions
+        :param processes: fan out batches to a pool of this many processes; worth it for large uncached batches only
+        :param batch_size: amount of items converted at once
+        """
+        return _map_batches(_to_strings_batch, items, processes, batch_size)
+
+    def from_strings(
+        cls, strings: Iterable[str], processes: Optional[int] = None, batch_size: int = 1024
+    ) -> Iterator[Union[FancySlice, SliceConversionError]]:  # type: ignore[valid-type]
+        """Lazily convert many strings to index expressions.
+
+        Results are yielded in the order of strings, a ``SliceConversionError`` instance is yielded
+        in place of every string which can not be converted, so one bad string does not break the batch.
+
+        :param strings: slice strings
+        :param processes: fan out batches to a pool of this many processes; worth it for large uncached batches only
+        :param batch_size: amount of strings converted at once
+        """
+        return _map_batches(_from_strings_batch, strings, processes, batch_size)
+
+    def configure_cache(cls, maxsize: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+        """Change conversion caches settings.
+
+        :param maxsize: maximum amount of cached conversions per direction
+        :param enabled: turn caches on or off; if turned off, caches are cleared
+        """
+        if maxsize is not None:
+            if maxsize < 1:
+                raise ValueError("Cache maxsize shall be a positive integer")
+            cls._str_cache.resize(maxsize)
+            cls._slice_cache.resize(maxsize)
+        if enabled is not None:
+            _SliceConverter._cache_enabled = enabled
+            if not enabled:
+                cls.cache_clear()
+
+    def cache_clear(cls) -> None:
+        """Clear conversion caches and their statistics."""
+        cls._str_cache.clear()
+        cls._slice_cache.clear()
+
+    def cache_info(cls) -> Dict[str, CacheInfo]:
+        """Get statistics of string to slices and slices to string conversion caches."""
+        return {"str_to_slices": cls._str_cache.info(), "slices_to_str": cls._slice_cache.info()}
+
 
 class slice_converter(object, metaclass=_SliceConverter):  # noqa: N801
     """Converts slices to string and vice versa.
@@ -372,4 +1317,273 @@ class slice_converter(object, metaclass=_SliceConverter):  # noqa: N801
         ('1', '10', '5.2')
         >>> slice_converter['[`1`:`10`:`5.2`]']
         slice('1', '10', '5.2')
+
+    Index expressions used over and over can be compiled
+        >>> compiled = slice_converter.compile("[1:, ..., ::2]")
+        >>> compiled
+        CompiledSlice('[1:, ..., ::2]')
+        >>> compiled.shape((10, 20, 30))
+        (9, 20, 15)
+        >>> compiled.bounds((10, 20, 30))
+        ((1, 10, 1), (0, 20, 1), (0, 30, 2))
+
+    Results of both conversion directions are kept in bounded LRU caches,
+    see ``slice_converter.configure_cache``, ``slice_converter.cache_info`` and ``slice_converter.cache_clear``.
+    """
+
+
+# binary codec: format version and value kinds; a tag byte is the kind in the low nibble and a payload in the high one
+_CODEC_VERSION = 1
+_NONE, _ELLIPSIS, _INT, _FLOAT, _STR, _DATETIME, _AWARE_DATETIME, _SLICE, _TUPLE, _BOOL = range(10)
+# slice tag payload: bits of present (not None) start, stop and step; all of them are integers written as bare varints
+_SLICE_START, _SLICE_STOP, _SLICE_STEP, _SLICE_INTS = 1, 2, 4, 8
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _zigzag(value: int) -> int:
+    """Map signed integer to unsigned: 0, -1, 1, -2, 2... to 0, 1, 2, 3, 4...
+
+    :param value: any integer
+    """
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _encode_varint(value: int, buffer: bytearray) -> None:
+    """Append unsigned integer as a varint.
+
+    :param value: non-negative integer
+    :param buffer: output buffer
+    """
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _encode_tagged(kind: int, value: int, buffer: bytearray) -> None:
+    """Append tag with unsigned integer payload, which follows the tag as a varint if it is too large.
+
+    :param kind: value kind
+    :param value: non-negative integer
+    :param buffer: output buffer
+    """
+    if value < 15:
+        buffer.append(kind | (value + 1) << 4)
+    else:
+        buffer.append(kind)
+        _encode_varint(value, buffer)
+
+
+def _encode_value(value: Any, buffer: bytearray) -> None:
+    """Append tagged index expression element.
+
+    :param value: slice bound or index expression element
+    :param buffer: output buffer
+    """
+    kind = type(value)
+    if kind is int:
+        _encode_tagged(_INT, _zigzag(value), buffer)
+    elif value is None:
+        buffer.append(_NONE)
+    elif kind is slice:
+        start, stop, step = value.start, value.stop, value.step
+        payload = (start is not None) | (stop is not None) << 1 | (step is not None) << 2
+        if type(start) in _PLAIN_BOUND_TYPES and type(stop) in _PLAIN_BOUND_TYPES and type(step) in _PLAIN_BOUND_TYPES:
+            buffer.append(_SLICE | (payload | _SLICE_INTS) << 4)
+            for bound in (start, stop, step):
+                if bound is not None:
+                    _encode_varint(_zigzag(bound), buffer)
+        else:
+            buffer.append(_SLICE | payload << 4)
+            for bound in (start, stop, step):
+                if type(bound) is slice:
+                    raise TypeError("Slice bounds can not be slices")
+                if bound is not None:
+                    _encode_value(bound, buffer)
+    elif value is Ellipsis:
+        buffer.append(_ELLIPSIS)
+    elif kind is bool:
+        _encode_tagged(_BOOL, value, buffer)
+    elif kind is str:
+        encoded = value.encode()
+        _encode_tagged(_STR, len(encoded), buffer)
+        buffer += encoded
+    elif _is_integer(value):
+        _encode_tagged(_INT, _zigzag(int(value)), buffer)
+    elif isinstance(value, float) or _is_numpy_instance(value, "floating"):
+        buffer.append(_FLOAT)
+        buffer += _DOUBLE.pack(value)
+    elif isinstance(value, datetime.datetime):
+        offset = value.utcoffset()
+        if offset is None:
+            buffer.append(_DATETIME)
+            buffer += _INT64.pack((value - _EPOCH) // _MICROSECOND)
+        else:
+            buffer.append(_AWARE_DATETIME)
+            buffer += _INT64.pack((value.replace(tzinfo=None) - offset - _EPOCH) // _MICROSECOND)
+            _encode_varint(_zigzag(offset // _MICROSECOND), buffer)
+    else:
+        raise TypeError(f"Invalid unit '{value}' type: {type(value)}")
+
+
+def encode_index(index_exp: FancySlice) -> bytes:  # type: ignore[valid-type]
+    r"""Encode index expression into compact binary form.
+
+    The format is a version byte and tagged values: integers are zigzag varints, small ones and short lengths
+    are packed into their tags, floats are 8-byte doubles, strings are length-prefixed UTF-8, datetimes are
+    int64 microseconds since epoch in UTC followed by the UTC offset for timezone-aware ones.
+    Lists are encoded as tuples, since ``slice_converter`` converts them to the same strings::
+
+        >>> import numpy as np
+        >>> encode_index(np.index_exp[10:20, 5])
+        b'\x018\xb7\x14(\xb2'
+        >>> decode_index(encode_index(np.index_exp[10:20, 5]))
+        (slice(10, 20, None), 5)
+
+    :param index_exp: anything ``slice_converter`` can convert to string
+    """
+    buffer = bytearray((_CODEC_VERSION,))
+    try:
+        if type(index_exp) is tuple or type(index_exp) is list:
+            items: Sequence[Any] = index_exp
+            _encode_tagged(_TUPLE, len(items), buffer)
+            for item in items:
+                if type(item) is tuple or type(item) is list:
+                    raise TypeError("Nested sequences are not valid index expressions")
+                _encode_value(item, buffer)
+        else:
+            _encode_value(index_exp, buffer)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise SliceConversionError(e)
+    return bytes(buffer)
+
+
+def _decode_varint(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    """Read unsigned varint.
+
+    :param buffer: encoded data
+    :param offset: position of the varint
+    """
+    value = shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _decode_tagged(tag: int, buffer: memoryview, offset: int) -> Tuple[int, int]:
+    """Read unsigned integer payload of a tag.
+
+    :param tag: tag byte
+    :param buffer: encoded data
+    :param offset: position right after the tag
+    """
+    if tag >> 4:
+        return (tag >> 4) - 1, offset
+    return _decode_varint(buffer, offset)
+
+
+def _unzigzag(value: int) -> int:
+    """Revert ``_zigzag``.
+
+    :param value: non-negative integer
+    """
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(buffer: memoryview, offset: int, nested: bool = False) -> Tuple[Any, int]:
+    """Read tagged index expression element.
+
+    :param buffer: encoded data
+    :param offset: position of the element tag
+    :param nested: element is a slice bound
+    """
+    tag = buffer[offset]
+    kind = tag & 0x0F
+    offset += 1
+    if kind == _INT:
+        value, offset = _decode_tagged(tag, buffer, offset)
+        return _unzigzag(value), offset
+    if kind == _SLICE and not nested:
+        payload = tag >> 4
+        bounds: List[Any] = []
+        for bit in (_SLICE_START, _SLICE_STOP, _SLICE_STEP):
+            if not payload & bit:
+                bounds.append(None)
+            elif payload & _SLICE_INTS:
+                value, offset = _decode_varint(buffer, offset)
+                bounds.append(_unzigzag(value))
+            else:
+                value, offset = _decode_value(buffer, offset, nested=True)
+                bounds.append(value)
+        return slice(*bounds), offset
+    if tag == _NONE and not nested:
+        return None, offset
+    if tag == _ELLIPSIS:
+        return Ellipsis, offset
+    if kind == _STR:
+        length, offset = _decode_tagged(tag, buffer, offset)
+        end = offset + length
+        if end > len(buffer):
+            raise ValueError("Truncated string")
+        return str(buffer[offset:end], "utf-8"), end
+    if kind == _BOOL:
+        value, offset = _decode_tagged(tag, buffer, offset)
+        if value > 1:
+            raise ValueError(f"Invalid boolean {value}")
+        return bool(value), offset
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(buffer, offset)[0], offset + _DOUBLE.size
+    if tag == _DATETIME:
+        return _EPOCH + _INT64.unpack_from(buffer, offset)[0] * _MICROSECOND, offset + _INT64.size
+    if tag == _AWARE_DATETIME:
+        utc = _EPOCH + _INT64.unpack_from(buffer, offset)[0] * _MICROSECOND
+        utc_offset, offset = _decode_varint(buffer, offset + _INT64.size)
+        delta = _unzigzag(utc_offset) * _MICROSECOND
+        return (utc + delta).replace(tzinfo=datetime.timezone(delta)), offset
+    raise ValueError(f"Invalid tag {tag} at position {offset - 1}")
+
+
+def decode_index_from(
+    buffer: Union[bytes, bytearray, memoryview], offset: int = 0
+) -> Tuple[FancySlice, int]:  # type: ignore[valid-type]
+    """Decode index expression embedded in a larger buffer without copying it.
+
+    Returns the index expression and the position right after it.
+
+    :param buffer: buffer containing the output of ``encode_index``
+    :param offset: position of the encoded index expression in the buffer
+    """
+    data = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    try:
+        if data[offset] != _CODEC_VERSION:
+            raise ValueError(f"Unsupported codec version {data[offset]}")
+        offset += 1
+        tag = data[offset]
+        if tag & 0x0F != _TUPLE:
+            return _decode_value(data, offset)
+        count, offset = _decode_tagged(tag, data, offset + 1)
+        items = []
+        for _ in range(count):
+            item, offset = _decode_value(data, offset)
+            items.append(item)
+        return tuple(items), offset
+    except (IndexError, ValueError, OverflowError, struct.error) as e:
+        raise SliceConversionError(f"Invalid encoded index expression: {e}")
+
+
+def decode_index(data: Union[bytes, bytearray, memoryview]) -> FancySlice:  # type: ignore[valid-type]
+    """Decode index expression encoded with ``encode_index``.
+
+    :param data: encoded index expression, nothing else
     """
+    index_exp, end = decode_index_from(data)
+    if end != len(data):
+        raise SliceConversionError(f"Invalid encoded index expression: {len(data) - end} trailing bytes")
+    return index_exp
@@ -14,30 +14,208 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import typing
+
 from datetime import datetime, timezone
-from typing import Optional, Union
+from typing import Any, Iterable, Optional, Tuple, Union
+
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+# datetime supports years from 1 to 9999
+_MIN_TIMESTAMP = -62135596800
+_MAX_TIMESTAMP = 253402300800
 
 
 def get_utc(dt: Optional[Union[str, int, float, datetime]] = None) -> datetime:
     """Convert datetime with any timezone or without it to UTC.
 
-    If dt is ``None`` - UTC current time will be returned
+    If dt is ``None`` - UTC current time will be returned.
+    Naive datetimes and iso-strings are considered to be in UTC, timestamps are rounded
+    to microseconds half to even.
 
     :param dt: ``datetime.datetime`` object, timestamp, datetime iso-string or ``None``;
     """
     if dt is None:
-        return datetime.utcnow().replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc)
 
     if isinstance(dt, datetime):
-        dt = dt.isoformat()  # convert any timezone objects to native format
+        dt_object = dt
     elif isinstance(dt, (float, int)):
-        dt = datetime.utcfromtimestamp(dt).isoformat()
+        return datetime.fromtimestamp(dt, timezone.utc)
+    else:
+        dt_object = datetime.fromisoformat(dt)
+
+    if dt_object.utcoffset() is None:
+        return dt_object.replace(tzinfo=timezone.utc)
+    return dt_object.astimezone(timezone.utc)
+
+
+def _timestamps_to_us(array: "np.ndarray") -> "np.ndarray":
+    """Convert epoch seconds to microseconds rounding them as ``get_utc`` does.
+
+    :param array: integer or float array of epoch seconds
+    """
+    import numpy as np
+
+    if array.size and not ((array >= _MIN_TIMESTAMP) & (array < _MAX_TIMESTAMP)).all():
+        raise ValueError("Timestamp is out of datetime range or not finite")
+    if array.dtype.kind in "iu":
+        return array.astype(np.int64) * 1_000_000
+    # the same algorithm as datetime.fromtimestamp uses: round fractional part half to even
+    fraction, whole = np.modf(array.astype(np.float64))
+    return whole.astype(np.int64) * 1_000_000 + np.round(fraction * 1e6).astype(np.int64)
+
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_from_civil(year: "np.ndarray", month: "np.ndarray", day: "np.ndarray") -> "np.ndarray":
+    """Count days since 1970-01-01 of proleptic Gregorian dates.
+
+    :param year: years
+    :param month: months
+    :param day: days of month
+    """
+    import numpy as np
+
+    shifted_year: "np.ndarray" = year - (month <= 2)
+    era = shifted_year // 400
+    year_of_era = shifted_year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _isostrings_to_us(array: "np.ndarray") -> "np.ndarray":
+    """Parse iso-strings with optional ``±HH:MM`` offsets into UTC epoch microseconds.
+
+    All the strings are parsed at once on the ASCII bytes of the array: offsets are cut off,
+    ``YYYY-MM-DD[T ]HH:MM:SS[.fff[fff]]`` fields are read from fixed positions and validated.
+    Only the layout ``datetime.fromisoformat`` accepts on every supported Python version is parsed,
+    so ``Z`` suffixes or other fraction lengths are left to ``get_utc``.
+    Raises ``ValueError`` if some strings have another layout, are invalid or out of range in UTC.
+
+    :param array: flat unicode or bytes array
+    """
+    import numpy as np
+
+    try:
+        ascii_array = array.astype("S")
+    except UnicodeEncodeError:
+        raise ValueError("Non-ASCII iso-string")
+    size, width = ascii_array.size, ascii_array.dtype.itemsize
+    if not size or width < 19:
+        raise ValueError("Iso-strings are too short")
+    chars = np.zeros((size, max(width, 32)), dtype=np.uint8)
+    chars[:, :width] = ascii_array.view(np.uint8).reshape(size, width)
+    lengths = np.count_nonzero(chars, axis=1)
+    rows = np.arange(size)
+
+    def digit(column: Union[int, "np.ndarray"]) -> "np.ndarray":
+        """Get digit values of a column, 255 and less than 10 for other characters.
+
+        :param column: position or positions of the column in every row
+        """
+        values = chars[:, column] if isinstance(column, int) else chars[rows, column]
+        return (values - ord("0")).astype(np.uint8)
+
+    def number(*columns: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Get integer values of consecutive digit columns and mask of the valid ones.
+
+        :param columns: positions of the columns
+        """
+        value, valid = np.zeros(size, dtype=np.int64), np.ones(size, dtype=bool)
+        for column in columns:
+            d = digit(column)
+            valid &= d <= 9
+            value = value * 10 + d
+        return value, valid
+
+    # offsets
+    sign_pos = np.maximum(lengths - 6, 0)
+    sign = chars[rows, sign_pos]
+    hours, valid_hours = number(sign_pos + 1, sign_pos + 2)  # type: ignore[arg-type]
+    minutes, valid_minutes = number(sign_pos + 4, sign_pos + 5)  # type: ignore[arg-type]
+    has_offset = (
+        (lengths >= 25)
+        & ((sign == ord("+")) | (sign == ord("-")))
+        & (chars[rows, sign_pos + 3] == ord(":"))
+        & valid_hours
+        & valid_minutes
+    )
+    offset = np.where(has_offset, np.where(sign == ord("-"), -1, 1) * (hours * 60 + minutes) * 60_000_000, 0)
+    local_length = np.where(has_offset, sign_pos, lengths)
+
+    # local date and time
+    year, valid = number(0, 1, 2, 3)
+    month, valid_month = number(5, 6)
+    day, valid_day = number(8, 9)
+    hour, valid_hour = number(11, 12)
+    minute, valid_minute = number(14, 15)
+    second, valid_second = number(17, 18)
+    valid &= valid_month & valid_day & valid_hour & valid_minute & valid_second
+    valid &= (local_length == 19) | (((local_length == 23) | (local_length == 26)) & (chars[:, 19] == ord(".")))
+    valid &= (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-")) & (chars[:, 13] == ord(":"))
+    valid &= (chars[:, 16] == ord(":")) & ((chars[:, 10] == ord("T")) | (chars[:, 10] == ord(" ")))
+    microseconds = np.zeros(size, dtype=np.int64)
+    for column in range(20, 26):
+        d = digit(column)
+        in_fraction = column < local_length
+        valid &= ~in_fraction | (d <= 9)
+        microseconds = microseconds * 10 + np.where(in_fraction, d, 0)
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array(_DAYS_IN_MONTH)[np.clip(month, 0, 12)] + ((month == 2) & leap)
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    valid &= (hour < 24) & (minute < 60) & (second < 60) & (~has_offset | ((hours < 24) & (minutes < 60)))
+    if not valid.all():
+        raise ValueError("Some iso-strings are invalid or not in YYYY-MM-DDTHH:MM:SS[.fff[fff]][±HH:MM] format")
+
+    seconds = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    result = seconds * 1_000_000 + microseconds - offset
+    if not ((result >= _MIN_TIMESTAMP * 1_000_000) & (result < _MAX_TIMESTAMP * 1_000_000)).all():
+        raise ValueError("Some iso-strings are out of datetime range in UTC")
+    return result
+
+
+def get_utc_array(values: Iterable[Any], as_datetime: bool = False) -> "np.ndarray":
+    """Convert a batch of timestamps, datetimes or iso-strings to UTC.
+
+    Accepts a NumPy array (or any sequence) of epoch seconds, a ``datetime64`` array, which is considered
+    to be in UTC, or iso-strings with mixed offsets; naive iso-strings are considered to be in UTC.
+    Conversion is vectorized, values which can not be converted in bulk (e.g. ``datetime`` objects)
+    fall back to ``get_utc`` one by one. Every element is equal to ``get_utc`` of it.
+
+    :param values: timestamps, ``datetime64`` values, iso-strings or ``datetime`` objects
+    :param as_datetime: return array of timezone-aware ``datetime`` objects instead of ``datetime64[us]``;
+      ``NaT`` values become ``None``
+    """
+    import numpy as np
 
-    dt_object = datetime.fromisoformat(dt)
+    array = np.asarray(values)
+    flat = array.ravel()
+    kind = array.dtype.kind
+    if kind == "M":
+        result = flat.astype("datetime64[us]")
+    elif kind in "iuf":
+        result = _timestamps_to_us(flat).astype("datetime64[us]")
+    else:
+        try:
+            if kind not in "US":
+                raise ValueError("Not an iso-string array")
+            result = _isostrings_to_us(flat).astype("datetime64[us]")
+        except ValueError:
+            utc = (get_utc(v.item() if isinstance(v, np.generic) else v) for v in flat)
+            result = np.array([dt.replace(tzinfo=None) for dt in utc], dtype="datetime64[us]")
 
-    if dt_object.tzinfo is None:
-        dt_object = dt_object.replace(tzinfo=timezone.utc)
-    elif dt_object.tzinfo != timezone.utc:
-        tm = dt_object.timestamp()
-        dt_object = datetime.utcfromtimestamp(tm).replace(tzinfo=timezone.utc)
-    return dt_object
+    result = result.reshape(array.shape)
+    if as_datetime:
+        converted = np.empty(array.shape, dtype=object)
+        converted.ravel()[:] = [
+            None if dt is None else dt.replace(tzinfo=timezone.utc) for dt in result.ravel().tolist()
+        ]
+        return converted
+    return result
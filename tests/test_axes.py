@@ -0,0 +1,338 @@
+import random
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from deker_tools.axes import CoordinateAxis, LabelAxis, TimeAxis, resolve_index_exp
+from deker_tools.slices import create_shape_from_slice, slice_converter
+
+
+START = datetime(2023, 1, 1)
+HOUR = timedelta(hours=1)
+REGULAR = TimeAxis(START, HOUR, 48)
+IRREGULAR = TimeAxis(values=[START + timedelta(minutes=m) for m in (0, 5, 60, 61, 300, 1440, 2000, 2881)])
+
+
+@pytest.mark.parametrize(
+    ("axis", "item", "expected"),
+    [
+        (REGULAR, START, 0),
+        (REGULAR, "2023-01-01T05:00:00", 5),
+        (REGULAR, "2023-01-01T05:00:00+02:00", 3),
+        (REGULAR, datetime(2023, 1, 2, 1, tzinfo=timezone(timedelta(hours=-1))), 26),
+        (REGULAR, START.replace(tzinfo=timezone.utc).timestamp(), 0),
+        (REGULAR, 7, 7),
+        (REGULAR, -1, -1),
+        (REGULAR, None, None),
+        (REGULAR, ..., ...),
+        (REGULAR, slice(None), slice(None)),
+        (REGULAR, slice("2023-01-01T06:00:00", "2023-01-01T12:00:00"), slice(6, 12, None)),
+        (REGULAR, slice("2023-01-01T06:30:00", "2023-01-01T12:30:00"), slice(7, 13, None)),
+        (REGULAR, slice("2022-12-01T00:00:00", "2024-01-01T00:00:00"), slice(0, 48, None)),
+        (REGULAR, slice("2024-01-01T00:00:00", None), slice(48, None, None)),
+        (REGULAR, slice(START, 10, timedelta(hours=3)), slice(0, 10, 3)),
+        (REGULAR, slice("2023-01-01T05:00:00", None, timedelta(hours=-2)), slice(5, None, -2)),
+        (REGULAR, slice("2023-01-01T05:30:00", "2023-01-01T01:00:00", -1), slice(5, 1, -1)),
+        (REGULAR, slice("2022-01-01T05:30:00", None, -1), slice(0, 0, -1)),
+        (IRREGULAR, "2023-01-01T01:01:00", 3),
+        (IRREGULAR, slice("2023-01-01T00:01:00", "2023-01-02T00:00:00"), slice(1, 5, None)),
+        (IRREGULAR, slice("2023-01-01T00:01:00", "2023-01-02T00:00:01"), slice(1, 6, None)),
+        (IRREGULAR, slice(None, "2023-01-01T01:00:00", 2), slice(None, 2, 2)),
+    ],
+)
+def test_time_axis_resolve(axis, item, expected):
+    assert axis.resolve(item) == expected
+
+
+@pytest.mark.parametrize("axis", [REGULAR, IRREGULAR])
+def test_time_axis_resolve_matches_values(axis):
+    rnd = random.Random(0)
+    values = axis.values
+    for _ in range(2000):
+        start, stop = (START + timedelta(minutes=rnd.randint(-120, 3000)) for _ in range(2))
+        step = rnd.choice([None, 1, 2, -1, -3])
+        selected = values[axis.resolve(slice(start, stop, step))]
+        if step is None or step > 0:
+            expected = values[(values >= np.datetime64(start)) & (values < np.datetime64(stop))][:: step or 1]
+        else:
+            expected = values[(values <= np.datetime64(start)) & (values > np.datetime64(stop))][::-1][::-step]
+        assert np.array_equal(selected, expected)
+
+
+def test_time_axis_feeds_create_shape_from_slice():
+    axis = TimeAxis("2023-01-01T00:00:00", timedelta(hours=3), 2920)
+    item = slice_converter["[`2023-02-01T00:00:00`:`2023-03-01T00:00:00`, 10:20]"]
+    shape = create_shape_from_slice((len(axis), 100), (axis.resolve(item[0]), item[1]))
+    assert shape == (28 * 8, 10)
+
+
+def test_time_axis_properties():
+    assert len(REGULAR) == 48
+    assert REGULAR.is_regular and not IRREGULAR.is_regular
+    assert REGULAR.start == START.replace(tzinfo=timezone.utc)
+    assert REGULAR.step == HOUR and IRREGULAR.step is None
+    assert REGULAR.values[-1] == np.datetime64("2023-01-02T23:00:00")
+    assert TimeAxis.from_values(REGULAR.values).resolve(slice("2023-01-01T06:00:00", None)) == slice(6, None, None)
+    assert TimeAxis(values=[]).start is None
+    assert repr(IRREGULAR) == "TimeAxis(values=<8 points>)"
+
+
+@pytest.mark.parametrize(
+    ("axis", "item", "exception"),
+    [
+        (REGULAR, "2023-01-01T05:30:00", IndexError),
+        (REGULAR, "2024-01-01T00:00:00", IndexError),
+        (IRREGULAR, "2023-01-01T00:01:00", IndexError),
+        (REGULAR, "yesterday", ValueError),
+        (REGULAR, slice(None, None, timedelta(minutes=90)), ValueError),
+        (REGULAR, slice(None, None, "1h"), TypeError),
+        (IRREGULAR, slice(None, None, HOUR), ValueError),
+    ],
+)
+def test_time_axis_resolve_raises(axis, item, exception):
+    with pytest.raises(exception):
+        axis.resolve(item)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"start": START, "step": HOUR},
+        {"start": START, "step": timedelta(0), "size": 1},
+        {"start": START, "step": HOUR, "size": -1},
+        {"start": START, "values": [START]},
+        {"values": [START, START]},
+    ],
+)
+def test_time_axis_invalid(kwargs):
+    with pytest.raises(ValueError):
+        TimeAxis(**kwargs)
+
+
+@pytest.mark.parametrize(
+    ("mode", "item", "expected"),
+    [
+        ("exclusive", slice("2023-01-01T05:30:00", "2023-01-01T08:00:00"), slice(6, 8, None)),
+        ("inclusive", slice("2023-01-01T05:30:00", "2023-01-01T08:00:00"), slice(6, 9, None)),
+        ("nearest", slice("2023-01-01T05:30:00", "2023-01-01T08:10:00"), slice(5, 9, None)),
+        ("nearest", "2023-01-01T05:31:00", 6),
+        ("nearest", "2022-01-01T00:00:00", 0),
+        ("inclusive", slice("2023-01-01T08:00:00", "2023-01-01T05:30:00", -1), slice(8, 5, -1)),
+        ("inclusive", slice("2023-01-01T08:00:00", "2023-01-01T00:00:00", -1), slice(8, None, -1)),
+    ],
+)
+def test_time_axis_modes(mode, item, expected):
+    assert TimeAxis(START, HOUR, 48, mode=mode).resolve(item) == expected
+
+
+LAT = CoordinateAxis(90.0, -0.25, 721)
+LON = CoordinateAxis(0.0, 0.1, 3600)
+LEVELS = CoordinateAxis(values=[1000.0, 925.0, 850.0, 700.0, 500.0, 250.0, 100.0])
+
+
+@pytest.mark.parametrize(
+    ("axis", "item", "expected"),
+    [
+        (LAT, 90.0, 0),
+        (LAT, -90.0, 720),
+        (LAT, 45.25, 179),
+        (LAT, slice(60.0, 30.0), slice(120, 240, None)),
+        (LAT, slice(60.1, 30.0), slice(120, 240, None)),
+        (LAT, slice(None, 89.0, 0.3), None),
+        (LAT, slice(30.0, 60.0, 0.5), slice(240, 120, -2)),
+        (LAT, slice(30.0, 60.0, -0.5), slice(240, 120, 2)),
+        (LAT, slice(-90.0, None, -1), slice(720, None, -1)),
+        (LON, 0.3, 3),
+        (LON, 359.9, 3599),
+        (LON, slice(0.1, 0.9, 0.05), None),
+        (LON, slice(0.1, 0.9, 0.2), slice(1, 9, 2)),
+        (LON, slice(0.1, 0.9), slice(1, 9, None)),
+        (LON, slice(-10.0, 1000.0), slice(0, 3600, None)),
+        (LON, slice(5, 0.9), slice(5, 9, None)),
+        (LEVELS, 850.0, 2),
+        (LEVELS, slice(900.0, 300.0), slice(2, 5, None)),
+        (LEVELS, slice(None, None, -2), slice(None, None, -2)),
+        (LEVELS, slice(300.0, 900.0, -1), slice(4, 1, -1)),
+    ],
+)
+def test_coordinate_axis_resolve(axis, item, expected):
+    if expected is None:
+        with pytest.raises(ValueError, match="multiple"):
+            axis.resolve(item)
+    else:
+        assert axis.resolve(item) == expected
+
+
+def _expected_positions(keys, mode, start, stop, step):
+    """Select positions of sorted keys with a brute force scan."""
+    positions = np.arange(len(keys))
+    if mode == "nearest":
+        first, last = (int(np.argmin(np.abs(keys - bound))) for bound in (start, stop))
+        selected = positions[min(first, last) : max(first, last) + 1]
+        if first > last or (first == last and step < 0):
+            selected = selected[::-1]
+        return selected if first == last or (first < last) == (step > 0) else selected[:0]
+    if step > 0:
+        mask = (keys >= start) & ((keys <= stop) if mode == "inclusive" else (keys < stop))
+        return positions[mask]
+    mask = (keys <= start) & ((keys >= stop) if mode == "inclusive" else (keys > stop))
+    return positions[mask][::-1]
+
+
+@pytest.mark.parametrize("mode", ["exclusive", "inclusive", "nearest"])
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.arange(-10.0, 10.0, 0.5),
+        np.arange(10.0, -10.0, -0.5),
+        np.cumsum(np.random.default_rng(0).uniform(0.1, 2, 50)),
+        -np.cumsum(np.random.default_rng(1).uniform(0.1, 2, 50)),
+    ],
+)
+def test_coordinate_axis_resolve_matches_values(values, mode):
+    rnd = random.Random(0)
+    sign = 1 if values[1] > values[0] else -1
+    axes = [CoordinateAxis(values=values, mode=mode)]
+    if np.allclose(np.diff(values), values[1] - values[0]):
+        axes.append(CoordinateAxis(values[0], values[1] - values[0], len(values), mode=mode))
+    low, high = values.min() - 3, values.max() + 3
+    for _ in range(500):
+        start = rnd.choice(list(values)) if rnd.random() < 0.3 else rnd.uniform(low, high)
+        stop = rnd.uniform(low, high)
+        step = rnd.choice([1, 2, -1, -3])
+        expected = _expected_positions(values * sign, mode, start * sign, stop * sign, step)[:: abs(step)]
+        for axis in axes:
+            selected = np.arange(len(values))[axis.resolve(slice(float(start), float(stop), step))]
+            assert np.array_equal(selected, expected), (axis, start, stop, step)
+
+
+def test_coordinate_axis_properties():
+    assert LAT.is_descending and not LON.is_descending
+    assert (LAT.start, LAT.step, len(LAT)) == (90.0, -0.25, 721)
+    assert LEVELS.start == 1000.0 and LEVELS.step is None
+    assert LAT.values[[0, -1]].tolist() == [90.0, -90.0]
+    assert LEVELS.values.tolist() == [1000.0, 925.0, 850.0, 700.0, 500.0, 250.0, 100.0]
+    assert repr(LON) == "CoordinateAxis(start=0.0, step=0.1, size=3600)"
+    assert CoordinateAxis(0.0, 1.0, 10, tolerance=0.2).index(2.9) == 3
+
+
+@pytest.mark.parametrize(
+    ("axis", "item", "exception"),
+    [
+        (LAT, 45.1, IndexError),
+        (LEVELS, 600.0, IndexError),
+        (LEVELS, slice(None, None, 100.0), ValueError),
+        (LON, "0.5", TypeError),
+        (LON, slice("a", None), TypeError),
+        (CoordinateAxis(values=[], mode="nearest"), 1.0, IndexError),
+    ],
+)
+def test_coordinate_axis_resolve_raises(axis, item, exception):
+    with pytest.raises(exception):
+        axis.resolve(item)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"start": 0.0, "step": 0.0, "size": 10},
+        {"start": 0.0, "step": float("nan"), "size": 10},
+        {"start": 0.0, "step": 1.0},
+        {"values": [1.0, 2.0, 2.0]},
+        {"values": [1.0, 3.0, 2.0]},
+        {"values": [1.0], "mode": "closest"},
+    ],
+)
+def test_coordinate_axis_invalid(kwargs):
+    with pytest.raises(ValueError):
+        CoordinateAxis(**kwargs)
+
+
+VARIABLES = LabelAxis(["temperature", "humidity", "pressure", "wind"])
+
+
+@pytest.mark.parametrize(
+    ("mode", "item", "expected"),
+    [
+        ("exclusive", "pressure", 2),
+        ("exclusive", 3, 3),
+        ("exclusive", slice("humidity", "wind"), slice(1, 3, None)),
+        ("inclusive", slice("humidity", "wind"), slice(1, 4, None)),
+        ("inclusive", slice(None, "humidity", 2), slice(None, 2, 2)),
+        ("exclusive", slice("wind", "humidity", -1), slice(3, 1, -1)),
+        ("inclusive", slice("wind", "temperature", -1), slice(3, None, -1)),
+    ],
+)
+def test_label_axis_resolve(mode, item, expected):
+    assert LabelAxis(VARIABLES.labels, mode=mode).resolve(item) == expected
+
+
+@pytest.mark.parametrize(
+    ("item", "exception"),
+    [
+        ("snow", IndexError),
+        (slice("humidity", "snow"), IndexError),
+        ([1], IndexError),
+        (slice(None, None, "a"), TypeError),
+    ],
+)
+def test_label_axis_resolve_raises(item, exception):
+    with pytest.raises(exception):
+        VARIABLES.resolve(item)
+
+
+def test_label_axis_invalid():
+    with pytest.raises(ValueError, match="unique"):
+        LabelAxis(["a", "a"])
+    with pytest.raises(ValueError, match="mode"):
+        LabelAxis(["a"], mode="nearest")
+
+
+AXES = (REGULAR, LAT, VARIABLES, None)
+
+
+@pytest.mark.parametrize(
+    ("index_exp", "expected"),
+    [
+        (
+            "[`2023-01-01T06:00:00`:`2023-01-01T12:00:00`, 60.0:30.0, `pressure`, 0]",
+            (slice(6, 12), slice(120, 240), 2, 0),
+        ),
+        ((..., "wind", 1), (..., 3, 1)),
+        ((START, None, ..., "humidity", 0), (0, None, ..., 1, 0)),
+        ((slice(None), 0.0), (slice(None), 360)),
+        ((), ()),
+        (1, (1,)),
+    ],
+)
+def test_resolve_index_exp(index_exp, expected):
+    assert resolve_index_exp(AXES, index_exp) == expected
+
+
+def test_resolve_index_exp_shape():
+    index_exp = resolve_index_exp(AXES, "[`2023-01-01T06:00:00`:`2023-01-01T12:00:00`, 60.0:30.0, `humidity`:, 0]")
+    assert create_shape_from_slice((48, 721, 4, 10), index_exp) == (6, 120, 3)
+
+
+@pytest.mark.parametrize(
+    "index_exp",
+    [(0, 0, 0, 0, 0), (..., 0, ...), (START, 1.0, "snow")],
+)
+def test_resolve_index_exp_raises(index_exp):
+    with pytest.raises(IndexError):
+        resolve_index_exp(AXES, index_exp)
+
+
+@pytest.mark.parametrize(
+    "index_exp",
+    [(..., "wind"), (..., 1.0), (..., START), (..., slice(0, "wind")), (..., slice(None, None, HOUR))],
+)
+def test_resolve_index_exp_no_axis_raises(index_exp):
+    with pytest.raises(TypeError):
+        resolve_index_exp(AXES, index_exp)
+
+
+if __name__ == "__main__":
+    pytest.main()
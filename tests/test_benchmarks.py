@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from benchmarks.runner import FORMAT_VERSION, Comparison, Result, compare, load, main, save, select
+
+
+def _result(best):
+    return Result(best, best * 1.1, 1000, 5)
+
+
+def test_compare():
+    baseline = {"fast": _result(1e-6), "slow": _result(1e-6), "removed": _result(1e-6)}
+    current = {"fast": _result(0.5e-6), "slow": _result(1.5e-6), "added": _result(1e-6)}
+    assert compare(baseline, current) == [
+        Comparison("added", None, 1e-6, None, False),
+        Comparison("fast", 1e-6, 0.5e-6, 0.5, False),
+        Comparison("removed", 1e-6, None, None, False),
+        Comparison("slow", 1e-6, 1.5e-6, 1.5, True),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("best", "threshold", "regression"),
+    [
+        (1.0, 0.2, False),
+        (1.19, 0.2, False),
+        (1.21, 0.2, True),
+        (1.21, 0.5, False),
+        (1.01, 0, True),
+        (0.5, 0, False),
+    ],
+)
+def test_compare_threshold(best, threshold, regression):
+    (comparison,) = compare({"case": _result(1.0)}, {"case": _result(best)}, threshold)
+    assert comparison.regression is regression
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "results" / "baseline.json")
+    results = {"case": _result(1e-6)}
+    save(results, path)
+    data = load(path)
+    assert data["results"] == results
+    assert data["version"] == FORMAT_VERSION
+
+    with open(path) as file:
+        data = json.load(file)
+    data["version"] = FORMAT_VERSION + 1
+    with open(path, "w") as file:
+        json.dump(data, file)
+    with pytest.raises(ValueError):
+        load(path)
+
+
+def test_main_compare_exit_status(tmp_path, capsys):
+    baseline, faster, slower = (str(tmp_path / f"{name}.json") for name in ("baseline", "faster", "slower"))
+    save({"case": _result(1.0), "other": _result(1.0)}, baseline)
+    save({"case": _result(0.9), "other": _result(1.0)}, faster)
+    save({"case": _result(1.5), "other": _result(1.0)}, slower)
+    assert main(["compare", baseline, faster]) == 0
+    assert main(["compare", baseline, slower]) == 1
+    assert "1 regressions over 20%" in capsys.readouterr().out
+    assert main(["compare", baseline, slower, "--threshold", "0.6"]) == 0
+    assert main(["compare", baseline, slower, "-k", "other"]) == 0
+
+
+def test_select():
+    names = [case.name for case in select("slices.")]
+    assert names and all("slices." in name for name in names)
+    assert [case.name for case in select(names=names[:1])] == names[:1]
+    assert select("no such case") == []
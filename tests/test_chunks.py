@@ -0,0 +1,157 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from deker_tools.chunks import ChunkPiece, ReadCost, estimate_read_cost, split_index_by_chunks
+
+
+def _assemble(array, chunk_shape, index_exp):
+    """Read index expression chunk by chunk."""
+    expected = array[index_exp]
+    output = np.full(expected.shape, -1, dtype=array.dtype)
+    chunks = set()
+    for piece in split_index_by_chunks(array.shape, chunk_shape, index_exp):
+        assert piece.chunk not in chunks
+        chunks.add(piece.chunk)
+        origin = tuple(slice(c * size, (c + 1) * size) for c, size in zip(piece.chunk, chunk_shape))
+        chunk = array[origin]
+        output[piece.output] = chunk[piece.local]
+    return output, expected, chunks
+
+
+@pytest.mark.parametrize(
+    ("shape", "chunk_shape", "index_exp"),
+    [
+        ((10,), (3,), np.index_exp[:]),
+        ((10,), (3,), np.index_exp[1:9:2]),
+        ((10,), (3,), np.index_exp[::-1]),
+        ((10,), (3,), np.index_exp[8:0:-3]),
+        ((10,), (3,), np.index_exp[::7]),
+        ((10,), (3,), np.index_exp[5:5]),
+        ((10,), (10,), np.index_exp[-3]),
+        ((7, 9), (2, 4), np.index_exp[1:, ::-2]),
+        ((7, 9), (2, 4), np.index_exp[3, 2:8]),
+        ((7, 9), (2, 4), np.index_exp[None, 3, None, ...]),
+        ((6, 7, 8), (5, 3, 2), np.index_exp[..., 1::3]),
+        ((6, 7, 8), (5, 3, 2), np.index_exp[-1, -1, -1]),
+        ((6, 7, 8), (1, 1, 1), np.index_exp[1:5, ::-1, 2]),
+    ],
+)
+def test_split_index_by_chunks(shape, chunk_shape, index_exp):
+    array = np.arange(np.prod(shape)).reshape(shape)
+    output, expected, _ = _assemble(array, chunk_shape, index_exp)
+    assert np.array_equal(output, expected)
+
+
+def test_split_index_by_chunks_random():
+    rnd = random.Random(0)
+    for _ in range(300):
+        shape = tuple(rnd.randint(1, 12) for _ in range(rnd.randint(1, 3)))
+        chunk_shape = tuple(rnd.randint(1, size + 2) for size in shape)
+        index_exp = tuple(
+            rnd.randrange(-size, size)
+            if rnd.random() < 0.2
+            else slice(rnd.choice([None, rnd.randint(-15, 15)]), rnd.choice([None, rnd.randint(-15, 15)]), step)
+            for size, step in ((size, rnd.choice([None, 1, 2, 5, -1, -2, -7])) for size in shape)
+        )
+        array = np.arange(np.prod(shape)).reshape(shape)
+        output, expected, chunks = _assemble(array, chunk_shape, index_exp)
+        assert np.array_equal(output, expected), (shape, chunk_shape, index_exp)
+
+        touched = [
+            {p // size for p in np.arange(dim)[item if isinstance(item, slice) else slice(item, item + 1 or None)]}
+            for dim, size, item in zip(shape, chunk_shape, index_exp)
+        ]
+        assert chunks == set(itertools.product(*touched)) or not expected.size
+
+
+def test_split_index_by_chunks_order():
+    pieces = list(split_index_by_chunks((4, 4), (2, 2), np.index_exp[::-1, 1:]))
+    assert [piece.chunk for piece in pieces] == [(1, 0), (1, 1), (0, 0), (0, 1)]
+    assert pieces[0] == ChunkPiece((1, 0), (slice(1, None, -1), slice(1, 2, 1)), (slice(0, 2), slice(0, 1)))
+
+
+def test_split_index_by_chunks_is_lazy():
+    pieces = split_index_by_chunks((10**15, 10**15), (1000, 1000), np.index_exp[5:, ::-1])
+    assert next(pieces) == ChunkPiece(
+        (0, 10**12 - 1), (slice(5, 1000, 1), slice(999, None, -1)), (slice(0, 995), slice(0, 1000))
+    )
+
+    assert list(split_index_by_chunks((10**15, 10**15), (1, 1), np.index_exp[:, 5:5])) == []
+
+
+@pytest.mark.parametrize(
+    ("shape", "chunk_shape", "index_exp", "exception"),
+    [
+        ((10,), (3, 3), np.index_exp[:], ValueError),
+        ((10,), (0,), np.index_exp[:], ValueError),
+        ((10,), (2.5,), np.index_exp[:], ValueError),
+        ((10,), (3,), np.index_exp[10], IndexError),
+        ((10,), (3,), np.index_exp[:, :], IndexError),
+    ],
+)
+def test_split_index_by_chunks_raises(shape, chunk_shape, index_exp, exception):
+    with pytest.raises(exception):
+        list(split_index_by_chunks(shape, chunk_shape, index_exp))
+
+
+@pytest.mark.parametrize(
+    ("shape", "chunk_shape", "dtype", "index_exp", "cost"),
+    [
+        ((1000, 1000), (100, 100), "float64", np.index_exp[50:150, 5], ReadCost((100,), 800, 2, 160_000)),
+        ((10,), (3,), np.int8, np.index_exp[:], ReadCost((10,), 10, 4, 10)),
+        ((10,), (3,), np.int8, np.index_exp[::-4], ReadCost((3,), 3, 3, 7)),
+        ((10,), (3,), np.int8, np.index_exp[9], ReadCost((), 1, 1, 1)),
+        ((10, 10), (3, 3), "int32", np.index_exp[None, 2:2], ReadCost((1, 0, 10), 0, 0, 0)),
+        ((), (), "float32", np.index_exp[...], ReadCost((), 4, 1, 4)),
+    ],
+)
+def test_estimate_read_cost(shape, chunk_shape, dtype, index_exp, cost):
+    assert estimate_read_cost(shape, chunk_shape, dtype, index_exp) == cost
+
+
+def test_estimate_read_cost_random():
+    rnd = random.Random(1)
+    for _ in range(300):
+        shape = tuple(rnd.randint(1, 12) for _ in range(rnd.randint(1, 3)))
+        chunk_shape = tuple(rnd.randint(1, size + 2) for size in shape)
+        index_exp = tuple(
+            rnd.randrange(-size, size)
+            if rnd.random() < 0.2
+            else slice(rnd.choice([None, rnd.randint(-15, 15)]), rnd.choice([None, rnd.randint(-15, 15)]), step)
+            for size, step in ((size, rnd.choice([None, 1, 2, 5, -1, -2, -7])) for size in shape)
+        )
+        array = np.arange(np.prod(shape), dtype=np.int16).reshape(shape)
+        cost = estimate_read_cost(shape, chunk_shape, array.dtype, index_exp)
+        chunks = list(split_index_by_chunks(shape, chunk_shape, index_exp))
+        read = sum(
+            array[tuple(slice(c * size, (c + 1) * size) for c, size in zip(piece.chunk, chunk_shape))].nbytes
+            for piece in chunks
+        )
+        assert cost == (array[index_exp].shape, array[index_exp].nbytes, len(chunks), read), (shape, index_exp)
+
+
+def test_estimate_read_cost_summary():
+    cost = estimate_read_cost((10**6, 10**6), (1000, 1000), "float32", np.index_exp[:2000, 0])
+    assert cost.amplification == 1000
+    assert cost.summary == "7.81 KB in memory, 2 chunks, 7.63 MB read (1000.0x)"
+    assert estimate_read_cost((10,), (3,), "int8", np.index_exp[5:5]).amplification == 1
+
+
+@pytest.mark.parametrize(
+    ("shape", "chunk_shape", "index_exp", "exception"),
+    [
+        ((10,), (3, 3), np.index_exp[:], ValueError),
+        ((10,), (0,), np.index_exp[:], ValueError),
+        ((10,), (3,), np.index_exp[10], IndexError),
+    ],
+)
+def test_estimate_read_cost_raises(shape, chunk_shape, index_exp, exception):
+    with pytest.raises(exception):
+        estimate_read_cost(shape, chunk_shape, "float64", index_exp)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,6 +1,9 @@
+import random
+
+import numpy as np
 import pytest
 
-from deker_tools.data import convert_size_to_human
+from deker_tools.data import convert_size_to_human, convert_sizes_to_human, parse_human_size
 
 
 @pytest.mark.parametrize(
@@ -14,3 +17,98 @@ from deker_tools.data import convert_size_to_human
 )
 def test_convert_size_to_human(bytes, expected):
     assert convert_size_to_human(bytes) == expected
+
+
+@pytest.mark.parametrize(
+    ("size", "units", "precision", "expected"),
+    [
+        (0, "binary", 2, "0 B"),
+        (0.0, "si", 2, "0 B"),
+        (1, "binary", 2, "1.0 B"),
+        (1023, "binary", 2, "1023.0 B"),
+        (1024, "iec", 2, "1.0 KiB"),
+        (1048575, "binary", 2, "1.0 MB"),
+        (999999, "si", 2, "1.0 MB"),
+        (1536, "binary", 0, "2.0 KB"),
+        (1234567, "binary", 4, "1.1774 MB"),
+        (-1536, "binary", 2, "-1.5 KB"),
+        (-(2**63), "iec", 2, "-8.0 EiB"),
+        (2**90, "binary", 2, "1024.0 YB"),
+        (10**30, "si", 1, "1000000.0 YB"),
+        (1536.0, "binary", 2, "1.5 KB"),
+        (0.5, "binary", 2, "0.5 B"),
+        (123456789, "si", 1, "123.5 MB"),
+    ],
+)
+def test_convert_size_to_human_units(size, units, precision, expected):
+    assert convert_size_to_human(size, units=units, precision=precision) == expected
+
+
+@pytest.mark.parametrize(("size", "units"), [(float("nan"), "binary"), (float("inf"), "binary"), (1, "metric")])
+def test_convert_size_to_human_raises(size, units):
+    with pytest.raises(ValueError):
+        convert_size_to_human(size, units=units)
+
+
+@pytest.mark.parametrize("units", ["binary", "iec", "si"])
+@pytest.mark.parametrize("precision", [1, 2, 3])
+def test_convert_sizes_to_human_matches_scalar(units, precision):
+    rnd = random.Random(precision)
+    sizes = [rnd.randrange(-(2**62), 2**62) >> rnd.randrange(0, 62) for _ in range(2000)]
+    sizes += [0, 1, -(2**63), 2**63 - 1, 1023, 1048575, 999999, 999995, 2750]
+    for array in (np.array(sizes, dtype=np.int64), np.array(sizes[:-10], dtype=np.float64) / 7):
+        expected = [convert_size_to_human(size, units=units, precision=precision) for size in array.tolist()]
+        assert convert_sizes_to_human(array, units=units, precision=precision).tolist() == expected
+
+
+def test_convert_sizes_to_human_shape():
+    sizes = np.arange(0, 2**40, 2**34, dtype=np.uint64).reshape(8, 8)
+    result = convert_sizes_to_human(sizes)
+    assert result.shape == (8, 8)
+    assert result[0, 0] == "0 B"
+    assert result[0, 1] == "16.0 GB"
+    assert convert_sizes_to_human(np.array([], dtype=np.int64)).shape == (0,)
+
+
+def test_convert_sizes_to_human_raises():
+    with pytest.raises(ValueError):
+        convert_sizes_to_human(np.array([1.0, np.nan]))
+    with pytest.raises(ValueError):
+        convert_sizes_to_human(np.array([1]), units="metric")
+
+
+@pytest.mark.parametrize(
+    ("size", "units", "expected"),
+    [
+        ("1.5 GB", "binary", 1610612736),
+        ("1.5 GB", "si", 1500000000),
+        ("1.5gb", "binary", 1610612736),
+        ("10 KiB", "si", 10240),
+        ("10 kB", "si", 10000),
+        ("10k", "binary", 10240),
+        ("512", "binary", 512),
+        ("512 B", "si", 512),
+        (" -2 MiB ", "binary", -2097152),
+        (".5 KB", "binary", 512),
+        ("1e3 k", "si", 1000000),
+        ("0.1 YB", "si", 10**23),
+        ("1.0000001 B", "binary", 1),
+    ],
+)
+def test_parse_human_size(size, units, expected):
+    assert parse_human_size(size, units=units) == expected
+
+
+@pytest.mark.parametrize("size", ["", "GB", "1.5 XB", "1.5 GiBB", "1..5 GB", "1 G B", "1,5 GB", "nan"])
+def test_parse_human_size_raises(size):
+    with pytest.raises(ValueError):
+        parse_human_size(size)
+
+
+@pytest.mark.parametrize("units", ["binary", "iec", "si"])
+def test_parse_human_size_round_trip(units):
+    rnd = random.Random(0)
+    for _ in range(1000):
+        size = rnd.randrange(1, 2 ** rnd.randrange(1, 80))
+        parsed = parse_human_size(convert_size_to_human(size, units=units, precision=3), units=units)
+        assert abs(parsed - size) <= size * 0.001
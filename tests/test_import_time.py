@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).parents[1]
+# modules which must not be loaded by importing the package modules
+HEAVY_MODULES = ("numpy", "concurrent.futures", "multiprocessing")
+# import budget: number of modules a package module may load on top of the bare interpreter ones,
+# counted in -X importtime output; NumPy alone loads more than 150
+IMPORT_BUDGET = {
+    "deker_tools.time": 35,
+    "deker_tools.data": 40,
+    "deker_tools.slices": 40,
+    "deker_tools.chunks": 50,
+    "deker_tools.path": 55,
+    "deker_tools.log": 70,
+    "deker_tools.instrumentation": 50,
+}
+
+
+def _run(code, *options):
+    result = subprocess.run([sys.executable, *options, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def _imported(code):
+    """Run code in a new interpreter and get names of the modules it imported according to -X importtime."""
+    names = set()
+    for line in _run(code, "-X", "importtime").stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            names.add(fields[2].strip())
+    return names
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGET)
+def test_import_budget(module):
+    loaded = _imported(f"import {module}") - _imported("pass")
+    assert module in loaded
+    assert not [name for name in loaded for prefix in HEAVY_MODULES if f"{name}.".startswith(f"{prefix}.")]
+    assert len(loaded) <= IMPORT_BUDGET[module], sorted(loaded)
+
+
+def test_numpy_free_paths():
+    _run(
+        """
+import sys
+from deker_tools.data import convert_size_to_human, parse_human_size
+from deker_tools.slices import create_shape_from_slice, decode_index, encode_index, slice_converter
+from deker_tools.time import get_utc
+
+assert create_shape_from_slice((10, 20, 30), (slice(2, 8), 5, ...)) == (6, 30)
+index_exp = slice_converter["[`2023-01-01T00:00:00`:`2023-02-01T00:00:00`, 0.5, ...]"]
+assert decode_index(encode_index(index_exp)) == index_exp
+assert slice_converter[index_exp] == "[`2023-01-01T00:00:00`:`2023-02-01T00:00:00`, 0.5, ...]"
+assert get_utc("2023-01-01T00:00:00+05:00").hour == 19
+assert convert_size_to_human(parse_human_size("1.5 GB")) == "1.5 GB"
+assert "numpy" not in sys.modules
+"""
+    )
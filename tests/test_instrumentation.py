@@ -0,0 +1,139 @@
+import logging
+import threading
+import time as pytime
+
+import numpy as np
+import pytest
+
+from deker_tools import instrumentation, path, slices, time
+from deker_tools.instrumentation import TimingStats, instrumented, snapshot
+from deker_tools.slices import slice_converter
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disable_restores_originals():
+    originals = (slices.create_shape_from_slice, time.get_utc, path.is_empty, path.is_path_valid)
+    converter_methods = dict(vars(slices._SliceConverter))
+    instrumentation.enable()
+    assert set(instrumentation.enabled()) == set(instrumentation.TARGETS)
+    assert slices.create_shape_from_slice is not originals[0]
+    instrumentation.disable()
+    assert (slices.create_shape_from_slice, time.get_utc, path.is_empty, path.is_path_valid) == originals
+    assert dict(vars(slices._SliceConverter)) == converter_methods
+    assert instrumentation.enabled() == ()
+
+
+def test_records_calls():
+    instrumentation.enable(["slice_converter", "create_shape_from_slice", "get_utc"])
+    instrumentation.enable(["slice_converter"])
+    for _ in range(3):
+        assert slice_converter[np.index_exp[1:2, 5]] == "[1:2, 5]"
+    assert slices.create_shape_from_slice((10, 10), np.index_exp[1:, 0]) == (9,)
+    with pytest.raises(ValueError):
+        time.get_utc("not a date")
+
+    stats = snapshot()
+    assert set(stats) == {"slice_converter", "create_shape_from_slice", "get_utc"}
+    assert stats["slice_converter"].calls == 3
+    assert stats["get_utc"].errors == 1
+    assert sum(stats["slice_converter"].histogram) == 3
+    assert 0 < stats["create_shape_from_slice"].total < 1
+
+    instrumentation.disable()
+    slice_converter[np.index_exp[1:2, 5]]
+    assert snapshot()["slice_converter"].calls == 3
+
+
+def test_threads_are_summed():
+    def convert():
+        for _ in range(100):
+            slice_converter["[1:2]"]
+
+    with instrumented(["slice_converter"]):
+        threads = [threading.Thread(target=convert) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert snapshot()["slice_converter"].calls == 400
+    instrumentation.reset()
+    assert snapshot() == {}
+
+
+def test_finished_threads_are_dropped():
+    with instrumented(["slice_converter"]):
+        for _ in range(10):
+            thread = threading.Thread(target=lambda: slice_converter["[1:2]"])
+            thread.start()
+            thread.join()
+        slice_converter["[1:2]"]
+        assert snapshot()["slice_converter"].calls == 11
+    assert len(instrumentation._thread_counters) == 1
+    instrumentation.reset()
+    assert snapshot() == {}
+
+
+def test_lazy_iterators_are_timed(monkeypatch):
+    def to_strings_batch(items):
+        pytime.sleep(0.01)
+        return [str(item) for item in items]
+
+    monkeypatch.setattr(slices, "_to_strings_batch", to_strings_batch)
+    with instrumented(["slice_converter.to_strings", "slice_converter.from_strings"]):
+        results = slice_converter.to_strings([np.index_exp[1:2]] * 4, batch_size=2)
+        assert snapshot() == {}
+        assert len(list(results)) == 4
+        stats = snapshot()["slice_converter.to_strings"]
+        assert (stats.calls, stats.errors) == (1, 0)
+        assert stats.total >= 0.02
+
+        results = slice_converter.from_strings(["[1:2]", "[3]"], batch_size=1)
+        next(results)
+        results.close()
+        with pytest.raises(ValueError):
+            list(slice_converter.to_strings([], batch_size=0))
+    stats = snapshot()
+    assert stats["slice_converter.from_strings"].calls == 1
+    assert stats["slice_converter.to_strings"].calls == 2
+    assert stats["slice_converter.to_strings"].errors == 1
+
+
+def test_instrumented_keeps_enabled_targets():
+    instrumentation.enable(["get_utc"])
+    with instrumented():
+        assert set(instrumentation.enabled()) == set(instrumentation.TARGETS)
+    assert instrumentation.enabled() == ("get_utc",)
+
+
+def test_timing_stats():
+    stats = TimingStats(4, 0, 4e-6, (0,) * 10 + (3, 0, 1) + (0,) * 35)
+    assert stats.mean == 1e-6
+    assert stats.quantile(0.5) == 2**10 / 1e9
+    assert stats.quantile(1) == 2**12 / 1e9
+    assert TimingStats(0, 0, 0, (0,) * 48).quantile(0.5) == 0
+    assert TimingStats(0, 0, 0, (0,) * 48).mean == 0
+    with pytest.raises(ValueError):
+        stats.quantile(2)
+
+
+def test_log_snapshot(caplog):
+    with instrumented(["create_shape_from_slice"]):
+        slices.create_shape_from_slice((10,), np.index_exp[:])
+    with caplog.at_level(logging.INFO, logger="deker_tools.instrumentation"):
+        stats = instrumentation.log_snapshot()
+    assert stats["create_shape_from_slice"].calls == 1
+    assert "create_shape_from_slice: 1 calls, 0 errors" in caplog.text
+
+
+def test_unknown_target():
+    with pytest.raises(ValueError):
+        instrumentation.enable(["unknown"])
+    assert instrumentation.enabled() == ()
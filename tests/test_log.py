@@ -1,7 +1,35 @@
+import io
 import logging
+import threading
 from logging import getLogger
 
-from deker_tools.log import tree, LoggerNode, set_logger
+import pytest
+
+from deker_tools.log import (
+    tree,
+    LoggerNode,
+    set_logger,
+    QueueStats,
+    FilterStats,
+    RateLimitFilter,
+    SamplingFilter,
+    install_filter,
+    uninstall_filter,
+    queue_logging_stats,
+    start_queue_logging,
+    stop_queue_logging,
+    restore_logger_dict,
+)
+
+
+@pytest.fixture(autouse=True)
+def original_logger_dict():
+    yield
+    restore_logger_dict()
+
+
+def _record(name="test", msg="message %s", created=0.0):
+    return logging.makeLogRecord({"name": name, "msg": msg, "args": (1,), "created": created})
 
 
 def test_tree():
@@ -33,3 +61,294 @@ def test_formatting_is_applied(caplog):
         assert '|' in caplog.text
 
 
+
+
+def _find(node, name):
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        if node.name == name:
+            return node
+        nodes.extend(node.children)
+    return None
+
+
+def test_tree_structure():
+    getLogger("test_tree_structure.a.b")
+    getLogger("test_tree_structure.a")
+    getLogger("test_tree_structure.c.d")
+    root = tree()
+    assert root.logger is logging.root
+    top = _find(root, "test_tree_structure")
+    assert isinstance(top.logger, logging.PlaceHolder)
+    assert sorted(child.name for child in top.children) == ["test_tree_structure.a", "test_tree_structure.c"]
+    assert [child.name for child in _find(top, "test_tree_structure.a").children] == ["test_tree_structure.a.b"]
+    assert _find(top, "test_tree_structure.c").children[0].logger is getLogger("test_tree_structure.c.d")
+
+
+def test_tree_is_cached():
+    first = tree()
+    assert tree() is first
+    getLogger("test_tree_is_cached")
+    second = tree()
+    assert second is not first
+    assert _find(second, "test_tree_is_cached") is not None
+    assert tree() is second
+
+
+def test_restore_logger_dict():
+    original = logging.root.manager.loggerDict
+    tree()
+    assert logging.root.manager.loggerDict is not original
+    logger = getLogger("test_restore_logger_dict")
+    restore_logger_dict()
+    assert logging.root.manager.loggerDict is original
+    assert type(original) is dict
+    assert original["test_restore_logger_dict"] is logger
+    assert _find(tree(), "test_restore_logger_dict") is not None
+    restore_logger_dict()
+    restore_logger_dict()
+    assert logging.root.manager.loggerDict is original
+
+
+def test_set_logger_deep_hierarchy():
+    name = ".".join(["deep"] * 3000)
+    logger = getLogger(name)
+    handler = logging.NullHandler()
+    logger.addHandler(handler)
+    try:
+        set_logger("%(message)s deep")
+        assert handler.formatter._fmt == "%(message)s deep"
+        assert _find(tree(), name) is not None
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_set_logger_shares_formatter():
+    handlers = [logging.NullHandler() for _ in range(2)]
+    for number, handler in enumerate(handlers):
+        getLogger(f"test_set_logger_shares_formatter.{number}").addHandler(handler)
+    set_logger("%(message)s shared")
+    assert handlers[0].formatter is handlers[1].formatter
+
+
+def test_set_logger_only_new():
+    old_handler, late_handler, new_handler = (logging.NullHandler() for _ in range(3))
+    old = getLogger("test_set_logger_only_new.old")
+    old.addHandler(old_handler)
+    set_logger("%(message)s first")
+    assert old_handler.formatter._fmt == "%(message)s first"
+
+    old.addHandler(late_handler)
+    getLogger("test_set_logger_only_new.new").addHandler(new_handler)
+    set_logger("%(message)s first", only_new=True)
+    assert new_handler.formatter._fmt == "%(message)s first"
+    assert late_handler.formatter is None
+
+    set_logger("%(message)s second", only_new=True)
+    assert late_handler.formatter._fmt == "%(message)s second"
+    assert old_handler.formatter._fmt == "%(message)s second"
+
+
+class _FlushCountingStream(io.StringIO):
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+class _BlockedHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.unblocked = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.unblocked.wait()
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture()
+def queued_logger():
+    logger = getLogger("test_queue_logging")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handlers = list(logger.handlers)
+    yield logger
+    stop_queue_logging()
+    logger.handlers = handlers
+
+
+def test_queue_logging(queued_logger):
+    stream = _FlushCountingStream()
+    handler = logging.StreamHandler(stream)
+    queued_logger.addHandler(handler)
+    handlers = list(queued_logger.handlers)
+    set_logger("%(name)s | %(message)s", use_queue=True)
+    assert handler not in queued_logger.handlers
+    for number in range(200):
+        queued_logger.info("message %s", number)
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        queued_logger.exception("failed")
+    stop_queue_logging()
+
+    assert queued_logger.handlers == handlers
+    assert queue_logging_stats() is None
+    lines = stream.getvalue().splitlines()
+    assert lines[:200] == [f"test_queue_logging | message {number}" for number in range(200)]
+    assert lines[200] == "test_queue_logging | failed"
+    assert lines[-1] == "ValueError: broken"
+    assert stream.flushes < 200
+
+
+def test_queue_logging_respects_levels(queued_logger):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(logging.WARNING)
+    queued_logger.addHandler(handler)
+    start_queue_logging()
+    queued_logger.info("skipped")
+    queued_logger.warning("written")
+    stop_queue_logging()
+    assert stream.getvalue() == "written\n"
+
+
+def test_queue_logging_skips_filtered_levels(queued_logger):
+    handler = _BlockedHandler()
+    handler.setLevel(logging.WARNING)
+    queued_logger.handlers = [handler]
+    queued_logger.setLevel(logging.DEBUG)
+    start_queue_logging(maxsize=5, batch_size=1)
+    for number in range(1000):
+        queued_logger.debug("message %s", number)
+    queued_logger.warning("important")
+    assert queue_logging_stats().dropped == 0
+    handler.unblocked.set()
+    stop_queue_logging()
+    assert handler.messages == ["important"]
+
+
+def test_queue_logging_drops(queued_logger):
+    handler = _BlockedHandler()
+    queued_logger.addHandler(handler)
+    start_queue_logging(maxsize=2, batch_size=1)
+    for number in range(10):
+        queued_logger.info("message %s", number)
+    stats = queue_logging_stats()
+    assert stats.dropped >= 7
+    handler.unblocked.set()
+    stop_queue_logging()
+    assert len(handler.messages) == 10 - stats.dropped
+
+
+def test_queue_logging_blocks(queued_logger):
+    handler = _BlockedHandler()
+    queued_logger.addHandler(handler)
+    start_queue_logging(maxsize=2, block=True)
+    threading.Timer(0.05, handler.unblocked.set).start()
+    for number in range(10):
+        queued_logger.info("message %s", number)
+    stop_queue_logging()
+    assert handler.messages == [f"message {number}" for number in range(10)]
+
+
+def test_queue_logging_moves_new_handlers(queued_logger):
+    first, second = logging.NullHandler(), logging.NullHandler()
+    queued_logger.addHandler(first)
+    handlers = list(queued_logger.handlers)
+    start_queue_logging()
+    queued_logger.addHandler(second)
+    start_queue_logging()
+    assert len(queued_logger.handlers) == 1
+    set_logger("%(message)s queued")
+    assert first.formatter._fmt == second.formatter._fmt == "%(message)s queued"
+    assert queue_logging_stats() == QueueStats(0, 0, 0)
+    stop_queue_logging()
+    assert queued_logger.handlers == handlers + [second]
+
+
+def test_queue_logging_raises():
+    with pytest.raises(ValueError):
+        start_queue_logging(maxsize=0)
+
+
+def test_rate_limit_filter():
+    log_filter = RateLimitFilter(rate=2, burst=3)
+    passed = [t / 10 for t in range(40) if log_filter.filter(_record(created=t / 10))]
+    # burst at once, then a record per 0.5 s
+    assert passed == [0.0, 0.1, 0.2, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5]
+    assert log_filter.stats == FilterStats(10, 30)
+
+    record = _record(created=100.0)
+    assert log_filter.filter(record)
+    assert record.suppressed == 4
+    assert log_filter.filter(_record(name="other", created=3.6))
+
+
+def test_rate_limit_filter_by_message():
+    log_filter = RateLimitFilter(rate=1, key="message")
+    assert log_filter.filter(_record(name="first", msg="a"))
+    assert not log_filter.filter(_record(name="second", msg="a"))
+    assert log_filter.filter(_record(name="second", msg="b"))
+    log_filter.reset()
+    assert log_filter.stats == FilterStats(0, 0)
+
+
+def test_sampling_filter():
+    log_filter = SamplingFilter(4, key="message")
+    records = [_record(msg=msg) for _ in range(10) for msg in ("a", "b")]
+    passed = [record for record in records if log_filter.filter(record)]
+    assert [(record.msg, record.suppressed) for record in passed] == [
+        ("a", 0),
+        ("b", 0),
+        ("a", 3),
+        ("b", 3),
+        ("a", 3),
+        ("b", 3),
+    ]
+    assert log_filter.stats == FilterStats(6, 14)
+
+
+def test_filter_keys_are_bounded():
+    log_filter = RateLimitFilter(rate=1, key="message", maxkeys=3)
+    for number in range(1000):
+        assert log_filter.filter(_record(msg=f"chunk {number} is missing"))
+        assert not log_filter.filter(_record(msg=f"chunk {number} is missing"))
+    assert len(log_filter._states) == 3
+    assert log_filter.stats == FilterStats(1000, 1000)
+
+    # keys whose records passed recently are kept
+    sampling = SamplingFilter(1, key="message", maxkeys=2)
+    assert all(sampling.filter(_record(msg=msg)) for msg in "abac")
+    assert list(sampling._states) == ["a", "c"]
+
+
+@pytest.mark.parametrize(
+    ("factory", "kwargs"),
+    [
+        (RateLimitFilter, {"rate": 0}),
+        (RateLimitFilter, {"rate": 1, "maxkeys": 0}),
+        (RateLimitFilter, {"rate": 1, "burst": 0}),
+        (RateLimitFilter, {"rate": 1, "key": "module"}),
+        (SamplingFilter, {"n": 0}),
+    ],
+)
+def test_filters_raise(factory, kwargs):
+    with pytest.raises(ValueError):
+        factory(**kwargs)
+
+
+def test_install_filter():
+    parent, child = getLogger("test_install_filter"), getLogger("test_install_filter.a.child")
+    log_filter = SamplingFilter(2)
+    node = _find(tree(), "test_install_filter")
+    assert install_filter(log_filter, node) == 2
+    assert install_filter(log_filter, node) == 0
+    assert log_filter in parent.filters and log_filter in child.filters
+
+    install_filter(log_filter)
+    assert log_filter in logging.root.filters
+    uninstall_filter(log_filter)
+    assert log_filter not in logging.root.filters and log_filter not in child.filters
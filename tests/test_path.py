@@ -1,8 +1,10 @@
+import os
 import tempfile
+import time
 
 import pytest
 
-from deker_tools.path import is_empty, is_path_valid
+from deker_tools.path import DirStats, PathValidator, is_empty, is_path_valid, scan_tree, validate_paths
 
 
 class TestIsEmpty:
@@ -29,5 +31,170 @@ class TestIsPathValid:
             assert is_path_valid(__file__)
 
 
+def _is_path_valid_error(path):
+    try:
+        is_path_valid(path)
+    except Exception as e:
+        return e
+    return None
+
+
+class TestValidatePaths:
+    @pytest.fixture()
+    def paths(self, tmp_path):
+        (tmp_path / "file").write_bytes(b"")
+        return [
+            ".",
+            str(tmp_path),
+            tmp_path / "file",
+            str(tmp_path / "missing" / "array"),
+            str(tmp_path / ("a" * 300) / "array"),
+            "a" * 300,
+            "relative/path",
+            "",
+            "/",
+            "nul\0byte",
+            __file__,
+        ]
+
+    def test_matches_is_path_valid(self, paths):
+        results = validate_paths(paths)
+        expected = [_is_path_valid_error(path) for path in paths]
+        assert [type(error) for error in results] == [type(error) for error in expected]
+        assert [str(error) for error in results] == [str(error) for error in expected]
+
+    def test_validate_raises(self, paths):
+        validator = PathValidator()
+        for path in paths:
+            expected = _is_path_valid_error(path)
+            if expected is None:
+                assert validator.validate(path) is None
+            else:
+                with pytest.raises(type(expected)):
+                    validator.validate(path)
+
+    def test_shares_syscalls(self, tmp_path):
+        paths = [tmp_path / "collection" / f"{number}.h5" for number in range(100)]
+        validator = PathValidator(ttl=60)
+        assert validator.validate_paths(paths) == [None] * 100
+        components = len(str(paths[0]).split(os.sep))
+        # full paths and the root are stat'ed, every path component is lstat'ed once
+        assert validator.cache_info().syscalls == 100 + 1 + components - 1 + 100
+        assert validator.cache_info().syscalls + validator.cache_info().hits == 100 * (components + 2)
+
+        validator.validate_paths(paths)
+        assert validator.cache_info().syscalls == 100 + 1 + components - 1 + 100
+        validator.cache_clear()
+        assert validator.cache_info() == (0, 0, 0)
+
+    def test_ttl(self, tmp_path):
+        validator = PathValidator(ttl=0)
+        validator.validate_paths([tmp_path, tmp_path])
+        assert validator.cache_info().hits == 0
+
+        validator = PathValidator(ttl=60)
+        assert validator.check(tmp_path / "file") is None
+        (tmp_path / "file").write_bytes(b"")
+        assert validator.check(tmp_path / "file") is None
+        validator.cache_clear()
+        assert isinstance(validator.check(tmp_path / "file"), IsADirectoryError)
+
+    def test_drops_expired_results(self, tmp_path):
+        validator = PathValidator(ttl=0.1)
+        validator.validate_paths([tmp_path / str(number) for number in range(100)])
+        assert validator.cache_info().currsize > 200
+        time.sleep(0.2)
+        validator.validate_paths([tmp_path])
+        # the path and the root are stat'ed, every path component is lstat'ed
+        assert validator.cache_info().currsize == 2 + len(str(tmp_path).split(os.sep))
+
+    def test_maxsize(self, tmp_path):
+        validator = PathValidator(ttl=60, maxsize=10)
+        assert validator.validate_paths([tmp_path / str(number) for number in range(100)]) == [None] * 100
+        assert validator.cache_info().currsize == 20
+        with pytest.raises(ValueError):
+            PathValidator(maxsize=0)
+
+    def test_raises_on_ttl(self):
+        with pytest.raises(ValueError):
+            PathValidator(ttl=-1)
+
+
+@pytest.fixture()
+def tree(tmp_path):
+    """a: 2 files, a/b: 1 file, a/b/c: empty, a/d: 3 files."""
+    for directory, sizes in (("a", (10, 20)), ("a/b", (5,)), ("a/b/c", ()), ("a/d", (1, 2, 3))):
+        os.makedirs(tmp_path / directory)
+        for number, size in enumerate(sizes):
+            file = tmp_path / directory / f"{number}.h5"
+            file.write_bytes(b"x" * size)
+            os.utime(file, (1000 + size, 1000 + size))
+    return tmp_path / "a"
+
+
+class TestScanTree:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_scan_tree(self, tree, workers):
+        stats = {os.path.relpath(item.path, tree): item for item in scan_tree(tree, workers=workers)}
+        assert stats == {
+            ".": DirStats(str(tree), 0, 30, 2, 2, 1020.0),
+            "b": DirStats(str(tree / "b"), 1, 5, 1, 1, 1005.0),
+            os.path.join("b", "c"): DirStats(str(tree / "b" / "c"), 2, 0, 0, 0, None),
+            "d": DirStats(str(tree / "d"), 1, 6, 3, 0, 1003.0),
+        }
+        assert stats["."].human_size == "30.0 B"
+
+    def test_max_depth(self, tree):
+        assert sorted(item.depth for item in scan_tree(tree, max_depth=1)) == [0, 1, 1]
+        assert [item.path for item in scan_tree(tree, max_depth=0)] == [str(tree)]
+
+    def test_max_entries(self, tree):
+        assert [item.path for item in scan_tree(tree, max_entries=1)] == [str(tree)]
+        assert len(list(scan_tree(tree, workers=1, max_entries=5))) == 2
+
+    def test_is_lazy(self, tree):
+        iterator = scan_tree(tree)
+        assert next(iterator).path == str(tree)
+        iterator.close()
+
+    def test_symlinks(self, tree):
+        os.symlink(tree, tree / "b" / "loop")
+        os.symlink(tree / "0.h5", tree / "d" / "link.h5")
+        stats = {item.path: item for item in scan_tree(tree)}
+        assert len(stats) == 4
+        assert stats[str(tree / "d")].files == 3
+
+        stats = {item.path: item for item in scan_tree(tree, follow_symlinks=True)}
+        assert len(stats) == 4
+        assert stats[str(tree / "d")].size == 16
+
+    def test_onerror(self, tree, monkeypatch):
+        scandir = os.scandir
+
+        def failing_scandir(path):
+            if os.path.basename(path) == "b":
+                raise PermissionError(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", failing_scandir)
+        errors = []
+        stats = {item.path: item for item in scan_tree(tree, onerror=errors.append)}
+        assert [str(error) for error in errors] == [str(tree / "b")]
+        assert stats[str(tree / "b")].files == 0
+        assert str(tree / "b" / "c") not in stats
+
+        def reraise(error):
+            raise error
+
+        with pytest.raises(PermissionError):
+            list(scan_tree(tree, onerror=reraise))
+
+    def test_raises(self, tree):
+        with pytest.raises(IsADirectoryError):
+            list(scan_tree(tree / "0.h5"))
+        with pytest.raises(ValueError):
+            list(scan_tree(tree, workers=0))
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from deker_tools.path import aio
+from deker_tools.path.aio import PathExecutor, is_empty, is_path_valid, mount_point, scan_dir_entries
+
+
+LATENCY = 0.05
+
+
+class SlowFilesystem:
+    """Injects latency into os calls and records the peak number of concurrent calls per directory."""
+
+    def __init__(self, monkeypatch):
+        self.running = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+        for name in ("scandir", "lstat"):
+            monkeypatch.setattr(os, name, self._slow(getattr(os, name)))
+
+    def _slow(self, func):
+        def wrapper(path, *args, **kwargs):
+            key = os.path.dirname(os.fspath(path)) if func.__name__ == "lstat" else os.fspath(path)
+            with self.lock:
+                self.running[key] = self.running.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+            try:
+                time.sleep(LATENCY)
+                return func(path, *args, **kwargs)
+            finally:
+                with self.lock:
+                    self.running[key] -= 1
+
+        wrapper.__name__ = func.__name__
+        return wrapper
+
+
+@pytest.fixture()
+def slow(monkeypatch):
+    return SlowFilesystem(monkeypatch)
+
+
+def test_is_empty(tmp_path):
+    async def check():
+        assert await is_empty(tmp_path)
+        (tmp_path / "file").write_bytes(b"")
+        assert not await is_empty(tmp_path)
+        with pytest.raises(IsADirectoryError):
+            await is_empty(tmp_path / "file")
+
+    asyncio.run(check())
+
+
+def test_is_path_valid(tmp_path):
+    async def check():
+        assert await is_path_valid(tmp_path) is None
+        with pytest.raises(OSError):
+            await is_path_valid(tmp_path / ("a" * 300))
+
+    asyncio.run(check())
+
+
+def test_does_not_block_loop(tmp_path, slow):
+    async def check():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(LATENCY / 10)
+
+        task = asyncio.create_task(ticker())
+        assert await is_empty(tmp_path)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(check()) > 3
+
+
+def test_limits_concurrency_per_filesystem(tmp_path, slow):
+    directories = [tmp_path / str(number) for number in range(2)]
+    for directory in directories:
+        directory.mkdir()
+    executor = PathExecutor(max_workers=8, per_filesystem=2, filesystem_key=lambda path: os.path.basename(path))
+
+    async def check():
+        started = time.perf_counter()
+        await asyncio.gather(*(is_empty(directory, executor) for directory in directories for _ in range(6)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(check())
+    assert all(slow.peak[str(directory)] == 2 for directory in directories)
+    # 2 filesystems run in parallel, 6 calls to each one go 2 at a time
+    assert 3 * LATENCY <= elapsed < 6 * LATENCY
+    executor.shutdown()
+
+
+def test_executor_is_bounded(tmp_path, slow):
+    executor = PathExecutor(max_workers=1, per_filesystem=4)
+
+    async def check():
+        await asyncio.gather(*(is_empty(tmp_path, executor) for _ in range(4)))
+
+    asyncio.run(check())
+    assert slow.peak[str(tmp_path)] == 1
+    executor.shutdown()
+
+
+def test_executor_is_reusable_across_loops(tmp_path):
+    executor = PathExecutor(per_filesystem=1)
+    for _ in range(2):
+        assert asyncio.run(is_empty(tmp_path, executor))
+    executor.shutdown()
+    assert asyncio.run(is_empty(tmp_path, executor))
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 256])
+def test_scan_dir_entries(tmp_path, batch_size):
+    for number in range(10):
+        (tmp_path / str(number)).write_bytes(b"")
+
+    async def scan():
+        return sorted([entry.name async for entry in scan_dir_entries(tmp_path, batch_size=batch_size)])
+
+    assert asyncio.run(scan()) == sorted(os.listdir(tmp_path))
+
+
+def test_scan_dir_entries_closes_iterator(tmp_path, monkeypatch):
+    for number in range(10):
+        (tmp_path / str(number)).write_bytes(b"")
+    iterators = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        iterators.append(scandir(path))
+        return iterators[-1]
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+
+    async def scan():
+        entries = scan_dir_entries(tmp_path, batch_size=2)
+        async for _ in entries:
+            break
+        await entries.aclose()
+
+    asyncio.run(scan())
+    with pytest.raises(StopIteration):
+        next(iterators[0])
+
+
+def test_scan_dir_entries_raises(tmp_path):
+    async def scan(path, batch_size=256):
+        return [entry async for entry in scan_dir_entries(path, batch_size=batch_size)]
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(scan(tmp_path / "missing"))
+    with pytest.raises(ValueError):
+        asyncio.run(scan(tmp_path, batch_size=0))
+
+
+def test_mount_point(monkeypatch):
+    monkeypatch.setattr(aio, "_mount_points", lambda: ("/mnt/my data", "/mnt", "/"))
+    assert mount_point("/mnt/my data/arrays") == "/mnt/my data"
+    assert mount_point("/mnt/my datasets") == "/mnt"
+    assert mount_point("/home") == "/"
+    monkeypatch.setattr(aio, "_mount_points", lambda: ())
+    assert mount_point("/home") == (os.path.splitdrive(os.path.abspath("/home"))[0] or os.path.sep)
+
+
+def test_mount_points_are_reread(monkeypatch):
+    tables = iter([("/mnt", "/"), ("/mnt/new", "/mnt", "/")])
+    monkeypatch.setattr(aio, "_read_mount_points", lambda: next(tables))
+    monkeypatch.setattr(aio, "_mounts", (float("-inf"), ()))
+    assert mount_point("/mnt/new/arrays") == "/mnt"
+    assert mount_point("/mnt/new/arrays") == "/mnt"
+    # the mount table gets old
+    monkeypatch.setattr(aio, "_mounts", (float("-inf"), aio._mounts[1]))
+    assert mount_point("/mnt/new/arrays") == "/mnt/new"
+
+
+@pytest.mark.parametrize(("max_workers", "per_filesystem"), [(0, 1), (1, 0)])
+def test_executor_raises(max_workers, per_filesystem):
+    with pytest.raises(ValueError):
+        PathExecutor(max_workers, per_filesystem)
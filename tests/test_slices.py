@@ -1,9 +1,29 @@
-from datetime import datetime, timezone
+import itertools
+import pickle
+import random
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import numpy as np
 import pytest
 
-from deker_tools.slices import SliceConversionError, create_shape_from_slice, match_slice_size, slice_converter
+from deker_tools import slices
+from deker_tools.slices import (
+    CoalescedIndex,
+    CoalescePlan,
+    SliceConversionError,
+    coalesce_index_exps,
+    compose,
+    create_shape_from_slice,
+    create_shapes_from_slices,
+    decode_index,
+    decode_index_from,
+    encode_index,
+    intersect,
+    match_slice_size,
+    slice_converter,
+)
 
 
 class TestSliceConverter:
@@ -123,6 +143,38 @@ class TestSliceConverter:
     def test_slice_converter_str_to_slice(self, exp, exp_str):
         assert slice_converter[exp_str] == exp
 
+    @pytest.mark.parametrize(
+        ("exp_str", "exp"),
+        [
+            ("[`a,b`, `c:d`]", ("a,b", "c:d")),
+            ("[`a,b`:`c:d`:2]", slice("a,b", "c:d", 2)),
+            ("[ 1 : 2 , ` x ` ]", (slice(1, 2), " x ")),
+            ("[5:2023-01-01T00:00:00]", slice(5, "2023-01-01T00:00:00")),
+            ("[2023-01-01T00:00:00:5]", slice("2023-01-01T00:00:00", 5)),
+            ("[2023-01-01T00:00:00::2]", slice("2023-01-01T00:00:00", None, 2)),
+            (
+                "[`2023-01-01T00:00:00`:2023-02-01T00:00:00+03:00:`2023-03-01T00:00:00`, ...]",
+                (slice("2023-01-01T00:00:00", "2023-02-01T00:00:00+03:00", "2023-03-01T00:00:00"), ...),
+            ),
+            ("[(), None, ...]", ((), None, ...)),
+            ("[1e5, +1, inf]", ("1e5", "+1", "inf")),
+        ],
+    )
+    def test_slice_converter_str_to_slice_tokens(self, exp, exp_str):
+        assert slice_converter[exp_str] == exp
+
+    @pytest.mark.parametrize(
+        "exp",
+        [
+            ("a,b", "c:d", slice("a,b", "c:d", 2)),
+            (slice("2023-01-01T00:00:00", 5), slice(5, "2023-01-01T00:00:00", 2)),
+            (datetime(2023, 1, 1, tzinfo=timezone.utc), "x y"),
+        ],
+    )
+    def test_slice_converter_round_trip(self, exp):
+        expected = tuple(i.isoformat() if isinstance(i, datetime) else i for i in exp)
+        assert slice_converter[slice_converter[exp]] == expected
+
     @pytest.mark.parametrize(
         "string",
         [
@@ -134,6 +186,9 @@ class TestSliceConverter:
             "[ ]",
             "()",
             "( )",
+            "[1:2:3:4]",
+            "[-]",
+            "[1.2.3]",
         ],
     )
     def test_slice_converter_error_on_strings(self, string):
@@ -168,6 +223,474 @@ def test_create_shape_from_slice(slice_, result):
     assert new_shape == result
 
 
+class TestSliceConverterCache:
+    @pytest.fixture(autouse=True)
+    def _clean_cache(self):
+        slice_converter.cache_clear()
+        yield
+        slice_converter.configure_cache(maxsize=1024, enabled=True)
+
+    def test_str_to_slices_is_cached(self):
+        string = "[:, 0:10, `2023-01-01T00:00:00`]"
+        first = slice_converter[string]
+        second = slice_converter[string]
+        assert first == second == (slice(None), slice(0, 10), "2023-01-01T00:00:00")
+        info = slice_converter.cache_info()["str_to_slices"]
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_slices_to_str_is_cached(self):
+        assert slice_converter[1, 0:10:2, ...] == slice_converter[1, 0:10:2, ...] == "[1, 0:10:2, ...]"
+        info = slice_converter.cache_info()["slices_to_str"]
+        assert (info.hits, info.misses) == (1, 1)
+
+    @pytest.mark.parametrize(
+        ("first", "second"),
+        [
+            (0.0, -0.0),
+            (1, 1.0),
+            (1, True),
+            (datetime(2023, 1, 1, 3, tzinfo=timezone(timedelta(hours=3))), datetime(2023, 1, 1, tzinfo=timezone.utc)),
+            (slice(1, 2), slice(1, 2.0)),
+        ],
+    )
+    def test_equal_but_differently_rendered_items_do_not_collide(self, first, second):
+        assert first == second
+        expected = [slice_converter._slices_to_str(first), slice_converter._slices_to_str(second)]
+        assert [slice_converter[first], slice_converter[second]] == expected
+
+    def test_unhashable_items_are_not_cached(self):
+        assert slice_converter[[1, slice(None)]] == "[1, :]"
+        assert slice_converter.cache_info()["slices_to_str"].currsize == 0
+
+    def test_lru_eviction(self):
+        slice_converter.configure_cache(maxsize=2)
+        for string in ("[1]", "[2]", "[1]", "[3]"):
+            slice_converter[string]
+        assert slice_converter._str_cache._data.keys() == {"[1]", "[3]"}
+        assert slice_converter.cache_info()["str_to_slices"].maxsize == 2
+
+    def test_cache_can_be_disabled(self):
+        slice_converter.configure_cache(enabled=False)
+        slice_converter["[1]"]
+        slice_converter["[1]"]
+        assert slice_converter.cache_info()["str_to_slices"] == (0, 0, 1024, 0)
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(SliceConversionError):
+                slice_converter["[]"]
+        assert slice_converter.cache_info()["str_to_slices"].currsize == 0
+
+    def test_cache_is_thread_safe(self):
+        strings = [f"[{i}:{i + 10}, ...]" for i in range(50)]
+        slice_converter.configure_cache(maxsize=20)
+
+        def convert(n):
+            return [slice_converter[strings[(n + i) % 50]] for i in range(500)]
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(convert, range(8)))
+        for n, result in enumerate(results):
+            assert result == [(slice(i % 50, i % 50 + 10), ...) for i in range(n, n + 500)]
+        info = slice_converter.cache_info()["str_to_slices"]
+        assert info.hits + info.misses == 4000
+        assert info.currsize == 20
+
+
+class TestCompiledSlice:
+    def test_compile_string(self):
+        compiled = slice_converter.compile("[ 1: ,  ..., ::-2 ]")
+        assert compiled.index_exp == (slice(1, None), ..., slice(None, None, -2))
+        assert compiled.string == "[1:, ..., ::-2]"
+        assert compiled == slice_converter.compile(np.index_exp[1:, ..., ::-2])
+        assert hash(compiled) == hash(slice_converter.compile("[1:, ..., ::-2]"))
+
+    @pytest.mark.parametrize(
+        "index_exp", [np.index_exp[1:, ..., ::-2], np.index_exp[-1, None, 1:-1], np.index_exp[...], 5]
+    )
+    def test_shape_and_bounds(self, index_exp):
+        shape = (10, 6, 8)
+        compiled = slice_converter.compile(index_exp)
+        positions = np.indices(shape)[(slice(None), *np.index_exp[index_exp])]
+        assert compiled.shape(shape) == create_shape_from_slice(shape, index_exp) == positions.shape[1:]
+        bounds = compiled.bounds(shape)
+        assert len(bounds) == len(shape)
+        for dim, (start, stop, step) in enumerate(bounds):
+            assert set(range(start, stop, step)) == set(positions[dim].ravel())
+
+    def test_plans_are_cached_per_shape(self, mocker):
+        compiled = slice_converter.compile("[1:, 0]")
+        spy = mocker.spy(slices, "create_shape_from_slice")
+        assert compiled.shape((10, 5)) == compiled.shape([10, 5]) == (9,)
+        assert compiled.shape((3, 3)) == (2,)
+        assert compiled.bounds((10, 5)) == ((1, 10, 1), (0, 1, 1))
+        assert spy.call_count == 2
+
+    def test_immutable_and_picklable(self):
+        compiled = slice_converter.compile("[`2023-01-01T00:00:00`:, 1]")
+        with pytest.raises(AttributeError):
+            compiled.foo = 1
+        with pytest.raises(AttributeError):
+            compiled._string = "[:]"
+        with pytest.raises(AttributeError):
+            del compiled._string
+        assert not hasattr(compiled, "__dict__")
+        assert pickle.loads(pickle.dumps(compiled)) == compiled
+        assert {compiled: 1}[slice_converter.compile("[`2023-01-01T00:00:00`:, 1]")] == 1
+
+
+_BOUNDS = (None, -12, -5, -1, 0, 1, 3, 7, 12)
+_STEPS = (None, -4, -2, -1, 1, 2, 5)
+
+
+@pytest.mark.parametrize("dim_size", [0, 1, 2, 7, 10])
+def test_create_shape_from_slice_matches_numpy_slices(dim_size):
+    array = np.empty((dim_size, 3))
+    for start, stop, step in itertools.product(_BOUNDS, _BOUNDS, _STEPS):
+        index = (slice(start, stop, step),)
+        assert create_shape_from_slice(array.shape, index) == array[index].shape, index
+
+
+def _random_index(rng, shape):
+    index = []
+    for dim_size in shape:
+        kind = rng.random()
+        if kind < 0.1:
+            index.append(None)
+        if kind < 0.3 and dim_size:
+            index.append(rng.randint(-dim_size, dim_size - 1))
+        else:
+            index.append(slice(rng.choice(_BOUNDS), rng.choice(_BOUNDS), rng.choice(_STEPS)))
+    return index
+
+
+def test_create_shape_from_slice_matches_numpy_random():
+    rng = random.Random(20230612)
+    for _ in range(2000):
+        shape = tuple(rng.randint(0, 12) for _ in range(rng.randint(1, 5)))
+        head = rng.randint(0, len(shape))
+        tail = rng.randint(0, len(shape) - head)
+        index = _random_index(rng, shape[:head])
+        if tail or rng.random() < 0.5:
+            index += [..., *_random_index(rng, shape[len(shape) - tail :])]
+        index = tuple(index)
+        assert create_shape_from_slice(shape, index) == np.empty(shape)[index].shape, (shape, index)
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        (1, 2, 3, 4),
+        (..., ...),
+        (10,),
+        (slice(None), -721),
+        (0.5,),
+        ("a",),
+    ],
+)
+def test_create_shape_from_slice_raises(index):
+    with pytest.raises(IndexError):
+        create_shape_from_slice((10, 720, 4), index)
+
+
+def test_create_shape_from_slice_large_dimension():
+    assert create_shape_from_slice((10**12, 10**12), np.index_exp[::3, -10:]) == (333333333334, 10)
+
+
+def test_create_shapes_from_slices_matches_scalar():
+    rng = random.Random(20230613)
+    shape = (12, 0, 7, 3)
+    index_exps = []
+    for _ in range(500):
+        head = rng.randint(0, len(shape))
+        index = [i for i in _random_index(rng, shape[:head]) if i is not None]
+        if rng.random() < 0.5:
+            index.append(...)
+        index_exps.append(tuple(index))
+
+    batch = create_shapes_from_slices(shape, index_exps)
+    assert batch.shapes.shape == (500, 4)
+    assert not batch.errors
+    for n, index in enumerate(index_exps):
+        assert batch.shape(n) == create_shape_from_slice(shape, index), index
+
+
+def test_create_shapes_from_slices_errors_do_not_stop_batch():
+    index_exps = [
+        np.index_exp[::-2, 1],
+        np.index_exp[..., 7],
+        np.index_exp[::0],
+        np.index_exp[None],
+        np.index_exp[0.5:],
+        np.index_exp[: 2**70],
+        np.index_exp[1, 2, 3],
+        np.index_exp[-3:],
+    ]
+    batch = create_shapes_from_slices((10, 5), index_exps)
+
+    assert sorted(batch.errors) == [1, 2, 3, 4, 5, 6]
+    assert isinstance(batch.errors[1], IndexError)
+    assert isinstance(batch.errors[2], ValueError)
+    assert isinstance(batch.errors[4], TypeError)
+    assert (batch.shapes[1:7] == -1).all()
+    assert batch.shape(0) == (5,)
+    assert batch.shape(7) == (3, 5)
+    with pytest.raises(IndexError):
+        batch.shape(1)
+
+
+def test_create_shapes_from_slices_reports_original_index():
+    batch = create_shapes_from_slices((10, 5), [np.index_exp[-15], np.index_exp[:, 7]])
+    assert str(batch.errors[0]) == "Index -15 is out of bounds for axis 0 with size 10"
+    assert str(batch.errors[1]) == "Index 7 is out of bounds for axis 1 with size 5"
+
+
+@pytest.mark.parametrize("step", [-(2**63), -(2**63) + 1, 2**63 - 1, 2**62, -(2**62)])
+def test_create_shapes_from_slices_large_steps(step):
+    shape = (2**62 + 10, 10)
+    index_exps = [np.index_exp[::step], np.index_exp[5::step], np.index_exp[-1:0:step, ::step]]
+    batch = create_shapes_from_slices(shape, index_exps)
+    assert not batch.errors
+    for n, index in enumerate(index_exps):
+        assert batch.shape(n) == create_shape_from_slice(shape, index), index
+
+
+class TestSliceConverterBatch:
+    items = [
+        np.index_exp[:, 0:10, 5],
+        np.index_exp[datetime(2023, 1, 1) : datetime(2023, 2, 1), 0.1:0.9:0.05],
+        (..., ...),
+        object(),
+        "abc",
+        [1, 2],
+        (),
+    ]
+    strings = ["[:, 0:10, 5]", "[1:2:3:4]", "[`2023-01-01T00:00:00`:, `abc`]", 5, "[...]", "1, 2", "[()]"]
+
+    @staticmethod
+    def _assert_same(results, expected):
+        assert len(results) == len(expected)
+        for result, item in zip(results, expected):
+            if isinstance(item, type):
+                assert type(result) is SliceConversionError and type(result.args[0]) is item
+            else:
+                assert result == item
+
+    @pytest.mark.parametrize("processes", [None, 2])
+    def test_to_strings(self, processes):
+        results = list(slice_converter.to_strings(iter(self.items), processes=processes, batch_size=2))
+        expected = [slice_converter[item] for item in self.items[:2]]
+        expected += [IndexError, TypeError, "[`abc`]", "[1, 2]", "[()]"]
+        self._assert_same(results, expected)
+
+    @pytest.mark.parametrize("processes", [None, 2])
+    def test_from_strings(self, processes):
+        results = list(slice_converter.from_strings(iter(self.strings), processes=processes, batch_size=3))
+        expected = [slice_converter[self.strings[0]], SliceConversionError, slice_converter[self.strings[2]], TypeError]
+        expected += [..., SliceConversionError, ()]
+        self._assert_same(results, expected)
+
+    def test_batches_are_lazy(self):
+        consumed = []
+
+        def strings():
+            for n in itertools.count():
+                consumed.append(n)
+                yield f"[{n}]"
+
+        results = slice_converter.from_strings(strings(), batch_size=10)
+        assert next(results) == 0
+        assert len(consumed) == 10
+
+    def test_round_trip(self):
+        items = [np.index_exp[t : t + 24, y : y + 256, x] for t in (0, 24) for y in (0, 256, 512) for x in (0, -1)]
+        assert list(slice_converter.from_strings(slice_converter.to_strings(items))) == items
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            list(slice_converter.to_strings([1], batch_size=0))
+
+
+class TestIndexCodec:
+    @pytest.mark.parametrize(
+        "index_exp",
+        [
+            5,
+            -1,
+            0,
+            2**63,
+            -(2**100),
+            None,
+            ...,
+            (),
+            "abc",
+            "",
+            "`escaped`, [:]",
+            "юникод",
+            0.5,
+            -0.0,
+            float("inf"),
+            slice(None),
+            slice(-1, None, -2),
+            np.index_exp[:, 0:10, 5, ...],
+            np.index_exp[None, 1],
+            np.index_exp[0.1:0.9:0.05, "a":"z"],
+            datetime(2023, 1, 1, 12, 30, 15, 123456),
+            datetime(1, 1, 1),
+            datetime(9999, 12, 31, 23, 59, 59, 999999),
+            datetime(2023, 1, 1, tzinfo=timezone.utc),
+            datetime(2023, 1, 1, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+            datetime(2023, 1, 1, tzinfo=timezone(-timedelta(hours=23, minutes=59, microseconds=1))),
+            np.index_exp[datetime(2023, 1, 1) : datetime(2023, 2, 1, tzinfo=timezone(timedelta(hours=-3))), 1.5],
+        ],
+    )
+    def test_round_trip(self, index_exp):
+        decoded = decode_index(encode_index(index_exp))
+        assert decoded == index_exp or (index_exp != index_exp and decoded != decoded)
+        assert slice_converter._slices_to_str(decoded) == slice_converter._slices_to_str(index_exp)
+
+    def test_round_trip_converts_numpy_scalars(self):
+        assert decode_index(encode_index((np.int64(5), slice(np.int32(-1), None), np.float32(0.5)))) == (
+            5,
+            slice(-1, None, None),
+            0.5,
+        )
+
+    def test_nan(self):
+        assert np.isnan(decode_index(encode_index(float("nan"))))
+
+    @pytest.mark.parametrize("index_exp", [True, False, (True, 1), slice(False, True), np.index_exp[1, True:]])
+    def test_booleans(self, index_exp):
+        decoded = decode_index(encode_index(index_exp))
+        assert repr(decoded) == repr(index_exp)
+        assert slice_converter[decoded] == slice_converter[index_exp]
+
+    @pytest.mark.parametrize("index_exp", [[1, 2], [slice(1, 5), "a", None], []])
+    def test_lists_are_encoded_as_tuples(self, index_exp):
+        assert decode_index(encode_index(index_exp)) == tuple(index_exp)
+        assert encode_index(index_exp) == encode_index(tuple(index_exp))
+
+    def test_is_compact(self):
+        index_exp = np.index_exp[0:24, 256:512, 1024:1280, 5]
+        assert len(slice_converter[index_exp]) == 29
+        assert len(encode_index(index_exp)) == 16
+
+    def test_decode_from_memoryview(self):
+        first, second = np.index_exp[1:2, "a"], datetime(2023, 1, 1)
+        message = bytearray(b"header") + encode_index(first) + encode_index(second) + b"trailer"
+        view = memoryview(message)
+        decoded, end = decode_index_from(view, 6)
+        assert decoded == first
+        decoded, end = decode_index_from(view, end)
+        assert decoded == second
+        assert bytes(view[end:]) == b"trailer"
+
+    @pytest.mark.parametrize(
+        "index_exp",
+        [object(), ((1, 2),), slice(slice(1), None), {1: 2}, np.index_exp[1, [1]], [[1]], np.bool_(True)],
+    )
+    def test_encode_raises(self, index_exp):
+        with pytest.raises(SliceConversionError):
+            encode_index(index_exp)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"\x02\x00",
+            b"\x01",
+            b"\x01\x63",
+            b"\x01\x02\x80",
+            b"\x01\x04\x0a\x61",
+            b"\x01\x24\xff",
+            b"\x01\x03\x00",
+            b"\x01\x08\x04\x00",
+            b"\x01\x08\x02\x08\x00",
+            b"\x01\x17\x07",
+            b"\x01\x17\x00",
+            b"\x01\x87\x02",
+            b"\x01\x00\x00",
+            b"\x01\x05\xff\xff\xff\xff\xff\xff\xff\x7f",
+            b"\x01\x39",
+        ],
+    )
+    def test_decode_raises(self, data):
+        with pytest.raises(SliceConversionError):
+            decode_index(data)
+
+    def test_random_round_trip(self):
+        rng = random.Random(20230615)
+        for _ in range(500):
+            index_exp = tuple(_random_index(rng, [rng.randint(1, 10) for _ in range(rng.randint(0, 5))]))
+            assert decode_index(memoryview(encode_index(index_exp))) == index_exp
+
+
+@pytest.mark.parametrize(
+    ("outer", "inner", "shape", "result"),
+    [
+        (np.index_exp[10:90:2, 5], np.index_exp[::-3], (100, 10), (slice(88, 8, -6), 5)),
+        (np.index_exp[...], np.index_exp[2:5], (10,), (slice(2, 5, 1),)),
+        (np.index_exp[2:8], np.index_exp[-1], (10,), (7,)),
+        (np.index_exp[::-1], np.index_exp[::-1], (10,), (slice(0, 10, 1),)),
+        (np.index_exp[::-1], np.index_exp[5:], (10,), (slice(4, None, -1),)),
+        (np.index_exp[3:3], np.index_exp[:], (10,), (slice(0, 0, 1),)),
+        (np.index_exp[1, None], np.index_exp[0, ::2], (3, 4), (1, slice(0, 4, 2))),
+        (np.index_exp[None, 1], np.index_exp[:, None], (3, 4), (None, 1, None, slice(0, 4, 1))),
+    ],
+)
+def test_compose(outer, inner, shape, result):
+    assert compose(outer, inner, shape) == result
+
+
+def test_compose_matches_numpy_random():
+    rng = random.Random(20230613)
+    for _ in range(2000):
+        shape = tuple(rng.randint(0, 8) for _ in range(rng.randint(1, 4)))
+        array = np.arange(int(np.prod(shape))).reshape(shape)
+        outer = tuple(_random_index(rng, shape))
+        view = array[outer]
+        inner = tuple(_random_index(rng, view.shape))
+        try:
+            index = compose(outer, inner, shape)
+        except IndexError:
+            assert view[inner].size == 0
+            continue
+        assert np.array_equal(array[index], view[inner]), (shape, outer, inner, index)
+        assert array[index].shape == view[inner].shape
+
+
+@pytest.mark.parametrize(
+    ("index_a", "index_b", "shape", "result"),
+    [
+        (np.index_exp[0:100:4, 3], np.index_exp[::-3, :5], (100, 10), (slice(0, 97, 12), 3)),
+        (np.index_exp[0:100:2], np.index_exp[1:100:2], (100,), None),
+        (np.index_exp[:50], np.index_exp[50:], (100,), None),
+        (np.index_exp[5], np.index_exp[::5], (100,), (5,)),
+        (np.index_exp[5], np.index_exp[::2], (100,), None),
+        (np.index_exp[-1], np.index_exp[99], (100,), (99,)),
+        (np.index_exp[None, 3:7], np.index_exp[..., 5:], (10,), (slice(5, 7, 1),)),
+        (np.index_exp[3:3], np.index_exp[:], (10,), None),
+    ],
+)
+def test_intersect(index_a, index_b, shape, result):
+    assert intersect(index_a, index_b, shape) == result
+    assert intersect(index_b, index_a, shape) == result
+
+
+def test_intersect_matches_numpy_random():
+    rng = random.Random(20230614)
+    for _ in range(2000):
+        shape = tuple(rng.randint(1, 30) for _ in range(rng.randint(1, 3)))
+        array = np.arange(int(np.prod(shape))).reshape(shape)
+        index_a, index_b = (tuple(i for i in _random_index(rng, shape) if i is not None) for _ in range(2))
+        common = np.intersect1d(array[index_a], array[index_b])
+        index = intersect(index_a, index_b, shape)
+        if index is None:
+            assert common.size == 0, (shape, index_a, index_b)
+        else:
+            assert np.array_equal(array[index].ravel(), common), (shape, index_a, index_b, index)
+
+
 @pytest.mark.parametrize(
     ("dim_size", "slice_", "result"),
     [
@@ -183,3 +706,119 @@ def test_match_slice_size(dim_size, slice_, result):
 
 if __name__ == "__main__":
     pytest.main()
+
+
+def _check_plan(array, index_exps, plan):
+    assert len(plan.requests) == len(index_exps)
+    for index_exp, request in zip(index_exps, plan.requests):
+        read = plan.reads[request.read]
+        assert all(item.step is None and 0 <= item.start <= item.stop for item in read)
+        expected = array[index_exp]
+        result = array[read][request.local]
+        assert result.shape == expected.shape, (index_exp, read, request)
+        assert np.array_equal(result, expected), (index_exp, read, request)
+
+
+def _check_waste(array, index_exps, plan, max_waste):
+    for position, read in enumerate(plan.reads):
+        volume = int(np.prod([item.stop - item.start for item in read]))
+        members = [index_exps[i] for i, request in enumerate(plan.requests) if request.read == position]
+        requested = np.zeros(array.shape, dtype=bool)
+        for index_exp in members:
+            requested[index_exp] = True
+        assert len(members) == 1 or volume - np.count_nonzero(requested) <= max_waste * volume, (read, members)
+
+
+class TestCoalesceIndexExps:
+    def test_merges_adjacent_and_keeps_distant(self):
+        index_exps = [np.index_exp[:10, :10], np.index_exp[:10, 10:20], (50, 50)]
+        plan = coalesce_index_exps((100, 100), index_exps)
+        assert plan.reads == ((slice(0, 10), slice(0, 20)), (slice(50, 51), slice(50, 51)))
+        assert plan.requests == (
+            CoalescedIndex(0, (slice(0, 10, 1), slice(0, 10, 1))),
+            CoalescedIndex(0, (slice(0, 10, 1), slice(10, 20, 1))),
+            CoalescedIndex(1, (0, 0)),
+        )
+
+    def test_sliding_window(self):
+        index_exps = [np.index_exp[t : t + 24, 100:200] for t in range(0, 240, 12)]
+        plan = coalesce_index_exps((1000, 1000), index_exps, max_waste=0)
+        assert plan.reads == ((slice(0, 252), slice(100, 200)),)
+        _check_plan(np.arange(10**6).reshape(1000, 1000), index_exps, plan)
+
+    def test_station_clusters(self):
+        stations = [(y, x) for y0, x0 in ((10, 10), (500, 900)) for y in range(y0, y0 + 4) for x in range(x0, x0 + 4)]
+        plan = coalesce_index_exps((1000, 1000), stations[::2] + stations[1::2], max_waste=0)
+        assert plan.reads == ((slice(10, 14), slice(10, 14)), (slice(500, 504), slice(900, 904)))
+
+    @pytest.mark.parametrize(
+        ("max_waste", "reads"),
+        [
+            (0, ((slice(0, 4),), (slice(6, 10),))),
+            (0.2, ((slice(0, 10),),)),
+        ],
+    )
+    def test_max_waste(self, max_waste, reads):
+        plan = coalesce_index_exps((10,), [np.index_exp[:4], np.index_exp[6:]], max_waste=max_waste)
+        assert plan.reads == reads
+
+    @pytest.mark.parametrize("max_waste", [0, 0.25, 0.5])
+    def test_max_waste_with_overlaps(self, max_waste):
+        array = np.arange(10_000).reshape(100, 100)
+        index_exps = (
+            [np.index_exp[0:10, 0:10]] * 101
+            + [np.index_exp[5:15, 5:15], np.index_exp[10:20, 0:20:2], (99, 99)]
+            + [np.index_exp[40:60, 40:60], np.index_exp[50:70, 50:70]]
+        )
+        plan = coalesce_index_exps(array.shape, index_exps, max_waste=max_waste)
+        _check_plan(array, index_exps, plan)
+        assert (slice(99, 100), slice(99, 100)) in plan.reads
+        _check_waste(array, index_exps, plan, max_waste)
+
+    def test_duplicates_fill_each_other_up(self):
+        plan = coalesce_index_exps(
+            (100, 100), [np.index_exp[0:10, 0:10]] * 3 + [np.index_exp[0:10, 10:20]], max_waste=0
+        )
+        assert plan.reads == ((slice(0, 10), slice(0, 20)),)
+
+    def test_strided_and_reversed(self):
+        array = np.arange(100)
+        index_exps = [np.index_exp[::-3], np.index_exp[2:50:7], np.index_exp[None, 5]]
+        _check_plan(array, index_exps, coalesce_index_exps(array.shape, index_exps, max_waste=0.9))
+
+    def test_empty_requests(self):
+        array = np.arange(20).reshape(4, 5)
+        index_exps = [np.index_exp[1:1, 2], np.index_exp[1:2, 1:4], np.index_exp[1, 3:3]]
+        plan = coalesce_index_exps(array.shape, index_exps, max_waste=0)
+        assert plan.reads == ((slice(1, 2), slice(1, 4)),)
+        _check_plan(array, index_exps, plan)
+
+    def test_only_empty_requests(self):
+        array = np.arange(20).reshape(4, 5)
+        index_exps = [np.index_exp[3:3, 4], np.index_exp[2, 5:]]
+        plan = coalesce_index_exps(array.shape, index_exps)
+        assert all(array[read].size == 0 for read in plan.reads)
+        _check_plan(array, index_exps, plan)
+
+    def test_no_requests(self):
+        assert coalesce_index_exps((10,), []) == CoalescePlan((), ())
+
+    @pytest.mark.parametrize("max_waste", [-0.1, 1, 2])
+    def test_raises_on_max_waste(self, max_waste):
+        with pytest.raises(ValueError):
+            coalesce_index_exps((10,), [np.index_exp[:]], max_waste=max_waste)
+
+    def test_raises_on_invalid_index(self):
+        with pytest.raises(IndexError):
+            coalesce_index_exps((10,), [np.index_exp[10]])
+
+    def test_random(self):
+        rng = random.Random(20230616)
+        for _ in range(300):
+            shape = tuple(rng.randint(1, 8) for _ in range(rng.randint(1, 3)))
+            array = np.arange(int(np.prod(shape))).reshape(shape)
+            index_exps = [tuple(_random_index(rng, shape)) for _ in range(rng.randint(1, 12))]
+            max_waste = rng.choice([0, 0.25, 0.5, 0.9])
+            plan = coalesce_index_exps(shape, index_exps, max_waste=max_waste)
+            _check_plan(array, index_exps, plan)
+            _check_waste(array, index_exps, plan, max_waste)
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from deker_tools.time import get_utc, get_utc_array
+
+
+@pytest.mark.parametrize(
+    ("dt", "expected"),
+    [
+        (0, datetime(1970, 1, 1, tzinfo=timezone.utc)),
+        (1686587358, datetime(2023, 6, 12, 16, 29, 18, tzinfo=timezone.utc)),
+        (1686587358.317633, datetime(2023, 6, 12, 16, 29, 18, 317633, tzinfo=timezone.utc)),
+        (-1.5, datetime(1969, 12, 31, 23, 59, 58, 500000, tzinfo=timezone.utc)),
+        (0.0000005, datetime(1970, 1, 1, tzinfo=timezone.utc)),
+        (0.0000015, datetime(1970, 1, 1, 0, 0, 0, 2, tzinfo=timezone.utc)),
+        (datetime(2023, 6, 12, 16, 29, 18, 1), datetime(2023, 6, 12, 16, 29, 18, 1, tzinfo=timezone.utc)),
+        (
+            datetime(2023, 6, 12, 16, 29, 18, 1, tzinfo=timezone(timedelta(hours=-3, minutes=-30))),
+            datetime(2023, 6, 12, 19, 59, 18, 1, tzinfo=timezone.utc),
+        ),
+        (
+            datetime(2023, 6, 12, 16, 29, 18, 1, tzinfo=ZoneInfo("Europe/Berlin")),
+            datetime(2023, 6, 12, 14, 29, 18, 1, tzinfo=timezone.utc),
+        ),
+        ("2023-06-12T16:29:18.317633", datetime(2023, 6, 12, 16, 29, 18, 317633, tzinfo=timezone.utc)),
+        ("2023-06-12T16:29:18.317633+05:00", datetime(2023, 6, 12, 11, 29, 18, 317633, tzinfo=timezone.utc)),
+        ("2023-06-12T00:00:00.000001-03:00", datetime(2023, 6, 12, 3, 0, 0, 1, tzinfo=timezone.utc)),
+    ],
+)
+def test_get_utc(dt, expected):
+    result = get_utc(dt)
+    assert result == expected
+    assert result.tzinfo is timezone.utc
+    assert result.microsecond == expected.microsecond
+
+
+def test_get_utc_now():
+    before = datetime.now(timezone.utc)
+    now = get_utc()
+    assert now.tzinfo is timezone.utc
+    assert before <= now <= datetime.now(timezone.utc)
+
+
+def test_get_utc_raises_on_invalid_string():
+    with pytest.raises(ValueError):
+        get_utc("yesterday")
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [0, 1686587358, -86400],
+        [1686587358.317633, -1.5, 0.0000005, 0.0000015, 0.0000025, 1e9 + 0.4999995],
+        np.random.default_rng(0).uniform(-1e10, 1e10, 1000),
+        [
+            "2023-06-12T16:29:18",
+            "2023-06-12 16:29:18.3",
+            "2023-06-12T16:29:18.317633Z",
+            "2023-06-12T16:29:18.317633+05:00",
+            "2023-06-12T00:00:00.000001-03:30",
+            "2024-02-29T23:59:59+00:00",
+            "0001-01-01T00:00:00",
+            "9999-12-31T23:59:59.999999",
+        ],
+        ["2023-06-12", "2023-06-12T16:29:18.317633+05:00"],
+        [b"2023-06-12T16:29:18.317633+05:00", b"2023-06-12T16:29:18"],
+        [datetime(2023, 6, 12, 16, 29, 18, 1, tzinfo=ZoneInfo("Europe/Berlin")), datetime(2023, 6, 12)],
+    ],
+)
+def test_get_utc_array_equals_get_utc(values):
+    expected = [get_utc(v.decode() if isinstance(v, bytes) else v) for v in np.asarray(values, dtype=object).tolist()]
+    result = get_utc_array(values)
+    assert result.dtype == np.dtype("datetime64[us]")
+    assert [dt.replace(tzinfo=timezone.utc) for dt in result.tolist()] == expected
+
+    aware = get_utc_array(values, as_datetime=True)
+    assert aware.dtype == object
+    assert aware.tolist() == expected
+    assert all(dt.tzinfo is timezone.utc for dt in aware.tolist())
+
+
+def test_get_utc_array_datetime64():
+    values = np.array(["2023-06-12T16:29:18", "1969-12-31"], dtype="datetime64[s]")
+    assert get_utc_array(values).tolist() == [datetime(2023, 6, 12, 16, 29, 18), datetime(1969, 12, 31)]
+
+
+def test_get_utc_array_nat():
+    values = np.array(["2023-06-12T16:29:18", "NaT"], dtype="datetime64[us]")
+    assert get_utc_array(values, as_datetime=True).tolist() == [
+        datetime(2023, 6, 12, 16, 29, 18, tzinfo=timezone.utc),
+        None,
+    ]
+
+
+@pytest.mark.parametrize("value", ["2023-06-12T16:29:18Z", "2023-06-12T16:29:18.3", "2023-06-12T16:29:18.31763+05:00"])
+def test_get_utc_array_leaves_other_layouts_to_get_utc(value):
+    try:
+        expected = get_utc(value)
+    except ValueError:
+        with pytest.raises(ValueError):
+            get_utc_array([value])
+    else:
+        assert get_utc_array([value], as_datetime=True).tolist() == [expected]
+
+
+@pytest.mark.parametrize("value", ["0001-01-01T00:00:00+05:00", "9999-12-31T23:59:59.999999-00:01"])
+def test_get_utc_array_raises_as_get_utc_out_of_range(value):
+    with pytest.raises(OverflowError):
+        get_utc(value)
+    with pytest.raises(OverflowError):
+        get_utc_array([value])
+    with pytest.raises(OverflowError):
+        get_utc_array(["2023-06-12T16:29:18", value], as_datetime=True)
+
+
+def test_get_utc_array_keeps_shape():
+    values = np.arange(6).reshape(2, 3)
+    result = get_utc_array(values)
+    assert result.shape == (2, 3)
+    assert get_utc_array(values, as_datetime=True).shape == (2, 3)
+    assert get_utc_array([]).shape == (0,)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["2023-06-12T16:29:18", "yesterday"],
+        ["2023-02-29T00:00:00"],
+        ["2023-06-12T16:29:60"],
+        ["2023-06-12T16:29:18+24:00"],
+        [float("nan")],
+        [1e20],
+    ],
+)
+def test_get_utc_array_raises(values):
+    with pytest.raises((ValueError, OverflowError)):
+        get_utc_array(values)
+
+
+if __name__ == "__main__":
+    pytest.main()